@@ -235,7 +235,8 @@ def add_flange_thickness(doc, flange_type, D_n, D_m, D_int, T_b, f_counter):
     return f_counter
 
 
-def generate_new_report(result, input_select_names):
+def generate_new_report(result, input_select_names, target=None):
+    """Отчет о расчете фланцев; target — путь или файловый объект, по умолчанию файл по имени расчета"""
     r = SimpleNamespace(**result)
     print('r')
     for k in result.keys():
@@ -2108,4 +2109,5 @@ def generate_new_report(result, input_select_names):
     filename = (f'Расчет_фланцев_DN{int(r.D_N_flange)}_PN{int(r.pressure * 10)}_{r.flange_type}_{r.face_type}_'
                 f'{r.flange_steel}_{r.bolt_steel}')
 
-    doc.save(f'{filename}.docx')
+    doc.save(target or f'{filename}.docx')
+    return f'{filename}.docx'
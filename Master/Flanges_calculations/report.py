@@ -105,7 +105,7 @@ def add_equation_calc(doc, formula_latex: str, variables: dict, units: str, numb
     return result
 
 
-def generate_report(result, T_b, input_select_names):
+def generate_report(result, T_b, input_select_names, target=None):
     print(result)
     gasket_data = dict(result['gasket_params'])
     gasket_document = gasket_data['document']
@@ -2104,4 +2104,5 @@ def generate_report(result, T_b, input_select_names):
                       "Расчет на прочность при малоцикловых нагрузках.")
 
     filename = f'Расчет_фланцев_DN{int(D_N_flange)}_PN{int(pressure * 10)}_{flange_type}_{flange_steel}_{bolt_steel}'
-    doc.save(f'{filename}.docx')
+    doc.save(target or f'{filename}.docx')
+    return f'{filename}.docx'
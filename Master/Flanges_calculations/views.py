@@ -16,6 +16,7 @@ from .graphs_data import (x_values_B_F, x_values_B_V, x_values_f,
 from .report import generate_report
 from .new_calc import new_calc
 from .new_report import generate_new_report
+from Master.workspace import attachment
 
 
 def flanges_calculations(request):
@@ -150,12 +151,13 @@ def flanges_calculations(request):
         # generate_report(result, T_b, input_select_names)
 
         result_dict = new_calc(input_data, input_select)
-        generate_new_report(result_dict, input_select_names)
+        # Отчет собирается в памяти и отдается на скачивание — без общего файла в рабочем каталоге
+        return attachment(lambda buffer: generate_new_report(result_dict, input_select_names, buffer))
 
     return render(request, 'flanges.html', context)
 
 
-def multi_calc(input_data, input_select):
+def multi_calc(input_data, input_select, target=None):
     D_N_flange = float(input_data['D_N_flange'])
     pressure = float(input_data['pressure'])
     temperature = float(input_data['temperature'])
@@ -185,7 +187,7 @@ def multi_calc(input_data, input_select):
     # flange_steel = input_select['flange_steel']
     # bolt_steel = input_select['bolt_steel']
 
-    filename = "flange_results.xlsx"
+    filename = target or "flange_results.xlsx"  # путь или файловый объект
     all_results = []
 
     steel_flange_range = ["40Х", "25Х1МФ", "20Х13", "12Х18Н10Т"]
@@ -0,0 +1,108 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Модель, запрошенная не раньше стольких секунд назад, не вытесняется: вызвавший cached_artifacts
+# еще может упаковывать или отдавать ее файлы; переопределяется STEP_CACHE_GRACE в settings
+CACHE_GRACE = 10 * 60
+
+
+def normalize(params):
+    """Параметры модели в виде, не зависящем от записи: 50 и 50.0 дают один ключ"""
+    normalized = {}
+    for name, value in params.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            value = round(float(value), 6)
+        normalized[name] = value
+    return normalized
+
+
+def artifact_key(kind, params, version):
+    """Ключ модели: хэш типа модели, версии кода геометрии и нормализованных параметров"""
+    payload = json.dumps({"kind": kind, "version": version, "params": normalize(params)}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def cache_root():
+    root = Path(getattr(settings, 'STEP_CACHE_DIR', Path(settings.BASE_DIR) / 'step_cache'))
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def cached_artifacts(kind, params, version, build):
+    """Каталог с файлами модели из кэша; build(directory) строит их только при промахе.
+
+    Возвращает путь к каталогу и признак попадания в кэш.
+    """
+    root = cache_root()
+    key = artifact_key(kind, params, version)
+    directory = root / key
+
+    try:
+        os.utime(directory)  # отметка для вытеснения давно не запрошенных и защита от него на CACHE_GRACE
+    except FileNotFoundError:
+        pass  # модели нет или ее только что вытеснил другой запрос — строится заново
+    else:
+        logger.info(f"Модель {kind} взята из кэша: {key}")
+        return directory, True
+
+    # Сборка во временном каталоге и атомарный перенос — параллельный запрос не увидит неполную модель
+    building = root / f".{key}.{uuid.uuid4().hex}"
+    building.mkdir()
+    try:
+        build(building)
+        os.replace(building, directory)
+    except OSError:
+        # Временный каталог удаляется при любой ошибке: evict не трогает каталоги с точкой
+        shutil.rmtree(building, ignore_errors=True)
+        if not directory.is_dir():  # иначе ту же модель уже собрал другой запрос
+            raise
+    except Exception:
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+
+    logger.info(f"Модель {kind} построена и сохранена в кэш: {key}")
+    evict(root, keep=directory)
+    return directory, False
+
+
+def directory_size(directory):
+    return sum(file.stat().st_size for file in directory.rglob('*') if file.is_file())
+
+
+def evict(root=None, keep=None):
+    """Удаление давно не запрошенных моделей, пока кэш больше STEP_CACHE_MAX_BYTES.
+
+    Модели, запрошенные за последние STEP_CACHE_GRACE секунд, не удаляются.
+    """
+    root = Path(root or cache_root())
+    limit = getattr(settings, 'STEP_CACHE_MAX_BYTES', 2 * 1024 ** 3)
+    recent = time.time() - getattr(settings, 'STEP_CACHE_GRACE', CACHE_GRACE)
+    entries = {}
+    for entry in root.iterdir():
+        if entry.is_dir() and not entry.name.startswith('.'):
+            try:
+                entries[entry] = entry.stat().st_mtime
+            except FileNotFoundError:
+                pass  # удалена параллельным вытеснением
+    sizes = {entry: directory_size(entry) for entry in entries}
+    total = sum(sizes.values())
+
+    for entry in sorted(entries, key=entries.get):
+        if total <= limit or entries[entry] > recent:
+            break  # дальше только недавно запрошенные
+        if entry == keep:
+            continue
+        shutil.rmtree(entry, ignore_errors=True)
+        total -= sizes[entry]
+        logger.info(f"Модель {entry.name} удалена из кэша")
+    return total
@@ -0,0 +1,33 @@
+import numpy as np
+from django.http import JsonResponse
+
+# Графики отдаются данными, а не готовым HTML Plotly: сервер считает только массивы точек, рисует
+# браузер (static/Master/js/charts.js). Описание графика — словарь, который одинаково встраивается
+# в страницу через json_script и отдается JSON-эндпоинтами.
+
+# Знаков после запятой в точках графика; больше на экране не различить, а ответ короче
+CHART_DIGITS = 4
+
+
+def points(values, digits=CHART_DIGITS):
+    """Список чисел для JSON: значения округлены, нечисловые (нет решения) становятся null — разрыв линии"""
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, digits).astype(object)
+    rounded[~np.isfinite(values)] = None
+    return rounded.tolist()
+
+
+def series(name, x, y, digits=CHART_DIGITS):
+    """Кривая графика; скаляр по одной из осей растягивается на все точки"""
+    x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+    return {'name': name, 'x': points(x, digits), 'y': points(y, digits)}
+
+
+def chart(title, xaxis_title, yaxis_title, lines):
+    """График из нескольких кривых series с подписями осей"""
+    return {'title': title, 'xaxis_title': xaxis_title, 'yaxis_title': yaxis_title, 'series': list(lines)}
+
+
+def chart_response(charts, status=200, **extra):
+    """JSON-ответ со списком графиков и дополнительными полями"""
+    return JsonResponse({'charts': list(charts), **extra}, status=status, json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,166 @@
+import importlib
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from pathlib import Path
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Фоновое построение CAD-моделей в пуле процессов. Состояние задачи хранится в JSON-файле
+# JOBS_DIR/<id>.json, поэтому опрашивать его может любой веб-процесс, а не только принявший задачу.
+
+# Выполняемая задача, состояние которой не обновлялось столько секунд, считается потерянной (процесс
+# пула погиб или сервер перезапущен); переопределяется JOB_TIMEOUT в settings. Задача в очереди ждет
+# свободный процесс пула без обновлений и по времени не прерывается
+JOB_TIMEOUT = 60 * 60
+
+_executor = None
+
+
+def jobs_root():
+    root = Path(getattr(settings, 'JOBS_DIR', Path(settings.BASE_DIR) / 'jobs'))
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def job_path(job_id):
+    return jobs_root() / f"{job_id}.json"
+
+
+def executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=getattr(settings, 'JOB_WORKERS', 2))
+    return _executor
+
+
+def write_state(job_id, state):
+    path = job_path(job_id)
+    temporary = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(state, file, ensure_ascii=False)
+    os.replace(temporary, path)  # опрос не увидит недописанный файл
+
+
+def status(job_id):
+    """Состояние задачи или None, если такой задачи нет"""
+    if not re.fullmatch(r'[0-9a-f]{32}', job_id):
+        return None
+    try:
+        with open(job_path(job_id), encoding='utf-8') as file:
+            state = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+    timeout = getattr(settings, 'JOB_TIMEOUT', JOB_TIMEOUT)
+    if state['status'] == 'running' and time.time() - state['updated'] > timeout:
+        state = fail(job_id, state, f"Задача не обновлялась больше {timeout} с и считается прерванной")
+    return state
+
+
+def fail(job_id, state, error):
+    """Перевод задачи в состояние failed с сообщением error; возвращает новое состояние"""
+    logger.error(f"Задача {job_id} прервана: {error}")
+    state.update({'status': 'failed', 'error': error, 'updated': time.time()})
+    state['logs'].append("Построение моделей завершилось с ошибкой.")
+    write_state(job_id, state)
+    return state
+
+
+def job_finished(job_id, future):
+    """Обработчик завершения future в веб-процессе: процесс пула погиб, не записав итог задачи"""
+    if not future.cancelled() and future.exception() is None:
+        return  # run_job сам записал done или failed
+    if future.cancelled():
+        error = "Задача отменена"
+    else:
+        error = f"Процесс построения завершился аварийно: {future.exception()!r}"
+    state = status(job_id)
+    if state is not None and state['status'] in ('queued', 'running'):
+        fail(job_id, state, error)
+
+
+class JobLog:
+    """Замена context['logs'] в фоновой задаче: каждое сообщение сразу попадает в состояние задачи"""
+
+    def __init__(self, job_id, state):
+        self.job_id = job_id
+        self.state = state
+
+    def append(self, message):
+        logger.info(f"Задача {self.job_id}: {message}")
+        self.state['logs'].append(message)
+        self.state['updated'] = time.time()
+        write_state(self.job_id, self.state)
+
+
+def submit(builder, params):
+    """Ставит построение в очередь и возвращает id задачи.
+
+    builder — путь к функции вида 'Screw.views.build_screw_models'; она вызывается в процессе пула
+    как builder(**params, logs=...) и возвращает путь к готовому архиву и имя файла для скачивания.
+    """
+    global _executor
+    prune()
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    write_state(job_id, {'id': job_id, 'builder': builder, 'status': 'queued', 'logs': [], 'error': None,
+                         'result': None, 'filename': None, 'created': now, 'updated': now})
+    try:
+        future = executor().submit(run_job, job_id, builder, params)
+    except BrokenProcessPool:
+        _executor = None
+        future = executor().submit(run_job, job_id, builder, params)
+    future.add_done_callback(partial(job_finished, job_id))
+    logger.info(f"Задача {job_id} ({builder}) поставлена в очередь")
+    return job_id
+
+
+def run_job(job_id, builder, params):
+    """Выполнение задачи в процессе пула"""
+    from django.apps import apps
+    if not apps.ready:  # процесс запущен через spawn, а не fork
+        import django
+        django.setup()
+
+    state = status(job_id)
+    if state is None or state['status'] == 'failed':
+        logger.warning(f"Задача {job_id} не найдена или уже прервана и не выполняется")
+        return
+    state['status'] = 'running'
+    log = JobLog(job_id, state)
+    log.append("Построение моделей начато.")
+    try:
+        module_name, function_name = builder.rsplit('.', 1)
+        build = getattr(importlib.import_module(module_name), function_name)
+        result, filename = build(**params, logs=log)
+    except Exception as e:
+        logger.error(f"Ошибка в задаче {job_id}: {e}", exc_info=True)
+        state['status'] = 'failed'
+        state['error'] = str(e)
+        log.append("Построение моделей завершилось с ошибкой.")
+        return
+
+    state['status'] = 'done'
+    state['result'] = str(result)
+    state['filename'] = filename
+    log.append("Модели готовы к скачиванию.")
+
+
+def prune(max_age=None):
+    """Удаление файлов состояния задач старше JOB_TTL секунд; сами модели остаются в кэше"""
+    max_age = max_age or getattr(settings, 'JOB_TTL', 24 * 60 * 60)
+    border = time.time() - max_age
+    for path in jobs_root().glob('*.json'):
+        try:
+            if path.stat().st_mtime < border:
+                path.unlink()
+        except FileNotFoundError:
+            pass
@@ -134,3 +134,14 @@ STATICFILES_DIRS = (
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Кэш STEP-моделей: каталог и предельный размер, при превышении удаляются давно не запрошенные модели
+
+STEP_CACHE_DIR = BASE_DIR / 'step_cache'
+STEP_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Фоновые задачи построения моделей: каталог состояний, число процессов и время хранения состояния, с
+
+JOBS_DIR = BASE_DIR / 'jobs'
+JOB_WORKERS = 2
+JOB_TTL = 24 * 60 * 60
@@ -6,6 +6,8 @@ from . import views
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.home, name="home"),
+    path('jobs/<str:job_id>/', views.job_status, name="job_status"),
+    path('jobs/<str:job_id>/download/', views.job_download, name="job_download"),
     path('pump_selection/', include('Pump_selection.urls')),
     path('calculations/', include('calculations.urls')),
     path('characteristics/', include('characteristics.urls')),
@@ -1,5 +1,7 @@
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, FileResponse, Http404
 from django.shortcuts import render
+import os
+from . import jobs
 
 
 def home(request):
@@ -7,3 +9,19 @@ def home(request):
     return render(request, 'home.html')
 
 
+def job_status(request, job_id):
+    state = jobs.status(job_id)
+    if state is None:
+        raise Http404("Задача не найдена")
+    return JsonResponse({key: state[key] for key in ('id', 'status', 'logs', 'error', 'filename')})
+
+
+def job_download(request, job_id):
+    state = jobs.status(job_id)
+    if state is None:
+        raise Http404("Задача не найдена")
+    if state['status'] != 'done':
+        return JsonResponse({'id': job_id, 'status': state['status']}, status=409)
+    if not os.path.exists(state['result']):
+        raise Http404("Файл модели удален из кэша, запустите построение заново")
+    return FileResponse(open(state['result'], 'rb'), as_attachment=True, filename=state['filename'])
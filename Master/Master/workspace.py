@@ -0,0 +1,15 @@
+import io
+
+from django.http import FileResponse
+
+# Файлы, которые строятся для одного запроса, не пишутся в рабочий каталог процесса под постоянными
+# именами: два одновременных запроса перезаписывали бы друг другу результат. Документ собирается
+# в памяти и сразу отдается пользователю; CAD-модели собираются в своих каталогах кэша (artifacts).
+
+
+def attachment(write):
+    """Ответ со скачиванием файла: write(buffer) записывает файл в память и возвращает его имя"""
+    buffer = io.BytesIO()
+    filename = write(buffer)
+    buffer.seek(0)
+    return FileResponse(buffer, as_attachment=True, filename=filename)
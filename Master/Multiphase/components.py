@@ -0,0 +1,101 @@
+import math
+
+import numpy as np
+
+from .kernel import CP_FIELDS, component_arrays, peng_robinson
+
+# Таблица компонентов многофазной смеси. Собирается один раз при импорте в неизменяемый
+# структурированный массив numpy вместе с постоянными Пенга — Робинсона; запрос только выбирает из
+# нее строки. Новый компонент — новая строка в COMPONENT_DATA: форма, расчет и фазовая диаграмма
+# берут его отсюда.
+
+# Свойства компонента по порядку столбцов COMPONENT_DATA:
+# Tc — критическая температура, K; Pc — критическое давление, бар; omega — ацентрический фактор;
+# M — молярная масса, г/моль; A, B — вязкость жидкости (уравнение Андраде);
+# cp_A..cp_E — теплоемкость газа (Шомейт), Дж/моль/К; cp_b — наклон теплоемкости жидкости;
+# cp_liquid_25C — теплоемкость жидкости при 25 °C, Дж/кг/К
+PROPERTY_FIELDS = ('Tc', 'Pc', 'omega', 'M', 'A', 'B', 'cp_A', 'cp_B', 'cp_C', 'cp_D', 'cp_E', 'cp_b',
+                   'cp_liquid_25C')
+# Постоянные Пенга — Робинсона, считаются по свойствам при сборке таблицы
+DERIVED_FIELDS = ('a', 'b', 'm', 'Vc')
+
+COMPONENT_DATA = [
+    # name, placeholder, Tc, Pc, omega, M, A, B, cp_A, cp_B, cp_C, cp_D, cp_E, cp_b, cp_liquid_25C
+    ('methane', 'Метан (CH₄)', 190.6, 45.99, 0.008, 16.04, 0.01678, 99, -0.70, 108.48, -42.52, 5.86, 0.68, None, 3400),
+    ('ethane', 'Этан (C₂H₆)', 305.3, 48.72, 0.099, 30.07, 0.0713, 147.1, 5.41, 103.22, -38.12, 4.12, 0.56, None, 2400),
+    ('propane', 'Пропан (C₃H₈)', 369.8, 42.48, 0.152, 44.10, 0.1114, 177.7, 8.39, 90.84, -26.73, 2.52, 0.49, 2.3, 2300),
+    ('n_butane', 'н-Бутан (n-C₄H₁₀)', 425.2, 37.96, 0.200, 58.12, 0.1415, 203, 10.11, 84.77, -22.45, 1.94, 0.46, 1.9,
+     2200),
+    ('i_butane', 'и-Бутан (i-C₄H₁₀)', 408.1, 36.48, 0.184, 58.12, 0.1415, 203, 10.00, 85.30, -22.70, 2.00, 0.46, 1.95,
+     2100),
+    ('n_pentane', 'н-Пентан (n-C₅H₁₂)', 469.7, 33.70, 0.251, 72.15, 0.1697, 222, 11.50, 76.80, -18.45, 1.60, 0.43, 1.8,
+     2200),
+    ('i_pentane', 'и-Пентан (i-C₅H₁₂)', 460.4, 33.82, 0.227, 72.15, 0.1697, 222, 11.30, 77.20, -18.60, 1.58, 0.43, 1.75,
+     2200),
+    ('hexane', 'Гексан (C₆H₁₄)', 507.4, 30.25, 0.301, 86.18, 0.207, 244, 13.10, 68.50, -14.00, 1.25, 0.41, 1.6, 2300),
+    ('co2', 'CO₂ (углекислый газ)', 304.2, 73.8, 0.225, 44.01, 0.028, 120, 25.00, 55.19, -33.69, 7.95, -0.14, None,
+     2100),
+    ('oxygen', 'O₂ (кислород)', 154.6, 50.43, 0.021, 32.00, 0.018, 120, 29.10, -0.191, 0.4003, -0.8704, 0.069, None,
+     2100),
+    ('h2s', 'H₂S (сероводород)', 373.2, 89.4, 0.100, 34.08, 0.05, 150, 6.43, 4.46, 0.82, -0.81, 0.03, None, 1950),
+    ('n2', 'N₂ (азот)', 126.2, 33.9, 0.040, 28.01, 0.015, 90, 28.90, -0.16, 0.81, -0.20, 0.04, None, 2100),
+    ('h2o', 'H₂O (вода)', 647.1, 220.6, 0.344, 18.02, 0.0029, 1420, -203.60, 1523.30, -3196.40, 2474.50, 3.86, -0.09,
+     4180),
+    ('nacl', 'NaCl (раствор)', None, None, None, 58.44, 0.00035, 600, None, None, None, None, None, 0.1, 3900),
+    ('asphaltenes', 'Асфальтены (асф,)', 703.8330763, 10.83585775, 0.9, 200.0, 0, 0, None, None, None, None, None, None,
+     2200),
+    ('solids', 'Механические примеси', None, None, None, None, 0, 0, None, None, None, None, None, None, None),
+    ('c6plus', 'C6+ (тяжёлые фракции)', 562.4225915, 24.2698538, 0.35, 220.0, 0.2, 600, None, None, None, None, None,
+     None, 2800),
+    ('pseudo1', 'Псевдокомпонент 1', None, None, None, None, None, None, None, None, None, None, None, None, None),
+    ('pseudo2', 'Псевдокомпонент 2', None, None, None, None, None, None, None, None, None, None, None, None, None),
+]
+# Тяжелые фракции: Tc и Pc пересчитываются по молярной массе
+HEAVY_FRACTIONS = ('asphaltenes', 'c6plus')
+
+COMPONENT_DTYPE = np.dtype([('name', 'U32'), ('placeholder', 'U64')] +
+                           [(field, 'f8') for field in PROPERTY_FIELDS + DERIVED_FIELDS])
+
+
+def heavy_fraction_critical(M):
+    """Tc, K и Pc, бар тяжелой фракции по молярной массе"""
+    ln_M = math.log(M)
+    Tc = round(19.25 * (ln_M ** 2) + 44.06 * ln_M - 70, 1)
+    return Tc, round((7.77 - 9.5e-3 * Tc) * 10, 2)
+
+
+def build_table(data=COMPONENT_DATA):
+    """Неизменяемая таблица компонентов: незаданные свойства — NaN (коэффициенты теплоемкости — 0)"""
+    table = np.zeros(len(data), dtype=COMPONENT_DTYPE)
+    for row, (name, placeholder, *values) in zip(table, data):
+        row['name'], row['placeholder'] = name, placeholder
+        for field, value in zip(PROPERTY_FIELDS, values):
+            row[field] = (0 if field in CP_FIELDS else np.nan) if value is None else value
+        if name in HEAVY_FRACTIONS and row['M'] > 0:
+            row['Tc'], row['Pc'] = heavy_fraction_critical(row['M'])
+
+    with np.errstate(all='ignore'):
+        for field, values in peng_robinson(table).items():
+            table[field] = values
+    table.flags.writeable = False
+    return table
+
+
+COMPONENTS = build_table()
+# Номер строки компонента по имени поля формы
+COMPONENT_INDEX = {name: i for i, name in enumerate(COMPONENTS['name'].tolist())}
+# Поля формы: (name, placeholder)
+FORM_COMPONENTS = tuple(zip(COMPONENTS['name'].tolist(), COMPONENTS['placeholder'].tolist()))
+
+# Диапазон температур фазовой диаграммы, К: по критическим температурам всех компонентов с ограничением
+PHASE_T_MIN = max(float(np.nanmin(COMPONENTS['Tc'])) - 100, 100)
+PHASE_T_MAX = min(float(np.nanmax(COMPONENTS['Tc'])) + 50, 1000)
+
+
+def mixture(composition):
+    """Свойства компонентов состава ((name, мольная доля), ...) массивами для kernel.flash"""
+    try:
+        rows = [COMPONENT_INDEX[name] for name, _ in composition]
+    except KeyError as e:
+        raise ValueError(f"Неизвестный компонент: {e.args[0]}")
+    return component_arrays(COMPONENTS[rows], [fraction for _, fraction in composition])
@@ -0,0 +1,140 @@
+import csv
+import io
+import zipfile
+
+import numpy as np
+
+from . import kernel
+from .components import mixture
+
+# Таблицы свойств смеси на сетке напор × температура для расчета насосов. Строка таблицы —
+# одна температура; блок строк считается одним вызовом kernel.flash в текущем процессе, строки
+# отдаются по порядку по мере готовности. Из выгруженной таблицы (NPZ) свойства для
+# TwinScrew.calculate берутся интерполяцией (lookup).
+
+# Свойства смеси в таблице: поле таблицы — поле результата kernel.flash
+GRID_PROPERTIES = {'density': 'density_mix', 'viscosity': 'viscosity_mix', 'heat_capacity': 'heat_capacity_mix'}
+GRID_COLUMNS = ('pressure', 'temperature') + tuple(GRID_PROPERTIES)
+# Точек по оси: по умолчанию и наибольшее; ячеек во всей таблице не больше GRID_CELLS_MAX
+GRID_POINTS = 50
+GRID_POINTS_MAX = 1000
+GRID_CELLS_MAX = 200_000
+# Состояний в одном вызове kernel.flash: ограничивает память и задержку до первого куска CSV
+GRID_BLOCK_CELLS = 20_000
+# Значащих цифр в CSV
+GRID_DIGITS = 6
+GRID_NPZ = 'multiphase_grid.npz'
+
+
+def axis(start, stop, num=GRID_POINTS):
+    """Значения оси сетки: num точек от start до stop включительно"""
+    if not (np.isfinite(start) and np.isfinite(stop)) or stop < start:
+        raise ValueError(f"некорректный диапазон {start}…{stop}")
+    if not 1 <= num <= GRID_POINTS_MAX:
+        raise ValueError(f"точек по оси должно быть от 1 до {GRID_POINTS_MAX}")
+    return np.linspace(start, stop, num)
+
+
+def check_size(pressures, temperatures):
+    """Ошибка, если таблица больше GRID_CELLS_MAX ячеек"""
+    if len(pressures) * len(temperatures) > GRID_CELLS_MAX:
+        raise ValueError(f"ячеек в таблице больше {GRID_CELLS_MAX}")
+
+
+def property_block(composition, pressures, temperatures):
+    """Свойства GRID_PROPERTIES, температуры × напоры: temperatures, С; pressures, м.
+
+    Давление и температура переводятся и округляются так же, как в views.calc.
+    """
+    comp = mixture(composition)
+    state = kernel.flash(comp, np.round(np.asarray(pressures, dtype=float) * 0.098067, 2)[None, :],
+                         np.round(np.asarray(temperatures, dtype=float) + 273.15, 2)[:, None])
+    return {name: state[key] for name, key in GRID_PROPERTIES.items()}
+
+
+def property_rows(composition, pressures, temperatures):
+    """Свойства по строкам температуры по порядку; генератор, блоки по GRID_BLOCK_CELLS состояний"""
+    rows_per_block = max(1, GRID_BLOCK_CELLS // max(len(pressures), 1))
+    for start in range(0, len(temperatures), rows_per_block):
+        block = property_block(composition, pressures, temperatures[start:start + rows_per_block])
+        for i in range(len(block['density'])):
+            yield {name: values[i] for name, values in block.items()}
+
+
+def property_grid(composition, pressures, temperatures):
+    """Таблица свойств: оси pressure, temperature и массивы температуры × напоры для GRID_PROPERTIES"""
+    rows = list(property_rows(composition, pressures, temperatures))
+    return {
+        'pressure': np.asarray(pressures, dtype=float),
+        'temperature': np.asarray(temperatures, dtype=float),
+        **{name: np.array([row[name] for row in rows]).reshape(len(temperatures), len(pressures))
+           for name in GRID_PROPERTIES},
+    }
+
+
+def number(value):
+    """Число для CSV; нет решения — пустое поле"""
+    return f"{value:.{GRID_DIGITS}g}" if np.isfinite(value) else ''
+
+
+def csv_chunks(composition, pressures, temperatures):
+    """CSV (разделитель ;) с заголовком GRID_COLUMNS, по куску на строку температуры"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=';')
+    writer.writerow(GRID_COLUMNS)
+    for temperature, row in zip(temperatures, property_rows(composition, pressures, temperatures)):
+        columns = [row[name] for name in GRID_PROPERTIES]
+        writer.writerows([number(pressure), number(temperature), *(number(values[i]) for values in columns)]
+                         for i, pressure in enumerate(pressures))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def write_npz(buffer, grid, composition):
+    """Таблица property_grid в сжатый NPZ вместе с составом (components, fractions); возвращает имя файла"""
+    names, fractions = zip(*composition)
+    np.savez_compressed(buffer, **grid, components=np.array(names), fractions=np.array(fractions))
+    return GRID_NPZ
+
+
+def load_grid(file):
+    """Таблица из NPZ, записанного write_npz"""
+    try:
+        with np.load(file, allow_pickle=False) as data:
+            grid = {field: data[field] for field in GRID_COLUMNS if field in data.files}
+    except (OSError, EOFError, TypeError, ValueError, zipfile.BadZipFile):
+        raise ValueError("файл не является таблицей свойств NPZ")
+    missing = [field for field in GRID_COLUMNS if field not in grid]
+    if missing:
+        raise ValueError(f"в таблице нет полей: {', '.join(missing)}")
+    shape = (len(grid['temperature']), len(grid['pressure']))
+    if any(grid[name].shape != shape for name in GRID_PROPERTIES):
+        raise ValueError("размеры таблицы не совпадают с осями")
+    return grid
+
+
+def axis_weights(values, x):
+    """Узлы оси values вокруг x и доля расстояния до правого узла"""
+    if not values[0] <= x <= values[-1]:
+        raise ValueError(f"значение {x} вне диапазона таблицы {values[0]}…{values[-1]}")
+    left = min(int(np.searchsorted(values, x, side='right')) - 1, max(len(values) - 2, 0))
+    right = min(left + 1, len(values) - 1)
+    span = values[right] - values[left]
+    return left, right, (x - values[left]) / span if span else 0.0
+
+
+def lookup(grid, pressure, temperature):
+    """Свойства GRID_PROPERTIES в точке (напор, м; температура, С) билинейной интерполяцией по таблице"""
+    p0, p1, wp = axis_weights(grid['pressure'], pressure)
+    t0, t1, wt = axis_weights(grid['temperature'], temperature)
+    # Узлы с нулевым весом не участвуют: точка на краю области без решения остается определенной
+    corners = [((t, p), weight) for t, p, weight in ((t0, p0, (1 - wt) * (1 - wp)), (t0, p1, (1 - wt) * wp),
+                                                     (t1, p0, wt * (1 - wp)), (t1, p1, wt * wp)) if weight]
+    properties = {}
+    for name in GRID_PROPERTIES:
+        value = sum(grid[name][node] * weight for node, weight in corners)
+        if not np.isfinite(value):
+            raise ValueError(f"в таблице нет значения {name} при напоре {pressure} м и температуре {temperature} С")
+        properties[name] = float(value)
+    return properties
@@ -0,0 +1,240 @@
+import numpy as np
+
+# Расчет свойств многофазной смеси по уравнению Пенга — Робинсона массивами numpy: компоненты — по
+# последней оси, состояния (давление, температура) — по остальным. Повторяет calc(): константы
+# равновесия по Вильсону, уравнение Рачфорда — Райса, корни кубического уравнения Z, плотность,
+# вязкость и теплоемкость фаз. Состояния, где скалярный расчет падает с исключением, дают NaN.
+
+R = 8.314
+# Без этих свойств расчет компонента невозможен
+REQUIRED_FIELDS = ('Tc', 'Pc', 'omega', 'M', 'A', 'B')
+# Коэффициенты теплоемкости; незаданные равны нулю
+CP_FIELDS = ('cp_A', 'cp_B', 'cp_C', 'cp_D', 'cp_E', 'cp_b', 'cp_liquid_25C')
+# Область поиска давления насыщения, бар; за ее пределами значение считается нереалистичным
+P_SAT_BOUNDS = (0.1, 5000)
+# Границы мольной доли газа, как у brentq в calc(); за ними корня нет и берется ближайшая граница
+RR_BOUNDS = (1e-6, 1 - 1e-6)
+RR_XTOL = 2e-12
+RR_MAXITER = 100
+
+
+def component_arrays(table, z):
+    """Свойства выбранных строк таблицы компонентов (components.COMPONENTS) массивами по полям и мольные доли z"""
+    if not len(table):
+        raise ValueError("Не указаны компоненты смеси")
+    arrays = {field: np.ascontiguousarray(table[field]) for field in table.dtype.names}
+    arrays['name'] = tuple(table['name'].tolist())
+    arrays['z'] = np.asarray(z, dtype=float)
+    missing = [name for i, name in enumerate(arrays['name'])
+               if any(np.isnan(arrays[field][i]) for field in REQUIRED_FIELDS)]
+    if missing:
+        raise ValueError(f"Нет свойств для расчета компонентов: {', '.join(missing)}")
+    return arrays
+
+
+def peng_robinson(comp):
+    """Постоянные Пенга — Робинсона компонентов: a_i, b_i, m_i и критический объем.
+
+    Для таблицы компонентов считаются один раз при ее сборке; flash берет их из comp.
+    """
+    Tc, Pc = comp['Tc'], comp['Pc'] * 100000
+    return {
+        'a': 0.45725 * R ** 2 * Tc ** 2 / Pc,
+        'b': 0.0778 * R * Tc / Pc,
+        'm': 0.37464 + 1.54226 * comp['omega'] - 0.26992 * comp['omega'] ** 2,
+        'Vc': R * Tc / Pc,
+    }
+
+
+def wilson_k(comp, pressure_bar, temperature_k):
+    """Константы равновесия K_i по Вильсону, состояния × компоненты"""
+    pressure_bar = np.asarray(pressure_bar, dtype=float)[..., None]
+    temperature_k = np.asarray(temperature_k, dtype=float)[..., None]
+    return comp['Pc'] / pressure_bar * np.exp(5.37 * (1 + comp['omega']) * (1 - comp['Tc'] / temperature_k))
+
+
+def saturation_pressure(comp, temperature_k, bounds=P_SAT_BOUNDS):
+    """Давление насыщения (начала кипения) по Вильсону, бар, для массива температур (К).
+
+    Условие Σ z_i·(K_i − 1) = 0 при K_i = Pc_i / P · exp(...) линейно по 1/P, поэтому корень
+    явный: P = Σ z_i·Pc_i·exp(...) / Σ z_i — итерации и продолжение по температуре не нужны.
+    Показатель экспоненты ограничен [-100, 700], как в прежнем поиске. Вне bounds — NaN.
+    """
+    T = np.asarray(temperature_k, dtype=float)[..., None]
+    with np.errstate(all='ignore'):
+        exponent = np.clip(5.37 * (1 + comp['omega']) * (1 - comp['Tc'] / T), -100, 700)
+        P_sat = (comp['z'] * comp['Pc'] * np.exp(exponent)).sum(axis=-1) / comp['z'].sum()
+    return np.where((P_sat > bounds[0]) & (P_sat < bounds[1]), P_sat, np.nan)
+
+
+def rachford_rice(z, K, bounds=RR_BOUNDS, xtol=RR_XTOL, maxiter=RR_MAXITER):
+    """Мольная доля газа из уравнения Рачфорда — Райса для всех состояний сразу.
+
+    На отрезке bounds функция монотонно убывает и не имеет полюсов, поэтому метод Ньютона идет
+    внутри отрезка, сужая его; шаг за границы отрезка заменяется делением пополам. Если корня
+    на отрезке нет, результат — ближайшая к корню граница. Вызывать под np.errstate: для
+    состояний без решения деления на ноль ожидаемы.
+    """
+    K_1 = K - 1
+
+    def objective(y):
+        return (z * K_1 / (1 + y[..., None] * K_1)).sum(axis=-1)
+
+    shape = K.shape[:-1]
+    low, high = np.full(shape, bounds[0]), np.full(shape, bounds[1])
+    f_low, f_high = objective(low), objective(high)
+
+    vapor = np.where(f_low <= 0, low, high)
+    todo = (f_low > 0) & (f_high < 0)
+    y = (low + high) / 2
+    for _ in range(maxiter):
+        if not todo.any():
+            break
+        terms = K_1 / (1 + y[..., None] * K_1)
+        z_terms = z * terms
+        f = z_terms.sum(axis=-1)
+        df = (z_terms * terms).sum(axis=-1)
+        positive = f > 0
+        low = np.where(positive, y, low)
+        high = np.where(positive, high, y)
+        step = y + f / df
+        step = np.where((step > low) & (step < high), step, (low + high) / 2)
+        root = f == 0
+        converged = todo & (root | (np.abs(step - y) < xtol))
+        vapor = np.where(converged, np.where(root, y, step), vapor)
+        todo &= ~converged
+        y = step
+    return np.where(todo, y, vapor)
+
+
+def cubic_roots(C2, C1, C0):
+    """Вещественные корни Z³ + C2·Z² + C1·Z + C0 = 0 по формуле Кардано, как solve_cubic в calc().
+
+    Результат — состояния × 3, на месте комплексных корней NaN.
+    """
+    b, c, d = (np.asarray(value, dtype=float) for value in (C2, C1, C0))
+    p = c - b ** 2 / 3
+    q = (2 * b ** 3 - 9 * b * c + 27 * d) / 27
+    shift = -b / 3
+    D = (q / 2) ** 2 + (p / 3) ** 3  # дискриминант
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Один действительный и два комплексных корня (вещественные, только если u = v)
+        sqrt_D = np.sqrt(np.where(D > 0, D, 0))
+        u = np.cbrt(-q / 2 + sqrt_D)
+        v = np.cbrt(-q / 2 - sqrt_D)
+        pair = np.where(u == v, -0.5 * (u + v) + shift, np.nan)
+        one = np.stack([u + v + shift, pair, pair], axis=-1)
+
+        # Все корни вещественные, по крайней мере два совпадают
+        w = np.cbrt(-q / 2)
+        double = np.stack([2 * w + shift, -w + shift, -w + shift], axis=-1)
+
+        # Три различных вещественных корня
+        r = np.sqrt(-p / 3)
+        phi = np.arccos(np.clip(-q / (2 * r ** 3), -1, 1))
+        three = np.stack([2 * r * np.cos((phi + k * 2 * np.pi) / 3) + shift for k in range(3)], axis=-1)
+
+    D = D[..., None]
+    return np.where(D > 0, one, np.where(np.abs(D) < 1e-12, double, three))
+
+
+def compressibility(A, B):
+    """Коэффициенты сжимаемости жидкости и газа; A, B — по последней оси (жидкость, газ).
+
+    Для жидкости — наименьший положительный корень уравнения Пенга — Робинсона, для газа — наибольший.
+    """
+    roots = cubic_roots(-(1 - B), A - 3 * B ** 2 - 2 * B, -(A * B - B ** 2 - B ** 3))
+    roots = np.where(roots > 0, roots, np.nan)
+    return np.fmin.reduce(roots[..., 0, :], axis=-1), np.fmax.reduce(roots[..., 1, :], axis=-1)
+
+
+def flash(comp, pressure_bar, temperature_k):
+    """Свойства фаз и смеси для массивов давления (бар) и температуры (К) одной формы.
+
+    comp — результат component_arrays. Поля результата имеют форму состояний; составы фаз x, y —
+    состояния × компоненты.
+    """
+    pressure_bar, temperature_k = np.broadcast_arrays(np.asarray(pressure_bar, dtype=float),
+                                                      np.asarray(temperature_k, dtype=float))
+    z, M = comp['z'], comp['M']
+    P = pressure_bar * 100000
+    T = temperature_k[..., None]
+
+    with np.errstate(all='ignore'):
+        K = wilson_k(comp, pressure_bar, temperature_k)
+        mol_gas = rachford_rice(z, K)
+        mol_liquid = 1 - mol_gas
+
+        mol_liquid_i = z / (1 + mol_gas[..., None] * (K - 1))
+        mol_gas_i = K * mol_liquid_i
+
+        # Расчет коэффициента сжимаемости; a_mix = x·sqrt(aα ⊗ aα)·x = (x·sqrt(aα))²
+        alpha = (1 + comp['m'] * (1 - np.sqrt(T / comp['Tc']))) ** 2
+        sqrt_a_alpha = np.sqrt(comp['a'] * alpha)
+        a_mix_liquid = (mol_liquid_i * sqrt_a_alpha).sum(axis=-1) ** 2
+        a_mix_gas = (mol_gas_i * sqrt_a_alpha).sum(axis=-1) ** 2
+        b_mix_liquid = mol_liquid_i @ comp['b']
+        b_mix_gas = mol_gas_i @ comp['b']
+
+        RT = R * temperature_k
+        a_mix = np.stack([a_mix_liquid, a_mix_gas], axis=-1)
+        b_mix = np.stack([b_mix_liquid, b_mix_gas], axis=-1)
+        Z_liquid, Z_gas = compressibility(a_mix * (P / RT ** 2)[..., None], b_mix * (P / RT)[..., None])
+
+        mol_mass_liquid = mol_liquid_i @ M
+        mol_mass_gas = mol_gas_i @ M
+
+        mol_vol_liquid = Z_liquid * RT / P
+        mol_vol_gas = Z_gas * RT / P
+
+        vol_gas_i = mol_gas_i * mol_vol_gas[..., None] / (
+            mol_gas_i * mol_vol_gas[..., None] + mol_liquid_i * mol_vol_liquid[..., None])
+        vol_liquid_i = 1 - vol_gas_i
+
+        vol_gas = mol_gas * mol_vol_gas / (mol_gas * mol_vol_gas + mol_liquid * mol_vol_liquid)
+        vol_liquid = 1 - vol_gas
+
+        density_liquid = P * mol_mass_liquid / (Z_liquid * RT) / 1000
+        density_gas = P * mol_mass_gas / (Z_gas * RT) / 1000
+        density_mix = vol_liquid * density_liquid + vol_gas * density_gas
+
+        #  Расчет вязкости
+        T_red = T / comp['Tc']
+        omega_i = 1.16145 * T_red ** (-0.14874) + 0.52487 * np.exp(-0.7732 * T_red) + 2.16178 * np.exp(
+            -2.43787 * T_red)
+        viscosity_gas_i = 40.785 / 100000 * np.sqrt(M * T) / (comp['Vc'] ** (2 / 3)) * omega_i
+        viscosity_liquid_i = comp['A'] * np.exp(comp['B'] / T) / 0.001
+
+        viscosity_liquid = (vol_liquid_i * viscosity_liquid_i * 0.001).sum(axis=-1)
+        viscosity_gas = np.exp((mol_gas_i * np.log(viscosity_gas_i)).sum(axis=-1)) * 0.001
+        viscosity_mix = np.where(
+            viscosity_liquid / viscosity_gas > 5,
+            np.exp(vol_gas * np.log(viscosity_gas) + vol_liquid * np.log(viscosity_liquid)),
+            vol_gas * viscosity_gas + vol_liquid * viscosity_liquid)
+
+        # Теплоемкость
+        t = T / 1000
+        heat_capacity_liquid_i = comp['cp_liquid_25C'] + comp['cp_b'] * (T - 273.15)
+        heat_capacity_gas_i = 1000 * (comp['cp_A'] + comp['cp_B'] * t + comp['cp_C'] * t ** 2 + comp['cp_D'] * t ** 3 +
+                                      comp['cp_E'] / t ** 2) / M
+
+        mass_gas_i = M * mol_gas_i / mol_mass_gas[..., None]
+        mass_liquid_i = M * mol_liquid_i / mol_mass_liquid[..., None]
+
+        heat_capacity_liquid = (mass_liquid_i * heat_capacity_liquid_i).sum(axis=-1)
+        heat_capacity_gas = (mass_gas_i * heat_capacity_gas_i).sum(axis=-1)
+
+        mass_gas = vol_gas * density_gas / (vol_gas * density_gas + vol_liquid * density_liquid)
+        mass_liquid = 1 - mass_gas
+        heat_capacity_mix = mass_liquid * heat_capacity_liquid + mass_gas * heat_capacity_gas
+
+    return {
+        'mol_gas': mol_gas, 'x': mol_liquid_i, 'y': mol_gas_i,
+        'Z_liquid': Z_liquid, 'Z_gas': Z_gas,
+        'density_liquid': density_liquid, 'density_gas': density_gas, 'density_mix': density_mix,
+        'viscosity_liquid': viscosity_liquid, 'viscosity_gas': viscosity_gas, 'viscosity_mix': viscosity_mix,
+        'heat_capacity_liquid': heat_capacity_liquid, 'heat_capacity_gas': heat_capacity_gas,
+        'heat_capacity_mix': heat_capacity_mix,
+        'mass_gas': mass_gas, 'mass_liquid': mass_liquid, 'vol_gas': vol_gas, 'vol_liquid': vol_liquid,
+    }
@@ -1,3 +1,114 @@
-from django.test import TestCase
+import math
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase
+
+from . import kernel
+from .components import mixture
+from .views import calc
+
+# Эталонные значения посчитаны прежним скалярным calc() (brentq по уравнению Рачфорда — Райса,
+# minimize_scalar для давления насыщения). Поля — как в результате calc: жидкость, газ, смесь.
+TWO_PHASE = [
+    ((('methane', 0.5), ('propane', 0.3), ('hexane', 0.2)), 500, 20, {
+        'density': [585.7254750730531, 43.44892351455329, 156.0907891836232],
+        'viscosity': [0.5840980068167265, 0.00761185878938954, 0.01875178053883817],
+        'heat_capasity': [2382.7322596674458, 1935.7086994616482, 2284.147298855899],
+        'compression_koef': [0.19061157080075458, 0.8552750217565046],
+        'mass_fraction': [77.94636131344822, 22.05363868655178, 100],
+        'volume_fraction': [20.772033263348344, 79.22796673665165, 100],
+        'P_sat': 155.32118275608133,
+    }),
+    ((('methane', 0.5), ('propane', 0.3), ('hexane', 0.2)), 2000, 80, {
+        'density': [488.0316000491258, 138.02025676589278, 366.1030130231574],
+        'viscosity': [0.5644836123714367, 0.007704263938592363, 0.1264721824314427],
+        'heat_capasity': [2559.405954857119, 2127.5399153152935, 2502.6891177916687],
+        'compression_koef': [0.6367521401875236, 0.8694457644184386],
+        'mass_fraction': [86.8670300805263, 13.13296991947369, 100],
+        'volume_fraction': [65.16438985027338, 34.835610149726634, 100],
+        'P_sat': 287.57417647363025,
+    }),
+]
+# Корня уравнения Рачфорда — Райса нет (все K_i > 1 или все K_i < 1): прежний расчет искал
+# минимум |f| и останавливался около границы, ядро берет саму границу. Доля второй фазы
+# ничтожна, поэтому свойства фаз и смеси совпадают с точностью NO_ROOT_RTOL, а доли фаз — нет.
+NO_ROOT_RTOL = 1e-4
+NO_ROOT = [
+    # Все K_i > 1: практически один газ
+    ((('methane', 0.7), ('ethane', 0.2), ('co2', 0.1)), 300, 40, 1 - 1e-6, {
+        'density': [10862.621470747457, 26.75219192553014, 26.75224314398719],
+        'viscosity': [4.633144895220657e-05, 0.008420316291297606, 0.008420316251715864],
+        'heat_capasity': [2478.4386965095423, 1714.0245755090343, 1714.0260426298476],
+        'compression_koef': [0.0005668974454866027, 0.914199116035177],
+        'P_sat': 287.96367507331047,
+    }),
+    # Все K_i < 1: практически одна жидкость; давление насыщения ниже P_SAT_BOUNDS
+    ((('hexane', 0.5), ('c6plus', 0.5)), 500, 0, 1e-6, {
+        'density': [420.85714876474884, 0.1437141840908254, 420.8542318739236],
+        'viscosity': [2.303602743139672, 0.0010018546645094541, 2.303479122262391],
+        'heat_capasity': [2659.265792213164, 420.35552473210987, 2659.2657869124005],
+        'compression_koef': [0.7853534320701917, 1.000178998073083],
+        'P_sat': None,
+    }),
+]
+PROPERTY_FIELDS = ('density', 'viscosity', 'heat_capasity', 'compression_koef')
+
+
+class CalcBaselineTests(SimpleTestCase):
+    """calc на ядре kernel.flash совпадает с прежним скалярным расчетом"""
+
+    def assert_p_sat(self, result, expected):
+        if expected is None:
+            self.assertIsNone(result)
+        else:
+            self.assertTrue(math.isclose(result, expected, rel_tol=1e-6), (result, expected))
+
+    def test_two_phase(self):
+        for composition, pressure, temperature, expected in TWO_PHASE:
+            with self.subTest(composition=composition, pressure=pressure, temperature=temperature):
+                result = calc(pressure, temperature, composition)
+                for field in PROPERTY_FIELDS + ('mass_fraction', 'volume_fraction'):
+                    np.testing.assert_allclose(result[field], expected[field], rtol=1e-9, err_msg=field)
+                self.assert_p_sat(result['P_sat'], expected['P_sat'])
+
+    def test_no_root(self):
+        for composition, pressure, temperature, bound, expected in NO_ROOT:
+            with self.subTest(composition=composition, pressure=pressure, temperature=temperature):
+                result = calc(pressure, temperature, composition)
+                for field in PROPERTY_FIELDS:
+                    np.testing.assert_allclose(result[field], expected[field], rtol=NO_ROOT_RTOL, err_msg=field)
+                self.assert_p_sat(result['P_sat'], expected['P_sat'])
+
+                state = kernel.flash(mixture(composition), round(pressure * 0.098067, 2),
+                                     round(temperature + 273.15, 2))
+                self.assertEqual(state['mol_gas'].item(), bound)
+
+
+class KernelTests(SimpleTestCase):
+    def test_rachford_rice_without_root_takes_bound(self):
+        z = np.array([0.5, 0.5])
+        with np.errstate(all='ignore'):
+            vapor = kernel.rachford_rice(z, np.array([[2.0, 3.0], [0.2, 0.5]]))
+        np.testing.assert_array_equal(vapor, [kernel.RR_BOUNDS[1], kernel.RR_BOUNDS[0]])
+
+    def test_saturation_pressure_out_of_bounds(self):
+        comp = mixture((('hexane', 0.5), ('c6plus', 0.5)))
+        P_sat = kernel.saturation_pressure(comp, np.array([273.15, 353.15]))
+        self.assertTrue(np.isnan(P_sat[0]))
+        self.assertTrue(kernel.P_SAT_BOUNDS[0] < P_sat[1] < kernel.P_SAT_BOUNDS[1])
+
+    def test_flash_grid_matches_single_states(self):
+        comp = mixture((('methane', 0.5), ('propane', 0.3), ('hexane', 0.2)))
+        pressures = np.array([49.03, 196.13])
+        temperatures = np.array([293.15, 353.15])
+        grid = kernel.flash(comp, pressures[None, :], temperatures[:, None])
+        for i, temperature in enumerate(temperatures):
+            for j, pressure in enumerate(pressures):
+                single = kernel.flash(comp, pressure, temperature)
+                for key in ('mol_gas', 'density_mix', 'viscosity_mix', 'heat_capacity_mix'):
+                    # Порядок суммирования numpy зависит от формы массива: расхождение в последнем знаке
+                    np.testing.assert_allclose(grid[key][i, j], single[key].item(), rtol=1e-12, err_msg=key)
+
+    def test_missing_properties(self):
+        with self.assertRaises(ValueError):
+            mixture((('methane', 0.9), ('nacl', 0.1)))
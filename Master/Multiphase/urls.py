@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('', views.multiphase, name='multiphase'),
+    path('grid/', views.multiphase_grid, name='multiphase_grid'),
 ]
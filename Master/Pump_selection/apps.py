@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PumpSelectionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Pump_selection'
+
+    def ready(self):
+        from . import signals  # noqa: F401  подключение обработчиков изменений каталога
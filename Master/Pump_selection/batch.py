@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+
+import numpy as np
+
+from .models import Pumps
+from .selection import (POINT_FIELDS, REQUIRED_FIELDS, TOTAL_CRITERIA, catalogue_snapshot, duty_points, rank_pumps,
+                        to_float, user_vector)
+
+# Пакетный подбор: список точек (CSV или JSON с полями user_data) оценивается по всему каталогу
+# блоками точки × насосы, результат отдается построчно по мере готовности.
+
+# Пар точка-насос в одном блоке расчета; ограничивает память на больших каталогах
+BATCH_PAIRS = 250_000
+BATCH_COLUMNS = ('point', 'flow_rate', 'pressure', 'rank', 'pump', 'family', 'score', 'total', 'duty_flow_rate',
+                 'duty_pressure', 'bep_deviation', 'duty_power', 'matched', 'error')
+
+
+def read_points(text, fmt='csv'):
+    """Точки подбора из текста: JSON-список (или {"points": [...]}) либо CSV с заголовком, разделитель , или ;"""
+    if fmt == 'json':
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = data.get('points', [])
+        if not isinstance(data, list) or not all(isinstance(point, dict) for point in data):
+            raise ValueError("ожидается список объектов с полями точки подбора")
+        return data
+    text = text.lstrip('\ufeff')  # BOM от Excel
+    header = text.split('\n', 1)[0]
+    delimiter = ';' if header.count(';') > header.count(',') else ','
+    return list(csv.DictReader(io.StringIO(text), delimiter=delimiter))
+
+
+def parse_point(raw):
+    """user_data из словаря строк или чисел и список незаполненных обязательных полей"""
+    point = {field: to_float(raw.get(field)) for field in POINT_FIELDS}
+    missing = [name for field, name in REQUIRED_FIELDS.items() if point[field] is None]
+    return point, missing
+
+
+def rounded(value, digits=2):
+    """Число для вывода; рабочей точки нет — None"""
+    return round(float(value), digits) if np.isfinite(value) else None
+
+
+def select_batch(raw_points, limit=3, catalogue=None):
+    """Строки результата подбора (BATCH_COLUMNS) для всех точек по порядку; генератор"""
+    catalogue = catalogue if catalogue is not None else catalogue_snapshot()
+    parsed = [parse_point(raw) for raw in raw_points]
+    chunk = max(1, BATCH_PAIRS // max(len(catalogue['pk']), 1))
+
+    for start in range(0, len(parsed), chunk):
+        block = parsed[start:start + chunk]
+        valid = [i for i, (_, missing) in enumerate(block) if not missing]
+        ranked = {}
+        if valid:
+            points = [block[i][0] for i in valid]
+            users = np.array([user_vector(point) for point in points])[:, None, :]
+            score = ((catalogue['low'] <= users) & (users <= catalogue['high'])).sum(axis=-1)
+            duty = duty_points(catalogue, [point['flow_rate'] for point in points],
+                               [point['pressure'] for point in points], [point['density'] for point in points])
+            order, eligible = rank_pumps(score, duty)
+            top = order[:, :limit]
+            keep = np.take_along_axis(eligible, top, axis=-1)
+            pumps = Pumps.objects.select_related('family').in_bulk(np.unique(catalogue['pk'][top[keep]]).tolist())
+            for row, i in enumerate(valid):
+                ranked[i] = row, [(index, pumps.get(int(catalogue['pk'][index])))
+                                  for index in top[row][keep[row]]]
+
+        for i, (point, missing) in enumerate(block):
+            base = {'point': start + i + 1, 'flow_rate': point['flow_rate'], 'pressure': point['pressure']}
+            if missing:
+                yield {**base, 'error': f"Некорректные значения для: {', '.join(missing)}"}
+                continue
+            row, candidates = ranked[i]
+            found = [(index, pump) for index, pump in candidates if pump is not None]
+            if not found:
+                yield {**base, 'error': "Подходящих насосов нет"}
+                continue
+            for rank, (index, pump) in enumerate(found, start=1):
+                yield {
+                    **base,
+                    'rank': rank,
+                    'pump': pump.name,
+                    'family': pump.family.name,
+                    'score': int(score[row, index]),
+                    'total': TOTAL_CRITERIA,
+                    'duty_flow_rate': rounded(duty['flow_rate'][row, index]),
+                    'duty_pressure': rounded(duty['pressure'][row, index]),
+                    'bep_deviation': rounded(duty['bep_deviation'][row, index] * 100, 1),
+                    'duty_power': rounded(duty['power'][row, index]),
+                    'matched': bool(duty['matched'][row, index]),
+                }
+
+
+class Echo:
+    """Файловый объект для csv.writer, который возвращает записанную строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+def csv_chunks(rows):
+    """Строки CSV (разделитель ;) с заголовком BATCH_COLUMNS"""
+    writer = csv.DictWriter(Echo(), fieldnames=BATCH_COLUMNS, delimiter=';', restval='')
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def json_chunks(rows):
+    """JSON-список строк результата по частям"""
+    yield '['
+    for number, row in enumerate(rows):
+        yield (',\n' if number else '\n') + json.dumps(row, ensure_ascii=False, allow_nan=False)
+    yield '\n]\n'
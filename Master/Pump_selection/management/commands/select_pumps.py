@@ -0,0 +1,42 @@
+import sys
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Pump_selection.batch import csv_chunks, json_chunks, read_points, select_batch
+
+
+class Command(BaseCommand):
+    help = "Пакетный подбор насосов: точки из CSV или JSON с полями формы подбора, результат в CSV или JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Файл точек подбора (.csv или .json)")
+        parser.add_argument('-o', '--output', help="Файл результата; по умолчанию стандартный вывод")
+        parser.add_argument('--format', choices=('csv', 'json'),
+                            help="Формат результата; по умолчанию по расширению файла результата, иначе csv")
+        parser.add_argument('--limit', type=int, default=3, help="Насосов на точку")
+
+    def handle(self, *args, **options):
+        if options['limit'] < 1:
+            raise CommandError("Число насосов на точку (--limit) должно быть не меньше 1")
+        source = Path(options['input'])
+        try:
+            points = read_points(source.read_text(encoding='utf-8'),
+                                 'json' if source.suffix.lower() == '.json' else 'csv')
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Не удалось прочитать точки из {source}: {e}")
+
+        output = options['output']
+        output_format = options['format'] or ('json' if output and output.lower().endswith('.json') else 'csv')
+        chunks = (json_chunks if output_format == 'json' else csv_chunks)(select_batch(points, options['limit']))
+
+        stream = open(output, 'w', encoding='utf-8', newline='') if output else sys.stdout
+        try:
+            for chunk in chunks:
+                stream.write(chunk)
+        finally:
+            if output:
+                stream.close()
+
+        if output:
+            self.stderr.write(f"Подобраны насосы для {len(points)} точек, результат: {output}")
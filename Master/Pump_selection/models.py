@@ -50,3 +50,12 @@ class Pumps(models.Model):
         return f'Насос: {self.name} | Семейство: {self.family.name}'
 
 
+
+
+class CatalogueVersion(models.Model):
+    """Счетчик изменений каталога насосов; по нему процессы узнают, что их снимок каталога устарел"""
+    objects = None
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f'Версия каталога: {self.version}'
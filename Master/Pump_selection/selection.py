@@ -0,0 +1,186 @@
+import math
+import threading
+
+import numpy as np
+from django.db.models import F
+
+from .models import CatalogueVersion, Pumps
+
+# Критерии подбора: название для отчета, поля нижней и верхней границы насоса, поле данных пользователя
+CRITERIA = (
+    ('Давление', 'pressure_min', 'pressure', 'pressure'),
+    ('Подача', 'feed_min', 'feed', 'flow_rate'),
+    ('Напор', 'pump_lift_min', 'pump_lift', 'pump_lift'),
+    ('Кавитационный запас', 'cavitation_min', 'cavitation', 'cav_reserve'),
+    ('Скорость вращения', 'rotation_speed_min', 'rotation_speed', 'rotation_speed'),
+    ('Мощность', 'power_min', 'power', 'power'),
+    ('Газосодержание', 'gas_content_min', 'gas_content', 'gas_content'),
+    ('Содержание твердых частиц', 'solid_content_min', 'solid_content', 'solid_content'),
+    ('Размер твердых частиц', 'solid_size_min', 'solid_size', 'solid_size'),
+    ('Плотность', 'density_min', 'density', 'density'),
+    ('Вязкость', 'viscosity_min', 'viscosity', 'viscosity'),
+)
+# Поля точки подбора (user_data формы) и обязательные из них с названиями для сообщений
+POINT_FIELDS = ('pressure', 'flow_rate', 'max_pressure', 'temperature', 'pump_lift', 'cav_reserve', 'rotation_speed',
+                'power', 'gas_content', 'solid_content', 'solid_size', 'density', 'viscosity')
+REQUIRED_FIELDS = {
+    'pressure': 'Давление',
+    'flow_rate': 'Подача',
+    'pump_lift': 'Напор',
+    'cav_reserve': 'Кав. запас',
+    'gas_content': 'Сод. газа',
+    'solid_content': 'Конц. тв.',
+    'solid_size': 'Р-р тв.',
+    'density': 'Плотность',
+    'viscosity': 'Вязкость',
+}
+TOTAL_CRITERIA = len(CRITERIA)
+MIN_SCORE = TOTAL_CRITERIA // 2  # 50% критериев
+# Коэффициенты характеристики H(Q) = a0·Q² + b0·Q + c0 (Q в м³/ч, H в м) и подача в оптимуме (номинальная)
+CURVE_FIELDS = ('a0', 'b0', 'c0', 'feed')
+# Рабочая зона насоса по подаче относительно оптимума
+BEP_RANGE = (0.7, 1.2)
+
+# Снимок каталога в памяти процесса; пересобирается, когда версия каталога в базе меняется
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def catalogue_arrays():
+    """Границы критериев всех насосов по столбцам: строка — насос в порядке pk, столбец — критерий"""
+    bounds = [field for _, low, high, _ in CRITERIA for field in (low, high)]
+    fields = ['pk', *bounds, *CURVE_FIELDS]
+    rows = np.array(list(Pumps.objects.order_by('pk').values_list(*fields)), dtype=float).reshape(-1, len(fields))
+    arrays = {
+        'pk': rows[:, 0].astype(np.int64),
+        'low': rows[:, 1:1 + len(bounds):2],
+        'high': rows[:, 2:1 + len(bounds):2],
+        **{name: rows[:, 1 + len(bounds) + i] for i, name in enumerate(CURVE_FIELDS)},
+    }
+    for values in arrays.values():
+        values.flags.writeable = False  # снимок общий для всех потоков процесса
+    return arrays
+
+
+def catalogue_version():
+    return CatalogueVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+
+
+def catalogue_changed():
+    """Отметка об изменении каталога: увеличивает версию в базе, снимки всех процессов устаревают"""
+    global _snapshot
+    if not CatalogueVersion.objects.filter(pk=1).update(version=F('version') + 1):
+        CatalogueVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+    _snapshot = None
+
+
+def catalogue_snapshot():
+    """Каталог массивами из памяти процесса; из базы каждый раз читается только номер версии"""
+    global _snapshot
+    version = catalogue_version()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot['version'] == version:
+        return snapshot
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot['version'] != version:
+            # Версия прочитана до данных: изменение во время чтения приведет к повторной сборке
+            _snapshot = {**catalogue_arrays(), 'version': version}
+        return _snapshot
+
+
+def to_float(value):
+    """Число из поля формы или файла: пробелы убираются, запятая — десятичный разделитель.
+
+    Нечисловое значение, nan и inf дают None.
+    """
+    try:
+        cleaned_value = str(value).strip().replace(' ', '').replace(',', '.')
+        number = float(cleaned_value)
+    except (ValueError, TypeError, AttributeError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def user_vector(user_data):
+    """Значения пользователя в порядке CRITERIA; незаполненное поле не попадает ни в один диапазон"""
+    return np.array([np.nan if user_data.get(field) is None else user_data[field] for *_, field in CRITERIA],
+                    dtype=float)
+
+
+def score_pumps(catalogue, user_data):
+    """Выполнение каждого критерия каждым насосом, массив насосы × критерии"""
+    user = user_vector(user_data)
+    return (catalogue['low'] <= user) & (user <= catalogue['high'])
+
+
+def duty_points(catalogue, flow_rate, pressure, density=None):
+    """Рабочие точки всех насосов каталога для точки пользователя (flow_rate, м³/ч; pressure, м).
+
+    Для массивов точек результат — точки × насосы.
+
+    Характеристика сети H = a·Q² проходит через точку пользователя (calc_a); рабочая точка — ее
+    пересечение с H(Q) насоса (calc_q2, calc_h2). matched — насос дает не меньше требуемой подачи
+    и работает в зоне BEP_RANGE около оптимума.
+    """
+    a0, b0, c0, feed = (catalogue[name] for name in CURVE_FIELDS)
+    d, e, density = (np.asarray(np.nan if value is None else value, dtype=float)[..., None]
+                     for value in (flow_rate, pressure, density))
+    with np.errstate(all='ignore'):
+        q = (-b0 * d ** 2 - d * np.sqrt(d ** 2 * (b0 ** 2 - 4 * a0 * c0) + 4 * c0 * e)) / (2 * (a0 * d ** 2 - e))
+        h = a0 * q ** 2 + b0 * q + c0
+        bep_deviation = np.abs(q / feed - 1)
+        # Гидравлическая мощность в рабочей точке, кВт
+        power = density * 9.81 * q * h / 3600 / 1000
+
+    valid = np.isfinite(q) & np.isfinite(h) & (q > 0) & (h > 0)
+    matched = valid & (q >= d) & (q >= BEP_RANGE[0] * feed) & (q <= BEP_RANGE[1] * feed)
+    return {'flow_rate': q, 'pressure': h, 'bep_deviation': bep_deviation, 'power': power, 'valid': valid,
+            'matched': matched}
+
+
+def rank_pumps(score, duty):
+    """Порядок насосов вдоль последней оси и признак кандидата (не меньше MIN_SCORE критериев).
+
+    Сначала кандидаты, затем число критериев, попадание в рабочую зону, близость к оптимуму, мощность.
+    """
+    eligible = score >= MIN_SCORE
+    bep = np.where(duty['valid'], duty['bep_deviation'], np.inf)
+    power = np.nan_to_num(duty['power'], nan=np.inf)
+    # lexsort устойчив: при полном равенстве порядок как в каталоге
+    return np.lexsort((power, bep, ~duty['matched'], -score, ~eligible), axis=-1), eligible
+
+
+def select_pumps(user_data, limit=10, catalogue=None):
+    """Насосы с наибольшим числом выполненных критериев, не меньше MIN_SCORE, не больше limit"""
+    catalogue = catalogue if catalogue is not None else catalogue_snapshot()
+    passed = score_pumps(catalogue, user_data)
+    score = passed.sum(axis=1)
+    duty = duty_points(catalogue, user_data['flow_rate'], user_data['pressure'], user_data.get('density'))
+
+    order, eligible = rank_pumps(score, duty)
+    top = order[:limit][eligible[order[:limit]]]
+
+    # Из базы читаются только отобранные насосы, вместе с семейством
+    pumps = Pumps.objects.select_related('family').in_bulk(catalogue['pk'][top].tolist())
+
+    results = []
+    for index in top:
+        pump = pumps.get(int(catalogue['pk'][index]))
+        if pump is None:  # насос удален после чтения каталога
+            continue
+        failed = [f"{name}: {user_data[field]} ∉ [{getattr(pump, low)}-{getattr(pump, high)}]"
+                  for (name, low, high, field), ok in zip(CRITERIA, passed[index]) if not ok]
+        results.append({
+            'pump': pump,
+            'score': int(score[index]),
+            'total': TOTAL_CRITERIA,
+            'failed': failed,
+            'duty': {
+                'flow_rate': float(duty['flow_rate'][index]),
+                'pressure': float(duty['pressure'][index]),
+                'bep_deviation': float(duty['bep_deviation'][index]) * 100,  # в %
+                'power': float(duty['power'][index]),
+                'matched': bool(duty['matched'][index]),
+            } if duty['valid'][index] else None,
+        })
+    return results
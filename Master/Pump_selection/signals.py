@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import PumpFamily, Pumps
+from .selection import catalogue_changed
+
+
+@receiver([post_save, post_delete], sender=Pumps)
+@receiver([post_save, post_delete], sender=PumpFamily)
+def catalogue_updated(sender, **kwargs):
+    catalogue_changed()
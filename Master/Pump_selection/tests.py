@@ -1,3 +1,107 @@
-from django.test import TestCase
+import numpy as np
+from django.test import RequestFactory, SimpleTestCase
 
-# Create your tests here.
+from .selection import MIN_SCORE, TOTAL_CRITERIA, duty_points, rank_pumps, score_pumps, to_float
+from .views import pump_selection_batch
+
+
+def catalogue(**fields):
+    """Каталог из четырех насосов с характеристикой H = a0·Q² + b0·Q + c0, как у catalogue_arrays.
+
+    Для точки 100 м³/ч, 50 м: насос 0 — рабочая точка 115.5 м³/ч в зоне оптимума; насос 1 — та же
+    точка, но правее зоны (оптимум 80 м³/ч); насос 2 — подача 81.6 м³/ч меньше требуемой;
+    у насоса 3 характеристика не задана.
+    """
+    arrays = {
+        'pk': np.arange(1, 5),
+        'low': np.zeros((4, TOTAL_CRITERIA)),
+        'high': np.full((4, TOTAL_CRITERIA), 1000.0),
+        'a0': np.array([-0.01, -0.01, -0.01, np.nan]),
+        'b0': np.zeros(4),
+        'c0': np.array([200.0, 200.0, 100.0, 200.0]),
+        'feed': np.array([110.0, 80.0, 80.0, 110.0]),
+    }
+    arrays.update(fields)
+    return arrays
+
+
+def user_data(**fields):
+    data = {field: 10.0 for field in ('pressure', 'flow_rate', 'pump_lift', 'cav_reserve', 'rotation_speed', 'power',
+                                      'gas_content', 'solid_content', 'solid_size', 'density', 'viscosity')}
+    data.update(fields)
+    return data
+
+
+class DutyPointsTests(SimpleTestCase):
+    def test_duty_point(self):
+        duty = duty_points(catalogue(), 100, 50, 1000)
+        np.testing.assert_allclose(duty['flow_rate'][:3], [115.47005384, 115.47005384, 81.64965809])
+        np.testing.assert_allclose(duty['pressure'][:3], [66.66666667, 66.66666667, 33.33333333])
+        np.testing.assert_array_equal(duty['valid'], [True, True, True, False])
+
+    def test_bep_window(self):
+        duty = duty_points(catalogue(), 100, 50)
+        self.assertTrue(duty['matched'][0])
+        # Рабочая точка насоса 1 дальше 1.2 подачи в оптимуме
+        self.assertFalse(duty['matched'][1])
+
+    def test_flow_rate_below_duty(self):
+        duty = duty_points(catalogue(), 100, 50)
+        # Насос 2 в зоне оптимума, но не дает требуемой подачи
+        self.assertLess(duty['bep_deviation'][2], 0.2)
+        self.assertFalse(duty['matched'][2])
+
+    def test_missing_point(self):
+        duty = duty_points(catalogue(), [100, None], [50, 50])
+        self.assertEqual(duty['matched'].shape, (2, 4))
+        np.testing.assert_array_equal(duty['matched'][0], [True, False, False, False])
+        self.assertFalse(duty['valid'][1].any())
+        self.assertFalse(duty['matched'][1].any())
+
+
+class ScorePumpsTests(SimpleTestCase):
+    def test_all_criteria(self):
+        self.assertTrue(score_pumps(catalogue(), user_data()).all())
+
+    def test_nan_never_matches(self):
+        low = np.zeros((4, TOTAL_CRITERIA))
+        low[1, 0] = np.nan  # у насоса 1 не задана нижняя граница давления
+        passed = score_pumps(catalogue(low=low), user_data(viscosity=None))
+        self.assertFalse(passed[:, -1].any())
+        self.assertFalse(passed[1, 0])
+        self.assertEqual(passed.sum(axis=1).tolist(),
+                         [TOTAL_CRITERIA - 1, TOTAL_CRITERIA - 2, TOTAL_CRITERIA - 1, TOTAL_CRITERIA - 1])
+
+
+class RankPumpsTests(SimpleTestCase):
+    def test_matched_then_bep(self):
+        duty = duty_points(catalogue(), 100, 50)
+        order, eligible = rank_pumps(np.full(4, TOTAL_CRITERIA), duty)
+        # Сначала насос в рабочей зоне, затем по близости к оптимуму; без рабочей точки — последним
+        self.assertEqual(order.tolist(), [0, 2, 1, 3])
+        self.assertTrue(eligible.all())
+
+    def test_eligible_first(self):
+        duty = duty_points(catalogue(), 100, 50)
+        order, eligible = rank_pumps(np.array([MIN_SCORE - 1, MIN_SCORE, MIN_SCORE, TOTAL_CRITERIA]), duty)
+        # Насос 0 в рабочей зоне, но не кандидат
+        self.assertEqual(order.tolist(), [3, 2, 1, 0])
+        self.assertEqual(eligible.tolist(), [False, True, True, True])
+
+
+class ToFloatTests(SimpleTestCase):
+    def test_to_float(self):
+        self.assertEqual(to_float(' 1 234,5 '), 1234.5)
+        for value in ('abc', None, 'nan', 'inf', '-inf'):
+            self.assertIsNone(to_float(value), value)
+
+
+class BatchViewTests(SimpleTestCase):
+    def test_form_without_file(self):
+        response = pump_selection_batch(RequestFactory().post('/pump_selection/batch/', {'limit': '2'}))
+        self.assertEqual(response.status_code, 400)
+
+    def test_limit_below_one(self):
+        request = RequestFactory().post('/pump_selection/batch/?limit=0', 'flow_rate;pressure\n',
+                                        content_type='text/csv')
+        self.assertEqual(pump_selection_batch(request).status_code, 400)
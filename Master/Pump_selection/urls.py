@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('', views.pump_selection, name='pump_selection'),
+    path('batch/', views.pump_selection_batch, name='pump_selection_batch'),
 ]
@@ -1,6 +1,11 @@
 from django.shortcuts import render
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+import csv
 import math
-from .models import Pumps, PumpFamily
+from .batch import csv_chunks, json_chunks, read_points, select_batch
+from .selection import POINT_FIELDS, REQUIRED_FIELDS, select_pumps, to_float
 
 
 def pump_selection(request):
@@ -104,8 +109,6 @@ def pump_selection(request):
             'user_density': None,
             'user_viscosity': None,
             'user_data': None,
-            'pumps': Pumps.objects.all(),
-            'families': PumpFamily.objects.all(),
             'total_a0': None,
             'total_b0': None,
             'total_c0': None,
@@ -128,28 +131,7 @@ def pump_selection(request):
                 name = select['name']
                 select['value'] = request.POST.get(name, "")
 
-        def get_float(value):
-            try:
-                cleaned_value = str(value).strip().replace(' ', '').replace(',', '.')
-                return float(cleaned_value)
-            except (ValueError, TypeError, AttributeError):
-                return None
-
-        user_data = {
-            "pressure": get_float(request.POST.get("pressure")),
-            "flow_rate": get_float(request.POST.get("flow_rate")),
-            "max_pressure": get_float(request.POST.get("max_pressure")),
-            "temperature": get_float(request.POST.get("temperature")),
-            "pump_lift": get_float(request.POST.get("pump_lift")),
-            "cav_reserve": get_float(request.POST.get("cav_reserve")),
-            "rotation_speed": get_float(request.POST.get("rotation_speed")),
-            "power": get_float(request.POST.get("power")),
-            "gas_content": get_float(request.POST.get("gas_content")),
-            "solid_content": get_float(request.POST.get("solid_content")),
-            "solid_size": get_float(request.POST.get("solid_size")),
-            "density": get_float(request.POST.get("density")),
-            "viscosity": get_float(request.POST.get("viscosity")),
-        }
+        user_data = {field: to_float(request.POST.get(field)) for field in POINT_FIELDS}
 
         request.session['centrifugal_params'] = {
             'flow_rate': user_data.get('flow_rate'),
@@ -159,17 +141,7 @@ def pump_selection(request):
         }
         request.session.modified = True
 
-        required_fields = {
-            'pressure': 'Давление',
-            'flow_rate': 'Подача',
-            'pump_lift': 'Напор',
-            'cav_reserve': 'Кав. запас',
-            'gas_content': 'Сод. газа',
-            'solid_content': 'Конц. тв.',
-            'solid_size': 'Р-р тв.',
-            'density': 'Плотность',
-            'viscosity': 'Вязкость',
-        }
+        required_fields = REQUIRED_FIELDS
 
         missing_fields = [name for field, name in required_fields.items()
                           if user_data.get(field) is None]
@@ -199,74 +171,48 @@ def pump_selection(request):
             user_data["max_pressure"]  # user_max_pressure
         )
 
-        pumps = Pumps.objects.only(
-            'pump_lift_min', 'pump_lift',
-            'cavitation_min', 'cavitation',
-            'gas_content_min', 'gas_content',
-            'solid_content_min', 'solid_content',
-            'solid_size_min', 'solid_size',
-            'density_min', 'density',
-            'viscosity_min', 'viscosity',
-            'pressure_min', 'pressure',
-            'feed_min', 'feed',
-            'rotation_speed_min', 'rotation_speed',
-            'power_min', 'power',
-            'name',
-            'family'
-        )
-
-        pumps_with_score = []
-        total_criteria = 11  # Общее количество проверяемых критериев
-
-        for pump in pumps:
-            score = 0
-            failed_criteria = []
-
-            # Все критерии для проверки
-            criteria = [
-                ('Давление', pump.pressure_min, pump.pressure, user_data["pressure"]),
-                ('Подача', pump.feed_min, pump.feed, user_data["flow_rate"]),
-                ('Напор', pump.pump_lift_min, pump.pump_lift, user_data["pump_lift"]),
-                ('Кавитационный запас', pump.cavitation_min, pump.cavitation, user_data["cav_reserve"]),
-                ('Скорость вращения', pump.rotation_speed_min, pump.rotation_speed, user_data["rotation_speed"]),
-                ('Мощность', pump.power_min, pump.power, user_data["power"]),
-                ('Газосодержание', pump.gas_content_min, pump.gas_content, user_data["gas_content"]),
-                ('Содержание твердых частиц', pump.solid_content_min, pump.solid_content, user_data["solid_content"]),
-                ('Размер твердых частиц', pump.solid_size_min, pump.solid_size, user_data["solid_size"]),
-                ('Плотность', pump.density_min, pump.density, user_data["density"]),
-                ('Вязкость', pump.viscosity_min, pump.viscosity, user_data["viscosity"]),
-            ]
-
-            # Проверяем каждый критерий
-            for name, min_val, max_val, user_val in criteria:
-                if min_val <= user_val <= max_val:
-                    score += 1
-                else:
-                    failed_criteria.append(
-                        f"{name}: {user_val} ∉ [{min_val}-{max_val}]"
-                    )
-
-            # Фильтр: минимальное количество совпадений
-            if score >= total_criteria // 2:  # 50% критериев
-                pumps_with_score.append({
-                    'pump': pump,
-                    'score': score,
-                    'total': total_criteria,
-                    'failed': failed_criteria
-                })
-
-        # Сортировка по приоритету:
-        # 1. Количество совпадений (по убыванию)
-        pumps_with_score.sort(key=lambda x: (-x['score']))
-
-        # Выбираем топ-3 результата
-        context['calculations']['filter_pumps'] = pumps_with_score[:10]
+        # Оценка всего каталога массивами, из базы читаются только отобранные насосы
+        context['calculations']['filter_pumps'] = select_pumps(user_data)
 
         context['columns'] = column_renaming()
 
     return render(request, 'pump_selection.html', context)
 
 
+@csrf_exempt
+@require_POST
+def pump_selection_batch(request):
+    """Пакетный подбор: точки файлом 'file' (.csv/.json) или телом запроса, ответ потоком CSV или JSON.
+
+    Формат ответа — параметр format (csv по умолчанию), число насосов на точку — limit (3 по умолчанию).
+    """
+    upload = request.FILES.get('file')
+    if upload is not None:
+        content = upload.read()
+        input_format = 'json' if upload.name.lower().endswith('.json') else 'csv'
+    elif request.content_type == 'multipart/form-data':
+        # Тело формы уже прочитано разбором request.FILES, точки могут прийти только файлом
+        return HttpResponseBadRequest("Не передан файл точек (file)")
+    else:
+        content = request.body
+        input_format = 'json' if request.content_type == 'application/json' else 'csv'
+
+    try:
+        points = read_points(content.decode('utf-8'), input_format)
+        limit = int(request.GET.get('limit', request.POST.get('limit', 3)))
+    except (ValueError, csv.Error) as e:
+        return HttpResponseBadRequest(f"Некорректный список точек: {e}")
+    if limit < 1:
+        return HttpResponseBadRequest("Число насосов на точку (limit) должно быть не меньше 1")
+
+    rows = select_batch(points, limit=limit)
+    if request.GET.get('format', request.POST.get('format')) == 'json':
+        return StreamingHttpResponse(json_chunks(rows), content_type='application/json')
+    response = StreamingHttpResponse(csv_chunks(rows), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = 'attachment; filename="pump_selection.csv"'
+    return response
+
+
 def calc_q2(a_1, b_1, c_1, d_1, e_1):
     return round((-b_1 * math.pow(d_1, 2) - d_1 * math.sqrt(
         math.pow(d_1, 2) * (math.pow(b_1, 2) - (4 * a_1 * c_1)) + 4 * c_1 * e_1)) / (
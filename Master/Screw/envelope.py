@@ -0,0 +1,93 @@
+import csv
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+from TwinScrew import kernel
+from .views import twin_screw
+
+logger = logging.getLogger(__name__)
+
+ENVELOPE_FIELDS = kernel.results_fields(
+    ("flow_rate", "pressure", "rotation_speed", "temperature"),
+    ("density", "viscosity_dyn", "viscosity_kin", "capacity_temp"),
+)
+
+
+def envelope_chunk(cells, rotation_speed, temperature, double_inlet=True, num_threads=2, optimizer="exhaustive"):
+    """Расчет группы ячеек (Q, H); для ячеек без решения возвращается строка только с Q и H.
+
+    Ячейка, расчет которой завершился исключением, в результат не попадает: при продолжении
+    (resume) она будет посчитана заново.
+    """
+    rows = []
+    for flow_rate, pressure in cells:
+        try:
+            result = twin_screw(flow_rate=flow_rate, pressure=pressure, rotation_speed=rotation_speed,
+                                temperature=temperature, double_inlet=double_inlet, num_threads=num_threads,
+                                export=False, optimizer=optimizer)
+        except Exception as e:
+            logger.warning(f"Ошибка при расчете Q={flow_rate}, H={pressure}, ячейка не записана: {e}")
+            continue
+        rows.append(result or {"flow_rate": flow_rate, "pressure": pressure})
+    return rows
+
+
+def truncate_partial_row(filename):
+    """Обрезка таблицы до последней целой строки: прерванный запуск оставляет недописанный хвост"""
+    with open(filename, 'rb+') as file:
+        data = file.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            logger.warning(f"Недописанная строка в конце {filename} удалена")
+            file.truncate(end)
+
+
+def completed_cells(filename):
+    """Ячейки (Q, H), уже записанные в таблицу прошлым запуском; неполные и нечитаемые строки пропускаются"""
+    if not os.path.exists(filename):
+        return set()
+    cells = set()
+    with open(filename, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            if None in row or None in row.values():
+                continue  # полей меньше или больше, чем в заголовке
+            try:
+                cells.add((float(row["flow_rate"]), float(row["pressure"])))
+            except (KeyError, ValueError):
+                continue
+    return cells
+
+
+def build_envelope(flow_rates, pressures, rotation_speed, temperature, filename, double_inlet=True, num_threads=2,
+                   workers=None, chunk_size=10, resume=True, optimizer="exhaustive"):
+    """Огибающая Q×H в пуле процессов; строки дописываются в CSV filename по мере готовности"""
+    if resume and os.path.exists(filename):
+        truncate_partial_row(filename)  # иначе следующая строка допишется к недописанной
+    done = completed_cells(filename) if resume else set()
+    cells = [(flow_rate, pressure) for flow_rate in flow_rates for pressure in pressures
+             if (float(flow_rate), float(pressure)) not in done]
+    chunks = [cells[i:i + chunk_size] for i in range(0, len(cells), chunk_size)]
+    logger.info(f"Огибающая Q×H: {len(done)} ячеек уже рассчитано, осталось {len(cells)}")
+
+    with open(filename, 'a' if done else 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=ENVELOPE_FIELDS, restval='')
+        if not done:
+            writer.writeheader()
+
+        if workers == 1:
+            for chunk in tqdm(chunks, desc="Перебор подач и напоров"):
+                writer.writerows(envelope_chunk(chunk, rotation_speed, temperature, double_inlet, num_threads,
+                                                  optimizer))
+                file.flush()
+            return filename
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(envelope_chunk, chunk, rotation_speed, temperature, double_inlet, num_threads,
+                                       optimizer)
+                       for chunk in chunks]
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Перебор подач и напоров"):
+                writer.writerows(future.result())
+                file.flush()
+
+    return filename
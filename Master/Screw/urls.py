@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('', views.screw, name='screw'),
+    path('charts/', views.screw_charts, name='screw_charts'),
 ]
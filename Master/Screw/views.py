@@ -1,5 +1,4 @@
 from django.shortcuts import render
-from django.http import HttpResponse
 import cadquery as cq
 from cadquery import exporters
 import logging
@@ -7,17 +6,19 @@ import os
 import math
 import zipfile
 import numpy as np
-import plotly.graph_objects as go
-from scipy.optimize import bisect
 from functools import partial
 from tqdm import tqdm
-import itertools
 import pandas as pd
+from TwinScrew import kernel
+from Master import artifacts, charts, jobs
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Версия кода геометрии винтов и статора; увеличить при изменении построения моделей
+GEOMETRY_VERSION = 1
+
 
 def screw(request):
     context = {
@@ -82,28 +83,21 @@ def screw(request):
                         context['calculated_diam'] = (d_rec[0] if isinstance(d_rec, list) else d_rec) * 1000  # Переводим в мм
                     if n_rec:
                         context['calculated_rotation_speed'] = n_rec[0] if isinstance(n_rec, list) else n_rec
-                    qh_plot = calculate_qh_characteristic(d_rec, feed_rec, pressure)
-
-                    kpd_plot, is_low_pressure = calculate_kpd_characteristic(d_rec, feed_rec, pressure, viscosity,
-                                                                             rotation_speed)
-                    power_plot, is_power_error = calculate_power_characteristic(d_rec, feed_rec, pressure, viscosity, turns,
-                                                                                rotation_speed)
+                    plots, is_pressure_error = characteristic_charts(d_rec, feed_rec, pressure, viscosity, turns,
+                                                                     rotation_speed)
 
                     feed_p, kpd_volumetric_p, kpd_mechanical_p, kpd_total_p, power_t_p, power_eff_p, power_nominal_p = (
                         print_data(d_rec, pressure, rotation_speed, viscosity, turns))
 
                     force_plot = 'force_plot' in request.POST
 
-                    if (is_low_pressure or is_power_error) and not force_plot:
+                    if is_pressure_error and not force_plot:
                         context['error'] = "Внимание: давление слишком низкое, что может привести к некорректной работе насоса."
                         context['is_low_pressure'] = True
                         plots = []
                     else:
-                        plots = [
-                            qh_plot,
-                            kpd_plot,
-                            power_plot,
-                        ]
+                        # Мощность при падающей характеристике не строится
+                        plots = [plot for plot in plots if plot is not None]
                         context['is_low_pressure'] = False
                     context['plots'] = plots
 
@@ -143,6 +137,23 @@ def screw(request):
     return render(request, 'screw.html', context)
 
 
+def screw_charts(request):
+    """Данные графиков подачи, КПД и мощности в JSON: flow_rate, pressure, viscosity, rotation_speed в запросе"""
+    params = request.POST if request.method == "POST" else request.GET
+    try:
+        flow_rate, pressure, viscosity, rotation_speed = (
+            float(params.get(name, '').replace(',', '.'))
+            for name in ('flow_rate', 'pressure', 'viscosity', 'rotation_speed'))
+        if flow_rate <= 0 or pressure <= 0 or rotation_speed <= 0:
+            raise ValueError("Все входные значения должны быть положительными числами.")
+        turns = calculate_turns(pressure)
+        _, d, feed, _ = calculate_data(flow_rate, pressure, rotation_speed)
+        plots, is_pressure_error = characteristic_charts(d, feed, pressure, viscosity, turns, rotation_speed)
+    except (ValueError, ZeroDivisionError) as e:
+        return charts.chart_response([], status=400, error=f"Ошибка ввода: {e}")
+    return charts.chart_response([plot for plot in plots if plot is not None], is_low_pressure=is_pressure_error)
+
+
 def calculate_mid_point(p1, p2, center, radius, is_lower=False):
     mid_x = (p1[0] + p2[0]) / 2
     y_offset = math.sqrt(radius ** 2 - (mid_x - center[0]) ** 2)
@@ -150,7 +161,7 @@ def calculate_mid_point(p1, p2, center, radius, is_lower=False):
     return (mid_x, mid_y)
 
 
-def create_section_lead(d):
+def create_section_lead(d, debug=False):
     try:
         R = d * 5 / 6  # Главный радиус
         r = d * 9 / 16  # Боковой радиус
@@ -215,8 +226,10 @@ def create_section_lead(d):
 
         section = section.close()
 
-        exporters.export(section, 'debug_section_lead.step')
-        logger.info("Сечение успешно создано и экспортировано в debug_section_lead.step")
+        # Отладочный файл пишется в рабочий каталог под общим именем — только при ручной отладке
+        if debug:
+            exporters.export(section, 'debug_section_lead.step')
+            logger.info("Сечение успешно создано и экспортировано в debug_section_lead.step")
 
         return section
 
@@ -225,7 +238,7 @@ def create_section_lead(d):
         raise
 
 
-def create_trapezoid_lead(d, num_turns):
+def create_trapezoid_lead(d, num_turns, debug=False):
     try:
         r_low = d * 1 / 2  # Нижний радиус
         width = d / 4
@@ -240,8 +253,9 @@ def create_trapezoid_lead(d, num_turns):
             ((10 * d / 3) * num_turns + width, r_low - 1)
         ]).close()
 
-        exporters.export(trapezoid, 'debug_trapezoid_lead.step')
-        logger.info("Трапеция успешно создана и экспортирована в debug_trapezoid_lead.step")
+        if debug:
+            exporters.export(trapezoid, 'debug_trapezoid_lead.step')
+            logger.info("Трапеция успешно создана и экспортирована в debug_trapezoid_lead.step")
 
         return trapezoid
     except Exception as e:
@@ -267,9 +281,8 @@ def create_body_lead(d, num_turns):
         result_union = result_cut.union(circle_extruded)
 
         if result_union.val().isValid():
-            exporters.export(result_union, 'screw_lead.step')
-            logger.info("Модель успешно создана и экспортирована в screw_lead.step")
-            return True
+            logger.info("Модель ведущего успешно создана")
+            return result_union
         else:
             raise RuntimeError("Некорректная геометрия после выдавливания")
 
@@ -278,7 +291,7 @@ def create_body_lead(d, num_turns):
         raise
 
 
-def create_section_driven(d):
+def create_section_driven(d, debug=False):
     try:
         r_5 = d * 1 / 2
         r_6 = d * 19 / 80
@@ -353,8 +366,9 @@ def create_section_driven(d):
 
         section = section.close()
 
-        exporters.export(section, 'debug_section_driven.step')
-        logger.info("Сечение успешно создано и экспортировано в debug_section_driven.step")
+        if debug:
+            exporters.export(section, 'debug_section_driven.step')
+            logger.info("Сечение успешно создано и экспортировано в debug_section_driven.step")
 
         return section
 
@@ -378,9 +392,8 @@ def create_body_driven(d, num_turns):
         filleted_body = result_union
 
         if filleted_body.val().isValid():
-            exporters.export(filleted_body, 'screw_driven.step')
-            logger.info("Модель успешно создана и экспортирована в screw_driven.step")
-            return True
+            logger.info("Модель ведомого успешно создана")
+            return filleted_body
         else:
             raise RuntimeError("Некорректная геометрия после выдавливания")
 
@@ -389,7 +402,7 @@ def create_body_driven(d, num_turns):
         raise
 
 
-def create_section_stator(d, num_turns, rotation_speed):
+def create_section_stator(d, num_turns, rotation_speed, debug=False):
     try:
         r_stator = math.ceil(2 * d / 2.5) * 2.5
         r_lead = 5 * d / 6
@@ -412,12 +425,13 @@ def create_section_stator(d, num_turns, rotation_speed):
         section5 = cq.Workplane("XY").transformed(offset=(0, 0, 10 * d / 3 * num_turns - d + 10)).circle(r_extrude)
         section6 = cq.Workplane("XZ").transformed(offset=(0, 10 * d / 3 * num_turns - d + 20 + r_exit, 0)).circle(r_exit)
 
-        exporters.export(section1, 'debug_section1_stator.step')
-        exporters.export(section2, 'debug_section2_stator.step')
-        exporters.export(section3, 'debug_section3_stator.step')
-        exporters.export(section4, 'debug_section4_stator.step')
-        exporters.export(section5, 'debug_section5_stator.step')
-        exporters.export(section6, 'debug_section6_stator.step')
+        if debug:
+            exporters.export(section1, 'debug_section1_stator.step')
+            exporters.export(section2, 'debug_section2_stator.step')
+            exporters.export(section3, 'debug_section3_stator.step')
+            exporters.export(section4, 'debug_section4_stator.step')
+            exporters.export(section5, 'debug_section5_stator.step')
+            exporters.export(section6, 'debug_section6_stator.step')
 
         return section1, section2, section3, section4, section5, section6
 
@@ -442,9 +456,8 @@ def extrude_stator(d, num_turns, rotation_speed):
         solid = solid.cut(section6.extrude(extrusion_length))
 
         if solid.val().isValid():
-            exporters.export(solid, 'stator.step')
-            logger.info("Модель успешно создана и экспортирована в stator.step")
-            return True
+            logger.info("Модель статора успешно создана")
+            return solid
         else:
             raise RuntimeError("Некорректная геометрия после выдавливания")
 
@@ -453,20 +466,15 @@ def extrude_stator(d, num_turns, rotation_speed):
         raise
 
 
-def create_assembly(d):
+def create_assembly(d, lead_screw, driven_screw, stator):
     try:
-        lead_screw = cq.importers.importStep('screw_lead.step')
-        driven_screw = cq.importers.importStep('screw_driven.step')
-        stator = cq.importers.importStep('stator.step')
-
         assembly = cq.Assembly()
         assembly.add(lead_screw, name='lead_screw', loc=cq.Location(cq.Vector(0, 0, 0)))
         assembly.add(driven_screw, name='driven_screw_1', loc=cq.Location(cq.Vector(0, d, 0)))
         assembly.add(driven_screw, name='driven_screw_2', loc=cq.Location(cq.Vector(0, -d, 0)))
         assembly.add(stator, name='stator', loc=cq.Location(cq.Vector(0, 0, -10)))
 
-        exporters.export(assembly.toCompound(), 'pump_assembly.step')
-        logger.info('Сборка успешно создана и экспортирована в pump_assembly.step')
+        logger.info('Сборка успешно создана')
 
         return assembly
 
@@ -555,18 +563,13 @@ def calculate_feed_loss(d, velocity, pressure_values):
     return 3 * d * velocity * np.sqrt(pressure_values) * 0.001 * 60 * 60 / 11
 
 
-def create_plotly_figure(plots, title, xaxis_title, yaxis_title):
-    fig = go.Figure()
-    for plot in plots:
-        fig.add_scatter(**plot)
-    fig.update_layout(
-        title=title,
-        xaxis_title=xaxis_title,
-        yaxis_title=yaxis_title,
-        hovermode='x',
-        showlegend=True
-    )
-    return fig
+def characteristic_charts(d, flow_rate, pressure, viscosity, num_turns, rotation_speed):
+    """Графики подачи, КПД и мощности и признак некорректной работы (низкое давление, падающая мощность)"""
+    qh_chart = calculate_qh_characteristic(d, flow_rate, pressure)
+    kpd_chart, is_low_pressure = calculate_kpd_characteristic(d, flow_rate, pressure, viscosity, rotation_speed)
+    power_chart, is_power_error = calculate_power_characteristic(d, flow_rate, pressure, viscosity, num_turns,
+                                                                 rotation_speed)
+    return [qh_chart, kpd_chart, power_chart], bool(is_low_pressure or is_power_error)
 
 
 def calculate_qh_characteristic(d, flow_rate, pressure):
@@ -575,12 +578,11 @@ def calculate_qh_characteristic(d, flow_rate, pressure):
     feed_real = flow_rate - feed_loss
 
     plots = [
-        {'x': pressure_values, 'y': np.full_like(pressure_values, flow_rate), 'name': 'Теоретическая подача'},
-        {'x': pressure_values, 'y': feed_real, 'name': 'Фактическая подача'}
+        charts.series('Теоретическая подача', pressure_values, flow_rate),
+        charts.series('Фактическая подача', pressure_values, feed_real),
     ]
 
-    fig = create_plotly_figure(plots, 'Характеристика подачи', 'Напор, м', 'Подача, м3/ч')
-    return fig.to_html(full_html=False)
+    return charts.chart('Характеристика подачи', 'Напор, м', 'Подача, м3/ч', plots)
 
 
 def calculate_kpd_characteristic(d, flow_rate, pressure, viscosity, rotation_speed):
@@ -620,13 +622,12 @@ def calculate_kpd_characteristic(d, flow_rate, pressure, viscosity, rotation_spe
     is_low_pressure = kpd_total[1] == 0
 
     plots = [
-        {'x': pressure_values, 'y': np.full_like(pressure_values, kpd_volumetric), 'name': 'Объемный КПД'},
-        {'x': pressure_values, 'y': np.full_like(pressure_values, kpd_mechanical), 'name': 'Механический КПД'},
-        {'x': pressure_values, 'y': np.full_like(pressure_values, kpd_total), 'name': 'Полный КПД'}
+        charts.series('Объемный КПД', pressure_values, kpd_volumetric),
+        charts.series('Механический КПД', pressure_values, kpd_mechanical),
+        charts.series('Полный КПД', pressure_values, kpd_total),
     ]
 
-    fig = create_plotly_figure(plots, 'Характеристика КПД', 'Напор, м', 'КПД, %')
-    return fig.to_html(full_html=False), is_low_pressure
+    return charts.chart('Характеристика КПД', 'Напор, м', 'КПД, %', plots), is_low_pressure
 
 
 def calculate_power_characteristic(d, flow_rate, pressure, viscosity, num_turns, rotation_speed):
@@ -677,13 +678,12 @@ def calculate_power_characteristic(d, flow_rate, pressure, viscosity, num_turns,
         return None, True
 
     plots = [
-        {'x': pressure_values, 'y': power_nominal, 'name': 'Номинальная мощность'},
-        {'x': pressure_values, 'y': power_t, 'name': 'Теоретическая мощность'},
-        {'x': pressure_values, 'y': power_eff, 'name': 'Эффективная мощность'}
+        charts.series('Номинальная мощность', pressure_values, power_nominal),
+        charts.series('Теоретическая мощность', pressure_values, power_t),
+        charts.series('Эффективная мощность', pressure_values, power_eff),
     ]
 
-    fig = create_plotly_figure(plots, 'Характеристика мощности', 'Напор, м', 'Мощность, кВт')
-    return fig.to_html(full_html=False), False
+    return charts.chart('Характеристика мощности', 'Напор, м', 'Мощность, кВт', plots), False
 
 
 def calculate_start_power(d, pressure, rotation_speed, flow_rate, viscosity):
@@ -727,41 +727,57 @@ def handle_download_model(request, context):
     if d > 500 or turns > 20:
         raise ValueError("Слишком большие значения параметров")
 
+    # Построение идет в фоновом процессе, страница опрашивает состояние задачи и скачивает архив
+    context['job_id'] = jobs.submit('Screw.views.build_screw_models',
+                                    {'d': d, 'turns': turns, 'rotation_speed': rotation_speed})
+    context['logs'].append("Построение моделей поставлено в очередь.")
+
+
+def build_screw_models(d, turns, rotation_speed, logs):
+    """Модели ведущего, ведомого, статора и сборки в ZIP-архиве; возвращает путь к архиву и его имя"""
     # Пути к файлам
     files_to_zip = ['screw_lead.step', 'screw_driven.step', 'stator.step', 'pump_assembly.step']
+    zip_filename = 'screw_models.zip'
 
-    # Создание моделей
-    context['logs'].append("Начинаем создание модели ведущего...")
-    create_body_lead(d, turns)
-    context['logs'].append("Модель ведущего успешно создана и экспортирована.")
+    def build(directory):
+        # Создание моделей; тела передаются в сборку напрямую, без записи и чтения STEP
+        logs.append("Начинаем создание модели ведущего...")
+        lead = create_body_lead(d, turns)
+        logs.append("Модель ведущего успешно создана.")
 
-    context['logs'].append("Начинаем создание модели ведомого...")
-    create_body_driven(d, turns)
-    context['logs'].append("Модель ведомого успешно создана и экспортирована.")
+        logs.append("Начинаем создание модели ведомого...")
+        driven = create_body_driven(d, turns)
+        logs.append("Модель ведомого успешно создана.")
 
-    context['logs'].append("Начинаем создание статора...")
-    extrude_stator(d, turns, rotation_speed)
-    context['logs'].append("Статор успешно создан и экспортирован.")
+        logs.append("Начинаем создание статора...")
+        stator = extrude_stator(d, turns, rotation_speed)
+        logs.append("Статор успешно создан.")
 
-    context['logs'].append("Начинаем создание сборки...")
-    create_assembly(d)
-    context['logs'].append("Сборка успешно создана и экспортирована.")
+        logs.append("Начинаем создание сборки...")
+        assembly = create_assembly(d, lead, driven, stator)
+        logs.append("Сборка успешно создана.")
 
-    # Проверка существования файлов
-    if not all(os.path.exists(file) for file in files_to_zip):
-        raise FileNotFoundError("Файлы моделей не были созданы")
+        # Экспорт всех моделей один раз в конце
+        logs.append("Экспортируем модели...")
+        for file, model in zip(files_to_zip, (lead, driven, stator, assembly.toCompound())):
+            exporters.export(model, os.path.join(directory, file))
+        logs.append("Модели успешно экспортированы.")
 
-    # Создание ZIP-архива
-    zip_filename = 'screw_models.zip'
-    with zipfile.ZipFile(zip_filename, 'w') as zipf:
-        for file in files_to_zip:
-            zipf.write(file, arcname=os.path.basename(file))
+        # Проверка существования файлов
+        if not all(os.path.exists(os.path.join(directory, file)) for file in files_to_zip):
+            raise FileNotFoundError("Файлы моделей не были созданы")
+
+        # Создание ZIP-архива; хранится в кэше вместе с моделями
+        with zipfile.ZipFile(os.path.join(directory, zip_filename), 'w') as zipf:
+            for file in files_to_zip:
+                zipf.write(os.path.join(directory, file), arcname=file)
+
+    directory, from_cache = artifacts.cached_artifacts(
+        'screw', {'d': d, 'turns': turns, 'rotation_speed': rotation_speed}, GEOMETRY_VERSION, build)
+    if from_cache:
+        logs.append("Модели взяты из кэша.")
 
-    # Чтение ZIP-архива и отправка его в ответе
-    with open(zip_filename, 'rb') as f:
-        response = HttpResponse(f, content_type='application/zip')
-        response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-        return response
+    return os.path.join(directory, zip_filename), zip_filename
 
 
 def print_data(d, pressure, rotation_speed, viscosity, num_turns):
@@ -803,566 +819,84 @@ def print_data(d, pressure, rotation_speed, viscosity, num_turns):
     return feed_real, kpd_volumetric, kpd_mechanical, kpd_total, power_t, power_eff, power_nominal
 
 
-def twin_screw(flow_rate, pressure, rotation_speed, temperature, double_inlet=True, num_threads=2):
-
-    def pre_calc(r_ratio, t_ratio, alpha, kpd_vol, flow_rate_add):
-        phi = 2 * math.acos((1 + r_ratio) / 2)
-
-        pi = math.pi
-        lambda_val = (
-                2 * pi
-                - phi
-                + math.sin(phi)
-                - pi * (1 + r_ratio ** 2)
-                + (2 * pi * math.tan(math.radians(alpha)) * (1 - r_ratio) ** 3) / (3 * t_ratio)
-        )
-
-        val = 200 * (
-                (
-                        flow_rate_add / (lambda_val * kpd_vol * t_ratio * rotation_speed * 60)
-                ) ** (1 / 3)) * 10
-
-        # Проверяем, что val вещественное число, а не комплексное
-        if isinstance(val, complex):
-            logger.debug(
-                f"pre_calc: комплексное значение val={val} для r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha}")
-            return None
-
-        ext_diam_mm = round(val, 1)
-        ext_radius_mm = round(ext_diam_mm / 2, 2)
-        int_radius_mm = round(ext_radius_mm * r_ratio, 2)
-        t_mm = round(ext_radius_mm * t_ratio, 1)
-        logger.debug(
-            f"pre_calc: r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha} => ext_r={ext_radius_mm}, int_r={int_radius_mm}, t={t_mm}, phi={phi:.3f}, lambda_val={lambda_val:.3f}")
-        return ext_radius_mm, int_radius_mm, t_mm, phi, lambda_val
-
-    def dtheta1_ddelta(theta1, r_ratio, ext_r, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        cos_theta = math.cos(theta1)
-        sin_theta = math.sin(theta1)
-
-        num1 = (
-                3 * cos_theta
-                + 3 * r_ratio * cos_theta
-                - 3
-                - 2 * r_ratio
-                - r_ratio ** 2
-        )
-        den1 = (1 + r_ratio - cos_theta) ** 2 + sin_theta ** 2
-
-        first_term = - (t / (2 * pi)) * (num1 / den1)
-
-        numerator2 = (1 + r_ratio) * sin_theta
-        denominator2 = math.sqrt(
-            2 * (1 - cos_theta) * (1 + r_ratio) + r_ratio ** 2
-        )
-
-        second_term = ext_r * math.tan(alpha_rad) * (numerator2 / denominator2)
-
-        return first_term + second_term
-
-    def delta_t(theta1_max, r_ratio, R, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        arctan_part = math.atan(
-            math.sin(theta1_max) / (1 + r_ratio - math.cos(theta1_max))
-        )
-        first_term = (t / (2 * pi)) * (arctan_part - theta1_max)
-
-        root_argument = 2 * (1 - math.cos(theta1_max)) * (1 + r_ratio) + r_ratio ** 2
-        second_term = R * math.tan(alpha_rad) * (math.sqrt(root_argument) - r_ratio)
-
-        return first_term - second_term
-
-    def gap_calc(delt_t, t, ext_r, int_r, alpha, num):
-        b_ext_top = round(t / 2 - (delt_t + 2 * (ext_r - int_r) * math.tan(math.radians(alpha))), 1) / num
-        b_ext_low = round(t - num * b_ext_top, 1) / num
-        b_int_low = round(b_ext_low - 2 * math.tan(math.radians(alpha)) * (ext_r - int_r), 1)
-
-        stator_gap = round(round(delt_t / 0.05) * 0.05, 2)
-        screw_gap = round(round(0.7 * delt_t / 0.05) * 0.05, 2)
-        side_gap = round((b_int_low - b_ext_top) / 2, 2)
-
-        axis_dist = round((ext_r + int_r + screw_gap) / 0.1) * 0.1
-        # Если зазор отрицательный, уменьшать число заходов num
-        return stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist
-
-    def calc_liquid_prop(temp):
-        temp_20 = 20
-
-        density_20 = 998.2
-        density_koef = 0.0002
-        density = round(density_20 * (1 - density_koef * (temp - temp_20)), 2)
-
-        viscosity_dyn_20 = 1.003
-        viscosity_dyn_koef = 0.023
-        viscosity_dyn = round(viscosity_dyn_20 * math.exp(-viscosity_dyn_koef * (temp - temp_20)), 3)
-
-        viscosity_kin = round(viscosity_dyn / density * 1000, 3)
-
-        capacity_temp = round(4212 - 3.2 * temp + 0.014 * math.pow(temp, 2), 2)
-
-        return density, viscosity_dyn, viscosity_kin, capacity_temp
-
-    flow_rate_adj = flow_rate / 2 if double_inlet else flow_rate
-
+def twin_screw(flow_rate, pressure, rotation_speed, temperature, double_inlet=True, num_threads=2, export=True,
+               optimizer="exhaustive", verify=False):
     kpd_vol_pre_fixed = 0.8
-    best_params = None
-    min_effective_koef = float('inf')
+    density, viscosity_dyn, viscosity_kin, capacity_temp = kernel.calc_liquid_prop(temperature)
 
     logger.info(
         f"Запуск перебора параметров для flow_rate={flow_rate}, pressure={pressure}, rotation_speed={rotation_speed}, temperature={temperature}")
 
-    r_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.400, 0.500 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.505, 0.701 + 0.001, 0.025)]
-    ))
-    t_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.500, 0.700 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.710, 1.250 + 0.001, 0.025)]
-    ))
-    alpha_values = [round(x * 0.1, 2) for x in range(0, 100 + 1)]  # 0..10 step 0.1
-
-    combinations = list(itertools.product(r_ratio_values, t_ratio_values, alpha_values))
-
-    for r_ratio, t_ratio, alpha in tqdm(combinations, desc="Перебор параметров", total=len(combinations)):
-        try:
-            pre_calc_result = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed, flow_rate_adj)
-            if pre_calc_result is None:
-                continue  # Пропускаем комплексные значения
-
-            ext_r, int_r, t, phi, lambda_val = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed,
-                                                        flow_rate_adj)
-            f = partial(dtheta1_ddelta, r_ratio=r_ratio, ext_r=ext_r, t=t, alpha_deg=alpha)
-            theta1_root = bisect(f, 0.01, math.pi - 0.01, xtol=1e-6)
-            delta_t_val = delta_t(theta1_root, r_ratio, ext_r, t, alpha)
-            stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist = gap_calc(delta_t_val, t,
-                                                                                             ext_r, int_r,
-                                                                                               alpha,
-                                                                                               num_threads)
-            density, viscosity_dyn, viscosity_kin, capacity_temp = calc_liquid_prop(temperature)
-
-            pressure_mpa = 0.009806649643957326 * pressure
-            k = 0.94
-            dp_per_turn = 0.71 * (viscosity_kin / 1) ** k
-            dp_per_turn = max(0.5, min(dp_per_turn, 5))
-
-            pressure_kgs_sm = 10.197162 * pressure_mpa
-            turns_est = round(round(pressure_kgs_sm / dp_per_turn, 1) / 10, 2)
-            thread_length_mm = round(turns_est * t, 1)
-
-            stator_gap_koef = 0.7
-            feed_loss_stator = 60 * 60 * 2 * ((stator_gap * stator_gap_koef / 1000 / 2) ** 3) * (
-                    (2 * math.pi - phi) * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                       12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-            screw_gap_koef = 1
-            feed_loss_screw = 60 * 60 * ((screw_gap * screw_gap_koef / 1000 / 2) ** 3) * (
-                    phi * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                          12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-            side_gap_koef = 1
-            feed_loss_side = 60 * 60 * ((side_gap * side_gap_koef / 1000 / 2) ** 3) * (
-                    side_gap * side_gap_koef * (math.sin(phi / 2) * ext_r / 1000)) * (
-                                         pressure_mpa * 1_000_000) / (
-                                         12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-            feed_loss = feed_loss_stator + feed_loss_screw + feed_loss_side
-
-            multiplier = 2 if double_inlet else 1
-            flow_rate_theory = round(
-                        multiplier * lambda_val * ext_r ** 2 * t * rotation_speed * 60 / 1_000_000_000, 1)
-
-            kpd_vol_2 = round(1 - feed_loss / flow_rate_theory, 3)
-            flow_rate_real = kpd_vol_2 * flow_rate_theory
-
-            w = math.pi * rotation_speed / 30
-            k_t = density * capacity_temp * temperature / ((viscosity_dyn / 1000) * w)
-            g = pressure_mpa * 1_000_000 / (viscosity_dyn / 1000) / w
-            f_m = (thread_length_mm / t) * math.pow(k_t, 0.55) * math.pow(g, -1)
-            k_m = 15 * math.pow(ext_r / int_r, -2.7)
-
-            kpd_mech = round(1 / (1 + f_m * k_m), 3)
-
-            power_gap = round(pressure_mpa * (feed_loss / 60 / 60) * 1000, 3)
-            power_theory = round(pressure_mpa * (flow_rate_theory / 60 / 60) * 1000, 3)
-            power_required = round(power_theory / kpd_mech, 3)
-            power_full = round(power_required + power_gap, 3)
-
-            kpd_total = round(kpd_mech * kpd_vol_2, 3)
-
-            effective_koef = power_full / flow_rate_real
-            if effective_koef <= 0:
-                continue
-
-            if effective_koef < min_effective_koef:
-                min_effective_koef = effective_koef
-                best_params = (r_ratio, t_ratio, alpha, kpd_vol_2, ext_r, int_r, t, phi, lambda_val,
-                               stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist,
-                               density, viscosity_dyn, viscosity_kin, capacity_temp,
-                               feed_loss, flow_rate_theory, flow_rate_real,
-                               kpd_mech, power_gap, power_theory, power_required, power_full, kpd_total)
-                logger.debug(
-                    f"Новая лучшая комбинация: r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha}, effective_koef={effective_koef:.6f}")
-        except Exception as e:
-            logger.debug(
-                f"Ошибка в переборе параметров r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha}: {e}")
-            continue
-
-    if best_params is None:
+    axes = kernel.geometry_axes(r_ratio_start=0.505, t_ratio_start=0.710)
+    evaluate = partial(kernel.sweep, flow_rate=flow_rate, pressure=pressure, rotation_speed=rotation_speed,
+                       density=density, viscosity_dyn=viscosity_dyn, viscosity_kin=viscosity_kin,
+                       heat_capacity=capacity_temp, temperature=temperature, kpd_vol_pre=kpd_vol_pre_fixed,
+                       double_inlet=double_inlet, num_threads=num_threads)
+    best, report = kernel.search(axes, evaluate, optimizer=optimizer, verify=verify)
+    logger.info(f"Оптимизация ({optimizer}): {report}")
+
+    if best is None:
         logger.warning("Не удалось найти подходящую комбинацию параметров.")
         return None
     logger.info(
-        f"Лучшие параметры: r_ratio={best_params[0]}, t_ratio={best_params[1]}, alpha={best_params[2]}, effective_koef={min_effective_koef:.6f}")
-    r_ratio_b, t_ratio_b, alpha_b, kpd_vol_2_b, ext_r_b, int_r_b, t_b, phi_b, lambda_val_b = best_params[:9]
+        f"Лучшие параметры: r_ratio={best['r_ratio']}, t_ratio={best['t_ratio']}, alpha={best['alpha']}, effective_koef={best['effective_koef']:.6f}")
 
-    pre_calc_result = pre_calc(r_ratio_b, t_ratio_b, alpha_b, kpd_vol_2_b, flow_rate_adj)
-    if pre_calc_result is None:
+    point = kernel.design_point(best['r_ratio'], best['t_ratio'], best['alpha'], best['kpd_vol'], flow_rate,
+                                pressure, rotation_speed, density, viscosity_dyn, viscosity_kin, capacity_temp,
+                                temperature, double_inlet=double_inlet, num_threads=num_threads)
+    if point is None:
         return None  # или выбросить исключение
-    ext_r, int_r, t, phi, lambda_val = pre_calc_result
-    f = partial(dtheta1_ddelta, r_ratio=r_ratio_b, ext_r=ext_r, t=t, alpha_deg=alpha_b)
-    theta1_root = bisect(f, 0.01, math.pi - 0.01, xtol=1e-6)
-    delta_t_val = delta_t(theta1_root, r_ratio_b, ext_r, t, alpha_b)
-    stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist = gap_calc(delta_t_val, t, ext_r, int_r,
-                                                                                           alpha_b, num_threads)
-    density, viscosity_dyn, viscosity_kin, capacity_temp = calc_liquid_prop(temperature)
-
-    pressure_mpa = 0.009806649643957326 * pressure
-    k = 0.94
-    dp_per_turn = 0.71 * (viscosity_kin / 1) ** k
-    dp_per_turn = max(0.5, min(dp_per_turn, 5))
-
-    pressure_kgs_sm = 10.197162 * pressure_mpa
-    turns_est = round(round(pressure_kgs_sm / dp_per_turn, 1) / 10, 2)
-    thread_length_mm = round(turns_est * t, 1)
-
-    stator_gap_koef = 0.7
-    feed_loss_stator = 60 * 60 * 2 * ((stator_gap * stator_gap_koef / 1000 / 2) ** 3) * (
-                (2 * math.pi - phi) * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                   12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-    screw_gap_koef = 1
-    feed_loss_screw = 60 * 60 * ((screw_gap * screw_gap_koef / 1000 / 2) ** 3) * (phi * ext_r / 1000) * (
-                pressure_mpa * 1_000_000) / (12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-    side_gap_koef = 1
-    feed_loss_side = 60 * 60 * ((side_gap * side_gap_koef / 1000 / 2) ** 3) * (
-                side_gap * side_gap_koef * (math.sin(phi / 2) * ext_r / 1000)) * (pressure_mpa * 1_000_000) / (
-                                 12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-    feed_loss = feed_loss_stator + feed_loss_screw + feed_loss_side
-
-    multiplier = 2 if double_inlet else 1
-    flow_rate_theory = multiplier * lambda_val * ext_r ** 2 * t * rotation_speed * 60 / 1_000_000_000
-
-    kpd_vol_2 = 1 - feed_loss / flow_rate_theory
-    flow_rate_real = kpd_vol_2 * flow_rate_theory
-
-    w = math.pi * rotation_speed / 30
-    k_t = density * capacity_temp * temperature / ((viscosity_dyn / 1000) * w)
-    g = pressure_mpa * 1_000_000 / (viscosity_dyn / 1000) / w
-    f_m = (thread_length_mm / t) * math.pow(k_t, 0.55) * math.pow(g, -1)
-    k_m = 15 * math.pow(ext_r / int_r, -2.7)
-
-    kpd_mech = 1 / (1 + f_m * k_m)
-
-    power_gap = pressure_mpa * (feed_loss / 60 / 60) * 1000
-    power_theory = pressure_mpa * (flow_rate_theory / 60 / 60) * 1000
-    power_required = power_theory / kpd_mech
-    power_full = power_required + power_gap
-
-    kpd_total = kpd_mech * kpd_vol_2
 
     # Возвращаем результаты
-    results_dict = {
-        "flow_rate": flow_rate,
-        "pressure": pressure,
-        "rotation_speed": rotation_speed,
-        "temperature": temperature,
-        "flow_rate_real": flow_rate_real,
-        "kpd_vol": kpd_vol_2,
-        "kpd_mech": kpd_mech,
-        "kpd_total": kpd_total,
-        "delta_t_val": delta_t_val,
-        "stator_gap": stator_gap,
-        "screw_gap": screw_gap,
-        "side_gap": side_gap,
-        "power_full": power_full,
-        "effective_koef": power_full / flow_rate_real,
-        "r_ratio": r_ratio_b,
-        "t_ratio": t_ratio_b,
-        "alpha": alpha_b,
-        "ext_radius_mm": ext_r,
-        "int_radius_mm": int_r,
-        "t_mm": t,
-        "axis_dist": axis_dist,
-        "thread_length_mm": thread_length_mm,
-        "phi": phi,
-        "lambda_val": lambda_val,
-        "b_ext_top": b_ext_top,
-        "b_int_low": b_int_low,
-        "b_ext_low": b_ext_low,
-        "density": density,
-        "viscosity_dyn": viscosity_dyn,
-        "viscosity_kin": viscosity_kin,
-        "capacity_temp": capacity_temp,
-        "feed_loss": feed_loss,
-        "flow_rate_theory": flow_rate_theory,
-        "power_gap": power_gap,
-        "power_theory": power_theory,
-        "power_required": power_required,
-    }
+    results_dict = kernel.results_row(
+        {"flow_rate": flow_rate, "pressure": pressure, "rotation_speed": rotation_speed, "temperature": temperature},
+        point,
+        {"density": density, "viscosity_dyn": viscosity_dyn, "viscosity_kin": viscosity_kin,
+         "capacity_temp": capacity_temp},
+    )
 
-    df = pd.DataFrame([results_dict])  # одна строка таблицы
+    if export:
+        df = pd.DataFrame([results_dict])  # одна строка таблицы
 
-    # Имя файла по наружному диаметру
-    ext_diam = round(ext_r * 2, 1)
-    filename = f"twin_screw_D{ext_diam}mm.xlsx"
+        # Имя файла по наружному диаметру
+        ext_diam = round(point['ext_radius_mm'] * 2, 1)
+        filename = f"twin_screw_D{ext_diam}mm.xlsx"
 
-    # Сохранение
-    df.to_excel(filename, index=False)
-    print(f"Результаты сохранены в файл: {filename}")
+        # Сохранение
+        df.to_excel(filename, index=False)
+        print(f"Результаты сохранены в файл: {filename}")
 
     return results_dict
 
 
-def twin_screw_temperature(flow_rate, pressure, rotation_speed, double_inlet=True, num_threads=2):
-
-    def pre_calc(r_ratio, t_ratio, alpha, kpd_vol, flow_rate_add):
-        phi = 2 * math.acos((1 + r_ratio) / 2)
-
-        pi = math.pi
-        lambda_val = (
-                2 * pi
-                - phi
-                + math.sin(phi)
-                - pi * (1 + r_ratio ** 2)
-                + (2 * pi * math.tan(math.radians(alpha)) * (1 - r_ratio) ** 3) / (3 * t_ratio)
-        )
-
-        val = 200 * (
-                (
-                        flow_rate_add / (lambda_val * kpd_vol * t_ratio * rotation_speed * 60)
-                ) ** (1 / 3)) * 10
-
-        # Проверяем, что val вещественное число, а не комплексное
-        if isinstance(val, complex):
-            logger.debug(
-                f"pre_calc: комплексное значение val={val} для r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha}")
-            return None
-
-        ext_diam_mm = round(val, 1)
-        ext_radius_mm = round(ext_diam_mm / 2, 2)
-        int_radius_mm = round(ext_radius_mm * r_ratio, 2)
-        t_mm = round(ext_radius_mm * t_ratio, 1)
-        logger.debug(
-            f"pre_calc: r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha} => ext_r={ext_radius_mm}, int_r={int_radius_mm}, t={t_mm}, phi={phi:.3f}, lambda_val={lambda_val:.3f}")
-        return ext_radius_mm, int_radius_mm, t_mm, phi, lambda_val
-
-    def dtheta1_ddelta(theta1, r_ratio, ext_r, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        cos_theta = math.cos(theta1)
-        sin_theta = math.sin(theta1)
-
-        num1 = (
-                3 * cos_theta
-                + 3 * r_ratio * cos_theta
-                - 3
-                - 2 * r_ratio
-                - r_ratio ** 2
-        )
-        den1 = (1 + r_ratio - cos_theta) ** 2 + sin_theta ** 2
-
-        first_term = - (t / (2 * pi)) * (num1 / den1)
-
-        numerator2 = (1 + r_ratio) * sin_theta
-        denominator2 = math.sqrt(
-            2 * (1 - cos_theta) * (1 + r_ratio) + r_ratio ** 2
-        )
-
-        second_term = ext_r * math.tan(alpha_rad) * (numerator2 / denominator2)
-
-        return first_term + second_term
-
-    def delta_t(theta1_max, r_ratio, R, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        arctan_part = math.atan(
-            math.sin(theta1_max) / (1 + r_ratio - math.cos(theta1_max))
-        )
-        first_term = (t / (2 * pi)) * (arctan_part - theta1_max)
-
-        root_argument = 2 * (1 - math.cos(theta1_max)) * (1 + r_ratio) + r_ratio ** 2
-        second_term = R * math.tan(alpha_rad) * (math.sqrt(root_argument) - r_ratio)
-
-        return first_term - second_term
-
-    def gap_calc(delt_t, t, ext_r, int_r, alpha, num):
-        b_ext_top = round(t / 2 - (delt_t + 2 * (ext_r - int_r) * math.tan(math.radians(alpha))), 1) / num
-        b_ext_low = round(t - num * b_ext_top, 1) / num
-        b_int_low = round(b_ext_low - 2 * math.tan(math.radians(alpha)) * (ext_r - int_r), 1)
-
-        stator_gap = round(round(delt_t / 0.05) * 0.05, 2)
-        screw_gap = round(round(0.7 * delt_t / 0.05) * 0.05, 2)
-        side_gap = round((b_int_low - b_ext_top) / 2, 2)
-
-        axis_dist = round((ext_r + int_r + screw_gap) / 0.1) * 0.1
-        # Если зазор отрицательный, уменьшать число заходов num
-        return stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist
-
-    def calc_liquid_prop(temp):
-        temp_20 = 20
-
-        density_20 = 998.2
-        density_koef = 0.0002
-        density = round(density_20 * (1 - density_koef * (temp - temp_20)), 2)
-
-        viscosity_dyn_20 = 1.003
-        viscosity_dyn_koef = 0.023
-        viscosity_dyn = round(viscosity_dyn_20 * math.exp(-viscosity_dyn_koef * (temp - temp_20)), 3)
-
-        viscosity_kin = round(viscosity_dyn / density * 1000, 3)
-
-        capacity_temp = round(4212 - 3.2 * temp + 0.014 * math.pow(temp, 2), 2)
+def twin_screw_best(grid, flow_rate, pressure, rotation_speed, temperature, kpd_vol_pre, double_inlet=True,
+                    num_threads=2):
+    """Лучшая по effective_koef комбинация сетки со значениями перебора или None"""
+    density, viscosity_dyn, viscosity_kin, capacity_temp = kernel.calc_liquid_prop(temperature)
+    lanes = kernel.sweep(*grid, flow_rate, pressure, rotation_speed, density, viscosity_dyn, viscosity_kin,
+                         capacity_temp, temperature, kpd_vol_pre=kpd_vol_pre, double_inlet=double_inlet,
+                         num_threads=num_threads)
+    best_index = kernel.best_index(lanes)
+    if best_index is None:
+        return None
+    return kernel.results_row(
+        {"temperature": temperature, "flow_rate": flow_rate, "pressure": pressure, "rotation_speed": rotation_speed},
+        kernel.lane(lanes, best_index),
+        {"density": density, "viscosity_dyn": viscosity_dyn, "viscosity_kin": viscosity_kin,
+         "capacity_temp": capacity_temp},
+    )
 
-        return density, viscosity_dyn, viscosity_kin, capacity_temp
 
-    flow_rate_adj = flow_rate / 2 if double_inlet else flow_rate
+def twin_screw_temperature(flow_rate, pressure, rotation_speed, double_inlet=True, num_threads=2):
     kpd_vol_pre_fixed = 0.933
-    r_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.400, 0.500 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.505, 0.701 + 0.001, 0.05)]
-    ))
-    t_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.500, 0.700 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.710, 1.250 + 0.001, 0.05)]
-    ))
-    alpha_values = [round(x * 0.1, 2) for x in range(0, 100 + 1)]  # 0..10 step 0.1
-    combinations = list(itertools.product(r_ratio_values, t_ratio_values, alpha_values))
+    grid = kernel.geometry_grid(r_ratio_start=0.505, t_ratio_start=0.710, step=0.05)
 
     temperature_values = list(range(20, 101))
     results_list = []
 
     for temperature in tqdm(temperature_values, desc="Поиск по температурам"):
-        best_params = None
-        min_effective_koef = float('inf')
-
-        for r_ratio, t_ratio, alpha in combinations:
-            try:
-                pre_calc_result = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed, flow_rate_adj)
-                if pre_calc_result is None:
-                    continue  # Пропускаем комплексные значения
-
-                ext_r, int_r, t, phi, lambda_val = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed,
-                                                            flow_rate_adj)
-                f = partial(dtheta1_ddelta, r_ratio=r_ratio, ext_r=ext_r, t=t, alpha_deg=alpha)
-                theta1_root = bisect(f, 0.01, math.pi - 0.01, xtol=1e-6)
-                delta_t_val = delta_t(theta1_root, r_ratio, ext_r, t, alpha)
-                stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist = gap_calc(delta_t_val, t,
-                                                                                                 ext_r, int_r,
-                                                                                                   alpha,
-                                                                                                   num_threads)
-                density, viscosity_dyn, viscosity_kin, capacity_temp = calc_liquid_prop(temperature)
-
-                pressure_mpa = 0.009806649643957326 * pressure
-                k = 0.94
-                dp_per_turn = 0.71 * (viscosity_kin / 1) ** k
-                dp_per_turn = max(0.5, min(dp_per_turn, 5))
-
-                pressure_kgs_sm = 10.197162 * pressure_mpa
-                turns_est = round(round(pressure_kgs_sm / dp_per_turn, 1) / 10, 2)
-                thread_length_mm = round(turns_est * t, 1)
-
-                stator_gap_koef = 0.7
-                feed_loss_stator = 60 * 60 * 2 * ((stator_gap * stator_gap_koef / 1000 / 2) ** 3) * (
-                        (2 * math.pi - phi) * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                           12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-                screw_gap_koef = 1
-                feed_loss_screw = 60 * 60 * ((screw_gap * screw_gap_koef / 1000 / 2) ** 3) * (
-                        phi * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                              12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-                side_gap_koef = 1
-                feed_loss_side = 60 * 60 * ((side_gap * side_gap_koef / 1000 / 2) ** 3) * (
-                        side_gap * side_gap_koef * (math.sin(phi / 2) * ext_r / 1000)) * (
-                                             pressure_mpa * 1_000_000) / (
-                                             12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-                feed_loss = feed_loss_stator + feed_loss_screw + feed_loss_side
-
-                multiplier = 2 if double_inlet else 1
-                flow_rate_theory = round(
-                            multiplier * lambda_val * ext_r ** 2 * t * rotation_speed * 60 / 1_000_000_000, 1)
-
-                kpd_vol_2 = round(1 - feed_loss / flow_rate_theory, 3)
-                flow_rate_real = kpd_vol_2 * flow_rate_theory
-
-                w = math.pi * rotation_speed / 30
-                k_t = density * capacity_temp * temperature / ((viscosity_dyn / 1000) * w)
-                g = pressure_mpa * 1_000_000 / (viscosity_dyn / 1000) / w
-                f_m = (thread_length_mm / t) * math.pow(k_t, 0.55) * math.pow(g, -1)
-                k_m = 15 * math.pow(ext_r / int_r, -2.7)
-
-                kpd_mech = round(1 / (1 + f_m * k_m), 3)
-
-                power_gap = round(pressure_mpa * (feed_loss / 60 / 60) * 1000, 3)
-                power_theory = round(pressure_mpa * (flow_rate_theory / 60 / 60) * 1000, 3)
-                power_required = round(power_theory / kpd_mech, 3)
-                power_full = round(power_required + power_gap, 3)
-
-                kpd_total = round(kpd_mech * kpd_vol_2, 3)
-
-                effective_koef = power_full / flow_rate_real
-                if effective_koef > 0 and effective_koef < min_effective_koef:
-                    min_effective_koef = effective_koef
-                    best_params = {
-                        "temperature": temperature,
-                        "flow_rate": flow_rate,
-                        "pressure": pressure,
-                        "rotation_speed": rotation_speed,
-                        "flow_rate_real": flow_rate_real,
-                        "kpd_vol": kpd_vol_2,
-                        "kpd_mech": kpd_mech,
-                        "kpd_total": kpd_total,
-                        "delta_t_val": delta_t_val,
-                        "stator_gap": stator_gap,
-                        "screw_gap": screw_gap,
-                        "side_gap": side_gap,
-                        "power_full": power_full,
-                        "effective_koef": effective_koef,
-                        "r_ratio": r_ratio,
-                        "t_ratio": t_ratio,
-                        "alpha": alpha,
-                        "ext_radius_mm": ext_r,
-                        "int_radius_mm": int_r,
-                        "t_mm": t,
-                        "axis_dist": axis_dist,
-                        "thread_length_mm": thread_length_mm,
-                        "phi": phi,
-                        "lambda_val": lambda_val,
-                        "b_ext_top": b_ext_top,
-                        "b_int_low": b_int_low,
-                        "b_ext_low": b_ext_low,
-                        "density": density,
-                        "viscosity_dyn": viscosity_dyn,
-                        "viscosity_kin": viscosity_kin,
-                        "capacity_temp": capacity_temp,
-                        "feed_loss": feed_loss,
-                        "flow_rate_theory": flow_rate_theory,
-                        "power_gap": power_gap,
-                        "power_theory": power_theory,
-                        "power_required": power_required,
-                    }
-            except Exception as e:
-                continue
-
+        best_params = twin_screw_best(grid, flow_rate, pressure, rotation_speed, temperature, kpd_vol_pre_fixed,
+                                      double_inlet, num_threads)
         if best_params:
             results_list.append(best_params)
 
@@ -1377,30 +911,20 @@ def twin_screw_temperature(flow_rate, pressure, rotation_speed, double_inlet=Tru
     return results_list
 
 
-def twin_screw_feed_pressure(rotation_speed, temperature, double_inlet=True, num_threads=2):
+def twin_screw_feed_pressure(rotation_speed, temperature, double_inlet=True, num_threads=2, workers=None,
+                             resume=True, optimizer="exhaustive"):
+    from .envelope import build_envelope
+
     flow_rates = list(range(10, 501, 10))
     pressures = list(range(25, 501, 25))
 
-    results = []
+    table = build_envelope(flow_rates, pressures, rotation_speed, temperature,
+                           f"twin_screw_QH_n{rotation_speed}_t{temperature}.csv", double_inlet=double_inlet,
+                           num_threads=num_threads, workers=workers, resume=resume, optimizer=optimizer)
 
-    for flow_rate in tqdm(flow_rates, desc="Перебор подач"):
-        for pressure in tqdm(pressures, desc=f"Перебор напоров для Q={flow_rate}", leave=False):
-            try:
-                result = twin_screw(
-                    flow_rate=flow_rate,
-                    pressure=pressure,
-                    rotation_speed=rotation_speed,
-                    temperature=temperature,
-                    double_inlet=double_inlet,
-                    num_threads=num_threads,
-                )
-                if result:
-                    results.append(result)
-            except Exception as e:
-                logger.warning(f"Ошибка при расчете Q={flow_rate}, H={pressure}: {e}")
-
-    if results:
-        df = pd.DataFrame(results)
+    df = pd.read_csv(table).dropna(subset=["effective_koef"])
+    if not df.empty:
+        df = df.sort_values(["flow_rate", "pressure"])
         filename = "twin_screw_QH_range.xlsx"
         df.to_excel(filename, index=False)
         print(f"Результаты сохранены в файл: {filename}")
@@ -1409,239 +933,15 @@ def twin_screw_feed_pressure(rotation_speed, temperature, double_inlet=True, num
 
 
 def twin_screw_rotation(flow_rate, pressure, temperature, double_inlet=True, num_threads=2):
-
-    def pre_calc(r_ratio, t_ratio, alpha, kpd_vol, flow_rate_add):
-        phi = 2 * math.acos((1 + r_ratio) / 2)
-
-        pi = math.pi
-        lambda_val = (
-                2 * pi
-                - phi
-                + math.sin(phi)
-                - pi * (1 + r_ratio ** 2)
-                + (2 * pi * math.tan(math.radians(alpha)) * (1 - r_ratio) ** 3) / (3 * t_ratio)
-        )
-
-        val = 200 * (
-                (
-                        flow_rate_add / (lambda_val * kpd_vol * t_ratio * rotation_speed * 60)
-                ) ** (1 / 3)) * 10
-
-        # Проверяем, что val вещественное число, а не комплексное
-        if isinstance(val, complex):
-            logger.debug(
-                f"pre_calc: комплексное значение val={val} для r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha}")
-            return None
-
-        ext_diam_mm = round(val, 1)
-        ext_radius_mm = round(ext_diam_mm / 2, 2)
-        int_radius_mm = round(ext_radius_mm * r_ratio, 2)
-        t_mm = round(ext_radius_mm * t_ratio, 1)
-        logger.debug(
-            f"pre_calc: r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha} => ext_r={ext_radius_mm}, int_r={int_radius_mm}, t={t_mm}, phi={phi:.3f}, lambda_val={lambda_val:.3f}")
-        return ext_radius_mm, int_radius_mm, t_mm, phi, lambda_val
-
-    def dtheta1_ddelta(theta1, r_ratio, ext_r, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        cos_theta = math.cos(theta1)
-        sin_theta = math.sin(theta1)
-
-        num1 = (
-                3 * cos_theta
-                + 3 * r_ratio * cos_theta
-                - 3
-                - 2 * r_ratio
-                - r_ratio ** 2
-        )
-        den1 = (1 + r_ratio - cos_theta) ** 2 + sin_theta ** 2
-
-        first_term = - (t / (2 * pi)) * (num1 / den1)
-
-        numerator2 = (1 + r_ratio) * sin_theta
-        denominator2 = math.sqrt(
-            2 * (1 - cos_theta) * (1 + r_ratio) + r_ratio ** 2
-        )
-
-        second_term = ext_r * math.tan(alpha_rad) * (numerator2 / denominator2)
-
-        return first_term + second_term
-
-    def delta_t(theta1_max, r_ratio, R, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        arctan_part = math.atan(
-            math.sin(theta1_max) / (1 + r_ratio - math.cos(theta1_max))
-        )
-        first_term = (t / (2 * pi)) * (arctan_part - theta1_max)
-
-        root_argument = 2 * (1 - math.cos(theta1_max)) * (1 + r_ratio) + r_ratio ** 2
-        second_term = R * math.tan(alpha_rad) * (math.sqrt(root_argument) - r_ratio)
-
-        return first_term - second_term
-
-    def gap_calc(delt_t, t, ext_r, int_r, alpha, num):
-        b_ext_top = round(t / 2 - (delt_t + 2 * (ext_r - int_r) * math.tan(math.radians(alpha))), 1) / num
-        b_ext_low = round(t - num * b_ext_top, 1) / num
-        b_int_low = round(b_ext_low - 2 * math.tan(math.radians(alpha)) * (ext_r - int_r), 1)
-
-        stator_gap = round(round(delt_t / 0.05) * 0.05, 2)
-        screw_gap = round(round(0.7 * delt_t / 0.05) * 0.05, 2)
-        side_gap = round((b_int_low - b_ext_top) / 2, 2)
-
-        axis_dist = round((ext_r + int_r + screw_gap) / 0.1) * 0.1
-        # Если зазор отрицательный, уменьшать число заходов num
-        return stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist
-
-    def calc_liquid_prop(temp):
-        temp_20 = 20
-
-        density_20 = 998.2
-        density_koef = 0.0002
-        density = round(density_20 * (1 - density_koef * (temp - temp_20)), 2)
-
-        viscosity_dyn_20 = 1.003
-        viscosity_dyn_koef = 0.023
-        viscosity_dyn = round(viscosity_dyn_20 * math.exp(-viscosity_dyn_koef * (temp - temp_20)), 3)
-
-        viscosity_kin = round(viscosity_dyn / density * 1000, 3)
-
-        capacity_temp = round(4212 - 3.2 * temp + 0.014 * math.pow(temp, 2), 2)
-
-        return density, viscosity_dyn, viscosity_kin, capacity_temp
-
-    flow_rate_adj = flow_rate / 2 if double_inlet else flow_rate
     kpd_vol_pre_fixed = 0.933
-    r_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.400, 0.500 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.505, 0.701 + 0.001, 0.05)]
-    ))
-    t_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.500, 0.700 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.710, 1.250 + 0.001, 0.05)]
-    ))
-    alpha_values = [round(x * 0.1, 2) for x in range(0, 100 + 1)]  # 0..10 step 0.1
-    combinations = list(itertools.product(r_ratio_values, t_ratio_values, alpha_values))
+    grid = kernel.geometry_grid(r_ratio_start=0.505, t_ratio_start=0.710, step=0.05)
 
     rotation_speed_values = list(range(50, 3001, 50))
     results_list = []
 
     for rotation_speed in tqdm(rotation_speed_values, desc="Поиск по частоте вращения"):
-        best_params = None
-        min_effective_koef = float('inf')
-
-        for r_ratio, t_ratio, alpha in combinations:
-            try:
-                pre_calc_result = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed, flow_rate_adj)
-                if pre_calc_result is None:
-                    continue  # Пропускаем комплексные значения
-
-                ext_r, int_r, t, phi, lambda_val = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed,
-                                                            flow_rate_adj)
-                f = partial(dtheta1_ddelta, r_ratio=r_ratio, ext_r=ext_r, t=t, alpha_deg=alpha)
-                theta1_root = bisect(f, 0.01, math.pi - 0.01, xtol=1e-6)
-                delta_t_val = delta_t(theta1_root, r_ratio, ext_r, t, alpha)
-                stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist = gap_calc(delta_t_val, t,
-                                                                                                 ext_r, int_r,
-                                                                                                   alpha,
-                                                                                                   num_threads)
-                density, viscosity_dyn, viscosity_kin, capacity_temp = calc_liquid_prop(temperature)
-
-                pressure_mpa = 0.009806649643957326 * pressure
-                k = 0.94
-                dp_per_turn = 0.71 * (viscosity_kin / 1) ** k
-                dp_per_turn = max(0.5, min(dp_per_turn, 5))
-
-                pressure_kgs_sm = 10.197162 * pressure_mpa
-                turns_est = round(round(pressure_kgs_sm / dp_per_turn, 1) / 10, 2)
-                thread_length_mm = round(turns_est * t, 1)
-
-                stator_gap_koef = 0.7
-                feed_loss_stator = 60 * 60 * 2 * ((stator_gap * stator_gap_koef / 1000 / 2) ** 3) * (
-                        (2 * math.pi - phi) * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                           12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-                screw_gap_koef = 1
-                feed_loss_screw = 60 * 60 * ((screw_gap * screw_gap_koef / 1000 / 2) ** 3) * (
-                        phi * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                              12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-                side_gap_koef = 1
-                feed_loss_side = 60 * 60 * ((side_gap * side_gap_koef / 1000 / 2) ** 3) * (
-                        side_gap * side_gap_koef * (math.sin(phi / 2) * ext_r / 1000)) * (
-                                             pressure_mpa * 1_000_000) / (
-                                             12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-                feed_loss = feed_loss_stator + feed_loss_screw + feed_loss_side
-
-                multiplier = 2 if double_inlet else 1
-                flow_rate_theory = round(
-                            multiplier * lambda_val * ext_r ** 2 * t * rotation_speed * 60 / 1_000_000_000, 1)
-
-                kpd_vol_2 = round(1 - feed_loss / flow_rate_theory, 3)
-                flow_rate_real = kpd_vol_2 * flow_rate_theory
-
-                w = math.pi * rotation_speed / 30
-                k_t = density * capacity_temp * temperature / ((viscosity_dyn / 1000) * w)
-                g = pressure_mpa * 1_000_000 / (viscosity_dyn / 1000) / w
-                f_m = (thread_length_mm / t) * math.pow(k_t, 0.55) * math.pow(g, -1)
-                k_m = 15 * math.pow(ext_r / int_r, -2.7)
-
-                kpd_mech = round(1 / (1 + f_m * k_m), 3)
-
-                power_gap = round(pressure_mpa * (feed_loss / 60 / 60) * 1000, 3)
-                power_theory = round(pressure_mpa * (flow_rate_theory / 60 / 60) * 1000, 3)
-                power_required = round(power_theory / kpd_mech, 3)
-                power_full = round(power_required + power_gap, 3)
-
-                kpd_total = round(kpd_mech * kpd_vol_2, 3)
-
-                effective_koef = power_full / flow_rate_real
-                if 0 < effective_koef < min_effective_koef:
-                    min_effective_koef = effective_koef
-                    best_params = {
-                        "temperature": temperature,
-                        "flow_rate": flow_rate,
-                        "pressure": pressure,
-                        "rotation_speed": rotation_speed,
-                        "flow_rate_real": flow_rate_real,
-                        "kpd_vol": kpd_vol_2,
-                        "kpd_mech": kpd_mech,
-                        "kpd_total": kpd_total,
-                        "delta_t_val": delta_t_val,
-                        "stator_gap": stator_gap,
-                        "screw_gap": screw_gap,
-                        "side_gap": side_gap,
-                        "power_full": power_full,
-                        "effective_koef": effective_koef,
-                        "r_ratio": r_ratio,
-                        "t_ratio": t_ratio,
-                        "alpha": alpha,
-                        "ext_radius_mm": ext_r,
-                        "int_radius_mm": int_r,
-                        "t_mm": t,
-                        "axis_dist": axis_dist,
-                        "thread_length_mm": thread_length_mm,
-                        "phi": phi,
-                        "lambda_val": lambda_val,
-                        "b_ext_top": b_ext_top,
-                        "b_int_low": b_int_low,
-                        "b_ext_low": b_ext_low,
-                        "density": density,
-                        "viscosity_dyn": viscosity_dyn,
-                        "viscosity_kin": viscosity_kin,
-                        "capacity_temp": capacity_temp,
-                        "feed_loss": feed_loss,
-                        "flow_rate_theory": flow_rate_theory,
-                        "power_gap": power_gap,
-                        "power_theory": power_theory,
-                        "power_required": power_required,
-                    }
-            except Exception as e:
-                continue
-
+        best_params = twin_screw_best(grid, flow_rate, pressure, rotation_speed, temperature, kpd_vol_pre_fixed,
+                                      double_inlet, num_threads)
         if best_params:
             results_list.append(best_params)
 
@@ -1657,244 +957,22 @@ def twin_screw_rotation(flow_rate, pressure, temperature, double_inlet=True, num
 
 
 def twin_screw_rotation_temperature(flow_rate, pressure, double_inlet=True, num_threads=2):
-
-    def pre_calc(r_ratio, t_ratio, alpha, kpd_vol, flow_rate_add):
-        phi = 2 * math.acos((1 + r_ratio) / 2)
-
-        pi = math.pi
-        lambda_val = (
-                2 * pi
-                - phi
-                + math.sin(phi)
-                - pi * (1 + r_ratio ** 2)
-                + (2 * pi * math.tan(math.radians(alpha)) * (1 - r_ratio) ** 3) / (3 * t_ratio)
-        )
-
-        val = 200 * (
-                (
-                        flow_rate_add / (lambda_val * kpd_vol * t_ratio * rotation_speed * 60)
-                ) ** (1 / 3)) * 10
-
-        # Проверяем, что val вещественное число, а не комплексное
-        if isinstance(val, complex):
-            logger.debug(
-                f"pre_calc: комплексное значение val={val} для r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha}")
-            return None
-
-        ext_diam_mm = round(val, 1)
-        ext_radius_mm = round(ext_diam_mm / 2, 2)
-        int_radius_mm = round(ext_radius_mm * r_ratio, 2)
-        t_mm = round(ext_radius_mm * t_ratio, 1)
-        logger.debug(
-            f"pre_calc: r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha} => ext_r={ext_radius_mm}, int_r={int_radius_mm}, t={t_mm}, phi={phi:.3f}, lambda_val={lambda_val:.3f}")
-        return ext_radius_mm, int_radius_mm, t_mm, phi, lambda_val
-
-    def dtheta1_ddelta(theta1, r_ratio, ext_r, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        cos_theta = math.cos(theta1)
-        sin_theta = math.sin(theta1)
-
-        num1 = (
-                3 * cos_theta
-                + 3 * r_ratio * cos_theta
-                - 3
-                - 2 * r_ratio
-                - r_ratio ** 2
-        )
-        den1 = (1 + r_ratio - cos_theta) ** 2 + sin_theta ** 2
-
-        first_term = - (t / (2 * pi)) * (num1 / den1)
-
-        numerator2 = (1 + r_ratio) * sin_theta
-        denominator2 = math.sqrt(
-            2 * (1 - cos_theta) * (1 + r_ratio) + r_ratio ** 2
-        )
-
-        second_term = ext_r * math.tan(alpha_rad) * (numerator2 / denominator2)
-
-        return first_term + second_term
-
-    def delta_t(theta1_max, r_ratio, R, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        arctan_part = math.atan(
-            math.sin(theta1_max) / (1 + r_ratio - math.cos(theta1_max))
-        )
-        first_term = (t / (2 * pi)) * (arctan_part - theta1_max)
-
-        root_argument = 2 * (1 - math.cos(theta1_max)) * (1 + r_ratio) + r_ratio ** 2
-        second_term = R * math.tan(alpha_rad) * (math.sqrt(root_argument) - r_ratio)
-
-        return first_term - second_term
-
-    def gap_calc(delt_t, t, ext_r, int_r, alpha, num):
-        b_ext_top = round(t / 2 - (delt_t + 2 * (ext_r - int_r) * math.tan(math.radians(alpha))), 1) / num
-        b_ext_low = round(t - num * b_ext_top, 1) / num
-        b_int_low = round(b_ext_low - 2 * math.tan(math.radians(alpha)) * (ext_r - int_r), 1)
-
-        stator_gap = round(round(delt_t / 0.05) * 0.05, 2)
-        screw_gap = round(round(0.7 * delt_t / 0.05) * 0.05, 2)
-        side_gap = round((b_int_low - b_ext_top) / 2, 2)
-
-        axis_dist = round((ext_r + int_r + screw_gap) / 0.1) * 0.1
-        # Если зазор отрицательный, уменьшать число заходов num
-        return stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist
-
-    def calc_liquid_prop(temp):
-        temp_20 = 20
-
-        density_20 = 998.2
-        density_koef = 0.0002
-        density = round(density_20 * (1 - density_koef * (temp - temp_20)), 2)
-
-        viscosity_dyn_20 = 1.003
-        viscosity_dyn_koef = 0.023
-        viscosity_dyn = round(viscosity_dyn_20 * math.exp(-viscosity_dyn_koef * (temp - temp_20)), 3)
-
-        viscosity_kin = round(viscosity_dyn / density * 1000, 3)
-
-        capacity_temp = round(4212 - 3.2 * temp + 0.014 * math.pow(temp, 2), 2)
-
-        return density, viscosity_dyn, viscosity_kin, capacity_temp
-
-    flow_rate_adj = flow_rate / 2 if double_inlet else flow_rate
     kpd_vol_pre_fixed = 0.933
-    r_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.400, 0.500 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.505, 0.701 + 0.001, 0.05)]
-    ))
-    t_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.500, 0.700 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.710, 1.250 + 0.001, 0.05)]
-    ))
-    alpha_values = [round(x * 0.1, 2) for x in range(0, 100 + 1)]  # 0..10 step 0.1
+    grid = kernel.geometry_grid(r_ratio_start=0.505, t_ratio_start=0.710, step=0.05)
     temperature_values = list(range(20, 101, 5))
-    combinations = list(itertools.product(r_ratio_values, t_ratio_values, alpha_values))
     rotation_speed_values = list(range(100, 3001, 100))
     results_list = []
-    results_dict = {}
 
     for rotation_speed in tqdm(rotation_speed_values, desc="Поиск по частоте вращения"):
         print(f"/{len(rotation_speed_values)}] Проверка rotation_speed = {rotation_speed} об/мин...")
         for temperature in tqdm(temperature_values, desc=f"  ⏳ Температуры при n={rotation_speed} об/мин", leave=False):
-            for r_ratio, t_ratio, alpha in combinations:
-                try:
-                    pre_calc_result = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed, flow_rate_adj)
-                    if pre_calc_result is None:
-                        continue  # Пропускаем комплексные значения
-
-                    ext_r, int_r, t, phi, lambda_val = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed,
-                                                                flow_rate_adj)
-                    f = partial(dtheta1_ddelta, r_ratio=r_ratio, ext_r=ext_r, t=t, alpha_deg=alpha)
-                    theta1_root = bisect(f, 0.01, math.pi - 0.01, xtol=1e-6)
-                    delta_t_val = delta_t(theta1_root, r_ratio, ext_r, t, alpha)
-                    stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist = gap_calc(delta_t_val, t,
-                                                                                                     ext_r, int_r,
-                                                                                                       alpha,
-                                                                                                       num_threads)
-                    density, viscosity_dyn, viscosity_kin, capacity_temp = calc_liquid_prop(temperature)
-
-                    pressure_mpa = 0.009806649643957326 * pressure
-                    k = 0.94
-                    dp_per_turn = 0.71 * (viscosity_kin / 1) ** k
-                    dp_per_turn = max(0.5, min(dp_per_turn, 5))
-
-                    pressure_kgs_sm = 10.197162 * pressure_mpa
-                    turns_est = round(round(pressure_kgs_sm / dp_per_turn, 1) / 10, 2)
-                    thread_length_mm = round(turns_est * t, 1)
-
-                    stator_gap_koef = 0.7
-                    feed_loss_stator = 60 * 60 * 2 * ((stator_gap * stator_gap_koef / 1000 / 2) ** 3) * (
-                            (2 * math.pi - phi) * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                               12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-                    screw_gap_koef = 1
-                    feed_loss_screw = 60 * 60 * ((screw_gap * screw_gap_koef / 1000 / 2) ** 3) * (
-                            phi * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                                  12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-                    side_gap_koef = 1
-                    feed_loss_side = 60 * 60 * ((side_gap * side_gap_koef / 1000 / 2) ** 3) * (
-                            side_gap * side_gap_koef * (math.sin(phi / 2) * ext_r / 1000)) * (
-                                                 pressure_mpa * 1_000_000) / (
-                                                 12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
-
-                    feed_loss = feed_loss_stator + feed_loss_screw + feed_loss_side
-
-                    multiplier = 2 if double_inlet else 1
-                    flow_rate_theory = round(
-                                multiplier * lambda_val * ext_r ** 2 * t * rotation_speed * 60 / 1_000_000_000, 1)
-
-                    kpd_vol_2 = round(1 - feed_loss / flow_rate_theory, 3)
-                    flow_rate_real = kpd_vol_2 * flow_rate_theory
-
-                    w = math.pi * rotation_speed / 30
-                    k_t = density * capacity_temp * temperature / ((viscosity_dyn / 1000) * w)
-                    g = pressure_mpa * 1_000_000 / (viscosity_dyn / 1000) / w
-                    f_m = (thread_length_mm / t) * math.pow(k_t, 0.55) * math.pow(g, -1)
-                    k_m = 15 * math.pow(ext_r / int_r, -2.7)
-
-                    kpd_mech = round(1 / (1 + f_m * k_m), 3)
-
-                    power_gap = round(pressure_mpa * (feed_loss / 60 / 60) * 1000, 3)
-                    power_theory = round(pressure_mpa * (flow_rate_theory / 60 / 60) * 1000, 3)
-                    power_required = round(power_theory / kpd_mech, 3)
-                    power_full = round(power_required + power_gap, 3)
-
-                    kpd_total = round(kpd_mech * kpd_vol_2, 3)
-
-                    effective_koef = power_full / flow_rate_real
-                    key = (rotation_speed, temperature)
-
-                    if effective_koef > 0:
-                        if key not in results_dict or effective_koef < results_dict[key]['effective_koef']:
-                            results_dict[key] = {
-                                "temperature": temperature,
-                                "flow_rate": flow_rate,
-                                "pressure": pressure,
-                                "rotation_speed": rotation_speed,
-                                "flow_rate_real": flow_rate_real,
-                                "kpd_vol": kpd_vol_2,
-                                "kpd_mech": kpd_mech,
-                                "kpd_total": kpd_total,
-                                "delta_t_val": delta_t_val,
-                                "stator_gap": stator_gap,
-                                "screw_gap": screw_gap,
-                                "side_gap": side_gap,
-                                "power_full": power_full,
-                                "effective_koef": effective_koef,
-                                "r_ratio": r_ratio,
-                                "t_ratio": t_ratio,
-                                "alpha": alpha,
-                                "ext_radius_mm": ext_r,
-                                "int_radius_mm": int_r,
-                                "t_mm": t,
-                                "axis_dist": axis_dist,
-                                "thread_length_mm": thread_length_mm,
-                                "phi": phi,
-                                "lambda_val": lambda_val,
-                                "b_ext_top": b_ext_top,
-                                "b_int_low": b_int_low,
-                                "b_ext_low": b_ext_low,
-                                "density": density,
-                                "viscosity_dyn": viscosity_dyn,
-                                "viscosity_kin": viscosity_kin,
-                                "capacity_temp": capacity_temp,
-                                "feed_loss": feed_loss,
-                                "flow_rate_theory": flow_rate_theory,
-                                "power_gap": power_gap,
-                                "power_theory": power_theory,
-                                "power_required": power_required,
-                            }
-
-                except Exception as e:
-                    continue
-
-    if results_list or results_dict:
-        df = pd.DataFrame(list(results_dict.values()))
+            best_params = twin_screw_best(grid, flow_rate, pressure, rotation_speed, temperature, kpd_vol_pre_fixed,
+                                          double_inlet, num_threads)
+            if best_params:
+                results_list.append(best_params)
+
+    if results_list:
+        df = pd.DataFrame(results_list)
         filename = f"twin_screw_rotation_speed_and_temperature_range.xlsx"
         df.to_excel(filename, index=False)
         print(f"✅ Сохранено {len(df)} строк в файл: {filename}")
@@ -101,7 +101,8 @@ def add_frame(main_doc, template_name, section_index=0):
         section.header._element.append(deepcopy(element))
 
 
-def generate_report(result):
+def generate_report(result, target=None):
+    """Отчет о расчете тройника; target — путь или файловый объект, по умолчанию файл по имени расчета"""
     d = SimpleNamespace(**result)
     print('d')
     for k in result.keys():
@@ -495,7 +496,8 @@ def generate_report(result):
 
     # Сохраняем файл
     filename = f"Расчет_толщин_стенок_тройника_{int(d.D_N_pipe)}_{int(d.D_N_b)}_{int(d.pressure * 10)}"
-    doc.save(f'{filename}.docx')
+    doc.save(target or f'{filename}.docx')
+    return f'{filename}.docx'
 
     # main_doc = Document(f'{filename}.docx')
     # add_frame(main_doc, 'template_1.docx', section_index=0)
@@ -5,6 +5,7 @@ import bisect
 from Flanges_calculations.steel_prop_data import strength_data_1, yield_data_1, E_modulus_data_1, alpha_data_1
 from .data import class_data, k_n_values
 from .report_doc import generate_report
+from Master.workspace import attachment
 
 
 def t_pipes(request):
@@ -71,8 +72,10 @@ def t_pipes(request):
 
         result = calc(input_data, input_select)
         print_result(result)
-        generate_report(result)
+        # Отчет собирается в памяти и отдается на скачивание — без общего файла в рабочем каталоге
+        response = attachment(lambda buffer: generate_report(result, buffer))
         print("отчет создан")
+        return response
 
     return render(request, 't_pipes.html', context)
 
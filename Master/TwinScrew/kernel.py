@@ -0,0 +1,568 @@
+import math
+from collections import namedtuple
+
+import numpy as np
+
+
+BISECT_RTOL = 4 * np.finfo(float).eps
+
+
+def bisect(f, a, b, xtol=2e-12, rtol=BISECT_RTOL, maxiter=100, shape=()):
+    """Бисекция по всем элементам сразу, повторяет шаги scipy.optimize.bisect"""
+    xa = np.full(shape, float(a))
+    fa = f(xa)
+    fb = f(np.full(shape, float(b)))
+
+    valid = ~(fa * fb > 0)
+    root = np.full(shape, np.nan)
+    root[valid & (fa == 0)] = a
+    done = ~valid | (fa == 0)
+    root[~done & (fb == 0)] = b
+    done |= fb == 0
+
+    dm = float(b) - float(a)
+    for _ in range(maxiter):
+        if done.all():
+            break
+        dm *= 0.5
+        xm = xa + dm
+        fm = f(xm)
+        xa = np.where(fm * fa >= 0, xm, xa)
+        converged = ~done & ((fm == 0) | (abs(dm) < xtol + rtol * np.abs(xm)))
+        root[converged] = xm[converged]
+        done |= converged
+
+    # Элементы, не сошедшиеся за maxiter, scipy отбрасывает исключением
+    valid &= ~np.isnan(root)
+    return root, valid
+
+
+def geometry_grid(r_ratio_start=0.525, t_ratio_start=0.725, step=0.025):
+    """Стандартная сетка перебора геометрии; start и step задают второй участок r_ratio и t_ratio"""
+    return product_grid(*geometry_axes(r_ratio_start, t_ratio_start, step))
+
+
+def geometry_axes(r_ratio_start=0.525, t_ratio_start=0.725, step=0.025):
+    """Значения r_ratio, t_ratio и alpha стандартной сетки по отдельности"""
+    r_ratio_values = sorted(set(
+        [round(x, 3) for x in np.arange(0.400, 0.500 + 0.001, 0.025)] +
+        [round(x, 3) for x in np.arange(r_ratio_start, 0.701 + 0.001, step)]
+    ))
+    t_ratio_values = sorted(set(
+        [round(x, 3) for x in np.arange(0.500, 0.700 + 0.001, 0.025)] +
+        [round(x, 3) for x in np.arange(t_ratio_start, 1.250 + 0.001, step)]
+    ))
+    alpha_values = [round(x * 0.1, 2) for x in range(0, 100 + 1)]  # 0..10 step 0.1
+    return r_ratio_values, t_ratio_values, alpha_values
+
+
+def product_grid(r_ratio_values, t_ratio_values, alpha_values):
+    """Сетка (r_ratio, t_ratio, alpha) в порядке itertools.product"""
+    r_grid, t_grid, alpha_grid = np.meshgrid(np.asarray(r_ratio_values, dtype=float),
+                                             np.asarray(t_ratio_values, dtype=float),
+                                             np.asarray(alpha_values, dtype=float), indexing='ij')
+    return r_grid.ravel(), t_grid.ravel(), alpha_grid.ravel()
+
+
+def pre_calc(r_ratio, t_ratio, alpha, kpd_vol, flow_rate_add, rotation_speed):
+    phi = 2 * np.arccos((1 + r_ratio) / 2)
+
+    pi = math.pi
+    lambda_val = (
+            2 * pi
+            - phi
+            + np.sin(phi)
+            - pi * (1 + r_ratio ** 2)
+            + (2 * pi * np.tan(np.radians(alpha)) * (1 - r_ratio) ** 3) / (3 * t_ratio)
+    )
+
+    base = flow_rate_add / (lambda_val * kpd_vol * t_ratio * rotation_speed * 60)
+    # Отрицательное основание дает комплексный диаметр — такие комбинации пропускаем
+    valid = np.isfinite(base) & (base >= 0)
+    val = 200 * (np.where(valid, base, 0.0) ** (1 / 3)) * 10
+
+    ext_diam_mm = np.round(val, 1)
+    ext_radius_mm = np.round(ext_diam_mm / 2, 2)
+    int_radius_mm = np.round(ext_radius_mm * r_ratio, 2)
+    t_mm = np.round(ext_radius_mm * t_ratio, 1)
+    return ext_radius_mm, int_radius_mm, t_mm, phi, lambda_val, valid
+
+
+def dtheta1_ddelta(theta1, r_ratio, ext_r, t, alpha_deg):
+    alpha_rad = np.radians(alpha_deg)
+    pi = math.pi
+
+    cos_theta = np.cos(theta1)
+    sin_theta = np.sin(theta1)
+
+    num1 = (
+            3 * cos_theta
+            + 3 * r_ratio * cos_theta
+            - 3
+            - 2 * r_ratio
+            - r_ratio ** 2
+    )
+    den1 = (1 + r_ratio - cos_theta) ** 2 + sin_theta ** 2
+
+    first_term = - (t / (2 * pi)) * (num1 / den1)
+
+    numerator2 = (1 + r_ratio) * sin_theta
+    denominator2 = np.sqrt(
+        2 * (1 - cos_theta) * (1 + r_ratio) + r_ratio ** 2
+    )
+
+    second_term = ext_r * np.tan(alpha_rad) * (numerator2 / denominator2)
+
+    return first_term + second_term
+
+
+def theta1_root(r_ratio, ext_r, t, alpha_deg):
+    """Корень dtheta1_ddelta на [0.01, pi - 0.01] для каждой комбинации"""
+    return bisect(lambda theta1: dtheta1_ddelta(theta1, r_ratio, ext_r, t, alpha_deg),
+                  0.01, math.pi - 0.01, xtol=1e-6, shape=np.shape(ext_r))
+
+
+def delta_t(theta1_max, r_ratio, R, t, alpha_deg):
+    alpha_rad = np.radians(alpha_deg)
+    pi = math.pi
+
+    arctan_part = np.arctan(
+        np.sin(theta1_max) / (1 + r_ratio - np.cos(theta1_max))
+    )
+    first_term = (t / (2 * pi)) * (arctan_part - theta1_max)
+
+    root_argument = 2 * (1 - np.cos(theta1_max)) * (1 + r_ratio) + r_ratio ** 2
+    second_term = R * np.tan(alpha_rad) * (np.sqrt(root_argument) - r_ratio)
+
+    return first_term - second_term
+
+
+def gap_calc(delt_t, t, ext_r, int_r, alpha, num):
+    b_ext_top = np.round(t / 2 - (delt_t + 2 * (ext_r - int_r) * np.tan(np.radians(alpha))), 1) / num
+    b_ext_low = np.round(t - num * b_ext_top, 1) / num
+    b_int_low = np.round(b_ext_low - 2 * np.tan(np.radians(alpha)) * (ext_r - int_r), 1)
+
+    stator_gap = np.round(np.rint(delt_t / 0.05) * 0.05, 2)
+    screw_gap = np.round(np.rint(0.7 * delt_t / 0.05) * 0.05, 2)
+    side_gap = np.round((b_int_low - b_ext_top) / 2, 2)
+
+    axis_dist = np.round(np.rint((ext_r + int_r + screw_gap) / 0.1) * 0.1, 1)
+    return stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist
+
+
+def calc_liquid_prop(temp):
+    """Свойства воды при температуре temp, С"""
+    temp_20 = 20
+
+    density_20 = 998.2
+    density_koef = 0.0002
+    density = round(density_20 * (1 - density_koef * (temp - temp_20)), 2)
+
+    viscosity_dyn_20 = 1.003
+    viscosity_dyn_koef = 0.023
+    viscosity_dyn = round(viscosity_dyn_20 * math.exp(-viscosity_dyn_koef * (temp - temp_20)), 3)
+
+    viscosity_kin = round(viscosity_dyn / density * 1000, 3)
+
+    capacity_temp = round(4212 - 3.2 * temp + 0.014 * math.pow(temp, 2), 2)
+
+    return density, viscosity_dyn, viscosity_kin, capacity_temp
+
+
+def thread_length(pressure, viscosity_kin, t):
+    pressure_mpa = 0.009806649643957326 * pressure
+    k = 0.94
+    dp_per_turn = 0.71 * (viscosity_kin / 1) ** k
+    dp_per_turn = max(0.5, min(dp_per_turn, 5))
+
+    pressure_kgs_sm = 10.197162 * pressure_mpa
+    turns_est = round(round(pressure_kgs_sm / dp_per_turn, 1) / 10, 2)
+    return np.round(turns_est * t, 1)
+
+
+def feed_loss(stator_gap, screw_gap, side_gap, phi, ext_r, pressure, viscosity_dyn, thread_length_mm):
+    """Утечки через зазоры статора, между винтами и боковой зазор, м³/ч"""
+    pressure_mpa = 0.009806649643957326 * pressure
+
+    stator_gap_koef = 0.7
+    feed_loss_stator = 60 * 60 * 2 * ((stator_gap * stator_gap_koef / 1000 / 2) ** 3) * (
+            (2 * math.pi - phi) * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
+                               12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
+
+    screw_gap_koef = 1
+    feed_loss_screw = 60 * 60 * ((screw_gap * screw_gap_koef / 1000 / 2) ** 3) * (
+            phi * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
+                              12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
+
+    side_gap_koef = 1
+    feed_loss_side = 60 * 60 * ((side_gap * side_gap_koef / 1000 / 2) ** 3) * (
+            side_gap * side_gap_koef * (np.sin(phi / 2) * ext_r / 1000)) * (
+                             pressure_mpa * 1_000_000) / (
+                             12 * (viscosity_dyn / 1000) * (thread_length_mm / 1000))
+
+    return feed_loss_stator + feed_loss_screw + feed_loss_side
+
+
+def flow_rate_theory(lambda_val, ext_r, t, rotation_speed, double_inlet=True):
+    multiplier = 2 if double_inlet else 1
+    return multiplier * lambda_val * ext_r ** 2 * t * rotation_speed * 60 / 1_000_000_000
+
+
+def friction_factor(pressure, rotation_speed, density, viscosity_dyn, heat_capacity, temperature):
+    """Общий для всей сетки множитель k_t^0.55 / g из формулы механического КПД"""
+    pressure_mpa = 0.009806649643957326 * pressure
+    w = math.pi * rotation_speed / 30
+    k_t = density * heat_capacity * temperature / ((viscosity_dyn / 1000) * w)
+    g = pressure_mpa * 1_000_000 / (viscosity_dyn / 1000) / w
+    return math.pow(k_t, 0.55), math.pow(g, -1)
+
+
+def kpd_mech(thread_length_mm, t, ext_r, int_r, k_t_pow, g_pow):
+    f_m = (thread_length_mm / t) * k_t_pow * g_pow
+    k_m = 15 * np.power(ext_r / int_r, -2.7)
+    return 1 / (1 + f_m * k_m)
+
+
+def power(pressure, flow_rate, density=None):
+    """Гидравлическая мощность, кВт; без density давление пересчитывается по плотности воды"""
+    if density is None:
+        return 0.009806649643957326 * pressure * (flow_rate / 60 / 60) * 1000
+    return pressure * (flow_rate / 60 / 60) * density * 9.81 / 1000
+
+
+def sweep(r_ratio, t_ratio, alpha, flow_rate, pressure, rotation_speed, density, viscosity_dyn, viscosity_kin,
+          heat_capacity, temperature, kpd_vol_pre=0.8, double_inlet=True, num_threads=2):
+    """Расчет всех комбинаций сетки массивами; возвращает словарь массивов с маской допустимых комбинаций"""
+    flow_rate_adj = flow_rate / 2 if double_inlet else flow_rate
+
+    try:
+        k_t_pow, g_pow = friction_factor(pressure, rotation_speed, density, viscosity_dyn, heat_capacity,
+                                         temperature)
+    except (ValueError, ZeroDivisionError):
+        # Ошибка в общих для всей сетки величинах — в скалярном переборе пропускалась бы каждая комбинация
+        return {'effective_koef': np.full(np.shape(r_ratio), np.nan),
+                'valid': np.zeros(np.shape(r_ratio), dtype=bool)}
+
+    with np.errstate(all='ignore'):
+        ext_r, int_r, t, phi, lambda_val, valid = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre, flow_rate_adj,
+                                                           rotation_speed)
+        theta1, bracketed = theta1_root(r_ratio, ext_r, t, alpha)
+        valid &= bracketed
+        delta_t_val = delta_t(theta1, r_ratio, ext_r, t, alpha)
+        stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist = gap_calc(delta_t_val, t,
+                                                                                               ext_r, int_r,
+                                                                                               alpha, num_threads)
+        thread_length_mm = thread_length(pressure, viscosity_kin, t)
+        loss = feed_loss(stator_gap, screw_gap, side_gap, phi, ext_r, pressure, viscosity_dyn, thread_length_mm)
+
+        flow_theory = np.round(flow_rate_theory(lambda_val, ext_r, t, rotation_speed, double_inlet), 1)
+        kpd_vol_2 = np.round(1 - loss / flow_theory, 3)
+        flow_rate_real = kpd_vol_2 * flow_theory
+
+        kpd_mech_val = np.round(kpd_mech(thread_length_mm, t, ext_r, int_r, k_t_pow, g_pow), 3)
+
+        power_gap = np.round(power(pressure, loss), 3)
+        power_theory = np.round(power(pressure, flow_theory), 3)
+        power_required = np.round(power_theory / kpd_mech_val, 3)
+        power_full = np.round(power_required + power_gap, 3)
+
+        kpd_total = np.round(kpd_mech_val * kpd_vol_2, 3)
+
+        effective_koef = power_full / flow_rate_real
+
+    valid &= np.isfinite(effective_koef) & (effective_koef > 0)
+
+    return {
+        "flow_rate_real": flow_rate_real,
+        "kpd_vol": kpd_vol_2,
+        "kpd_mech": kpd_mech_val,
+        "kpd_total": kpd_total,
+        "delta_t_val": delta_t_val,
+        "stator_gap": stator_gap,
+        "screw_gap": screw_gap,
+        "side_gap": side_gap,
+        "power_full": power_full,
+        "effective_koef": effective_koef,
+        "r_ratio": r_ratio,
+        "t_ratio": t_ratio,
+        "alpha": alpha,
+        "ext_radius_mm": ext_r,
+        "int_radius_mm": int_r,
+        "t_mm": t,
+        "axis_dist": axis_dist,
+        "thread_length_mm": thread_length_mm,
+        "phi": phi,
+        "lambda_val": lambda_val,
+        "b_ext_top": b_ext_top,
+        "b_int_low": b_int_low,
+        "b_ext_low": b_ext_low,
+        "feed_loss": loss,
+        "flow_rate_theory": flow_theory,
+        "power_gap": power_gap,
+        "power_theory": power_theory,
+        "power_required": power_required,
+        "valid": valid,
+    }
+
+
+def best_index(lanes):
+    """Индекс первой комбинации с минимальным effective_koef или None"""
+    if not lanes['valid'].any():
+        return None
+    return int(np.argmin(np.where(lanes['valid'], lanes['effective_koef'], np.inf)))
+
+
+def lane(lanes, index):
+    """Значения одной комбинации из результата sweep"""
+    return {name: values[index] for name, values in lanes.items() if name != 'valid'}
+
+
+def search(axes, evaluate, optimizer="exhaustive", verify=False, coarse_steps=(2, 2, 10), keep=8):
+    """Поиск минимума effective_koef на сетке axes = (r_ratio, t_ratio, alpha).
+
+    evaluate(r_ratio, t_ratio, alpha) — sweep с зафиксированными остальными аргументами.
+    optimizer="exhaustive" — полный перебор, "refine" — грубая сетка с последовательным сгущением
+    вокруг лучших ячеек. Возвращает лучшую комбинацию (или None) и отчет с числом расчетов;
+    при verify=True в отчет добавляется отклонение от полного перебора.
+    """
+    grid_size = int(np.prod([len(values) for values in axes]))
+    if optimizer == "exhaustive":
+        lanes = evaluate(*product_grid(*axes))
+        index = best_index(lanes)
+        best = lane(lanes, index) if index is not None else None
+        report = {"optimizer": optimizer, "evaluations": grid_size, "grid_size": grid_size}
+    elif optimizer == "refine":
+        best, evaluations = refine_search(axes, evaluate, coarse_steps, keep)
+        report = {"optimizer": optimizer, "evaluations": evaluations, "grid_size": grid_size}
+    else:
+        raise ValueError(f"Неизвестный режим оптимизации: {optimizer}")
+
+    report["effective_koef"] = float(best["effective_koef"]) if best else None
+    if verify and optimizer != "exhaustive":
+        exhaustive = search(axes, evaluate)[1]["effective_koef"]
+        report["exhaustive_effective_koef"] = exhaustive
+        report["gap"] = (report["effective_koef"] - exhaustive) / exhaustive if best and exhaustive else None
+    return best, report
+
+
+def refine_search(axes, evaluate, coarse_steps=(2, 2, 10), keep=8):
+    """Грубая сетка с шагом coarse_steps (в узлах), затем сгущение вокруг keep лучших ячеек до шага 1"""
+    axes = [np.asarray(values, dtype=float) for values in axes]
+    shape = tuple(len(values) for values in axes)
+    scores = {}
+    best = {"key": (np.inf, -1), "lane": None}
+
+    def run(indices):
+        indices = np.array(sorted(set(indices) - scores.keys()), dtype=int)
+        if not len(indices):
+            return
+        i_r, i_t, i_alpha = np.unravel_index(indices, shape)
+        lanes = evaluate(axes[0][i_r], axes[1][i_t], axes[2][i_alpha])
+        effective = np.where(lanes["valid"], lanes["effective_koef"], np.inf)
+        scores.update(zip(indices.tolist(), effective.tolist()))
+        position = best_index(lanes)
+        # При равных effective_koef как и при полном переборе выигрывает комбинация с меньшим номером в сетке
+        if position is not None and (effective[position], indices[position]) < best["key"]:
+            best["key"] = (effective[position], indices[position])
+            best["lane"] = lane(lanes, position)
+
+    def box(index, steps):
+        centre = np.unravel_index(index, shape)
+        ranges = [np.clip(c + s * np.arange(-2, 3), 0, n - 1) for c, s, n in zip(centre, steps, shape)]
+        return np.ravel_multi_index(np.meshgrid(*ranges, indexing='ij'), shape).ravel().tolist()
+
+    coarse = [sorted(set(range(0, n, step)) | {n - 1}) for n, step in zip(shape, coarse_steps)]
+    run(np.ravel_multi_index(np.meshgrid(*coarse, indexing='ij'), shape).ravel().tolist())
+
+    steps = tuple(coarse_steps)
+    while True:
+        steps = tuple(max(1, step // 2) for step in steps)
+        leaders = sorted((score, index) for index, score in scores.items() if score < np.inf)[:keep]
+        candidates = {index for _, index in leaders for index in box(index, steps)}
+        if not candidates - scores.keys():
+            if steps == (1, 1, 1):
+                break
+            continue
+        run(candidates)
+
+    return best["lane"], len(scores)
+
+
+def design_point(r_ratio, t_ratio, alpha, kpd_vol, flow_rate, pressure, rotation_speed, density, viscosity_dyn,
+                 viscosity_kin, heat_capacity, temperature, double_inlet=True, num_threads=2, power_density=None):
+    """Итоговый расчет выбранной геометрии без округлений перебора; power_density — см. power()"""
+    flow_rate_adj = flow_rate / 2 if double_inlet else flow_rate
+
+    ext_r, int_r, t, phi, lambda_val, valid = pre_calc(r_ratio, t_ratio, alpha, kpd_vol, flow_rate_adj,
+                                                       rotation_speed)
+    theta1, bracketed = theta1_root(r_ratio, ext_r, t, alpha)
+    if not (valid and bracketed):
+        return None
+    delta_t_val = delta_t(theta1, r_ratio, ext_r, t, alpha)
+    stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist = gap_calc(delta_t_val, t, ext_r,
+                                                                                           int_r, alpha, num_threads)
+    thread_length_mm = thread_length(pressure, viscosity_kin, t)
+    loss = feed_loss(stator_gap, screw_gap, side_gap, phi, ext_r, pressure, viscosity_dyn, thread_length_mm)
+
+    flow_theory = flow_rate_theory(lambda_val, ext_r, t, rotation_speed, double_inlet)
+    kpd_vol_2 = 1 - loss / flow_theory
+    flow_rate_real = kpd_vol_2 * flow_theory
+
+    kpd_mech_val = kpd_mech(thread_length_mm, t, ext_r, int_r,
+                            *friction_factor(pressure, rotation_speed, density, viscosity_dyn, heat_capacity,
+                                             temperature))
+
+    power_gap = power(pressure, loss, power_density)
+    power_theory = power(pressure, flow_theory, power_density)
+    power_required = power_theory / kpd_mech_val
+    power_full = power_required + power_gap
+
+    kpd_total = kpd_mech_val * kpd_vol_2
+
+    point = {
+        "flow_rate_real": flow_rate_real,
+        "kpd_vol": kpd_vol_2,
+        "kpd_mech": kpd_mech_val,
+        "kpd_total": kpd_total,
+        "delta_t_val": delta_t_val,
+        "stator_gap": stator_gap,
+        "screw_gap": screw_gap,
+        "side_gap": side_gap,
+        "power_full": power_full,
+        "effective_koef": power_full / flow_rate_real,
+        "r_ratio": r_ratio,
+        "t_ratio": t_ratio,
+        "alpha": alpha,
+        "ext_radius_mm": ext_r,
+        "int_radius_mm": int_r,
+        "t_mm": t,
+        "axis_dist": axis_dist,
+        "thread_length_mm": thread_length_mm,
+        "phi": phi,
+        "lambda_val": lambda_val,
+        "b_ext_top": b_ext_top,
+        "b_int_low": b_int_low,
+        "b_ext_low": b_ext_low,
+        "feed_loss": loss,
+        "flow_rate_theory": flow_theory,
+        "power_gap": power_gap,
+        "power_theory": power_theory,
+        "power_required": power_required,
+    }
+    return {name: float(value) for name, value in point.items()}
+
+
+DESIGN_FIELDS = (
+    "flow_rate_real", "kpd_vol", "kpd_mech", "kpd_total", "delta_t_val", "stator_gap", "screw_gap", "side_gap",
+    "power_full", "effective_koef", "r_ratio", "t_ratio", "alpha", "ext_radius_mm", "int_radius_mm", "t_mm",
+    "axis_dist", "thread_length_mm", "phi", "lambda_val", "b_ext_top", "b_int_low", "b_ext_low",
+)
+LOSS_FIELDS = ("feed_loss", "flow_rate_theory", "power_gap", "power_theory", "power_required")
+
+
+def results_row(inputs, point, fluid):
+    """Строка результатов в порядке столбцов отчетов: входные данные, геометрия, свойства жидкости, потери"""
+    return {
+        **inputs,
+        **{name: point[name] for name in DESIGN_FIELDS},
+        **fluid,
+        **{name: point[name] for name in LOSS_FIELDS},
+    }
+
+
+def results_fields(inputs, fluid):
+    """Имена столбцов строки results_row"""
+    return [*inputs, *DESIGN_FIELDS, *fluid, *LOSS_FIELDS]
+
+
+# Нагрузки на винт и размер вала; r_max — минимальный допустимый радиус шеек винта
+ShaftSizing = namedtuple("ShaftSizing", (
+    "profile_area", "total_area_screw", "total_moment", "axial_force", "radial_force", "max_reaction",
+    "min_reaction", "max_moment", "diam_force", "diam_moment", "r_max",
+))
+
+
+def profile_points(alpha, ext_radius_mm, int_radius_mm, t_mm, b_ext_top, points_per_segment=100):
+    """Торцевой профиль нарезки: точки трапеции, навитые на окружность по шагу t_mm"""
+    add = (ext_radius_mm - int_radius_mm) * math.tan(math.radians(alpha))
+    trapezoid_contour = np.array([
+        (0, int_radius_mm),
+        (add, ext_radius_mm),
+        (add + b_ext_top, ext_radius_mm),
+        (2 * add + b_ext_top, int_radius_mm)
+    ])
+
+    # Отрезки по points_per_segment точек, общие вершины соседних отрезков не повторяются
+    share = np.arange(points_per_segment) / (points_per_segment - 1)
+    segments = [trapezoid_contour[i] + (trapezoid_contour[i + 1] - trapezoid_contour[i]) * share[:, None]
+                for i in range(len(trapezoid_contour) - 1)]
+    all_points = np.concatenate([segments[0]] + [segment[1:] for segment in segments[1:]])
+
+    angle_i = 2 * math.pi * (t_mm - all_points[:, 0]) / t_mm
+    return np.column_stack((all_points[:, 1] * np.cos(angle_i), all_points[:, 1] * np.sin(angle_i)))
+
+
+def shoelace_area(points):
+    """Площадь замкнутого многоугольника по формуле Гаусса"""
+    x, y = points[:, 0], points[:, 1]
+    return abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+
+def shaft_sizing(alpha, ext_radius_mm, int_radius_mm, t_mm, b_ext_top, power_full, rotation_speed, pressure,
+                 thread_length_mm, profile_area=None):
+    """Силы и моменты на винте и минимальный радиус вала; profile_area — площадь профиля, если уже известна"""
+    pressure_mpa = 0.00980665 * pressure
+
+    add = (ext_radius_mm - int_radius_mm) * math.tan(math.radians(alpha))
+
+    points = profile_points(alpha, ext_radius_mm, int_radius_mm, t_mm, b_ext_top)
+    area = float(shoelace_area(points)) if profile_area is None else profile_area
+
+    distance = math.sqrt((points[0][0] - points[-1][0]) ** 2 + (points[0][1] - points[-1][1]) ** 2)
+    angle = math.acos(1 - distance ** 2 / (2 * int_radius_mm ** 2))
+    sector = int_radius_mm ** 2 / 2 * (angle - math.sin(angle))
+    middle = math.pi * int_radius_mm ** 2 - 2 * sector
+
+    total_area_screw = 2 * area + middle
+
+    total_moment = 30 * power_full / math.pi / rotation_speed  # в кН * м
+
+    axial_force_screw = power_full * 60000 / rotation_speed / t_mm  # в кН
+    axial_force_normal = total_area_screw * pressure_mpa / 1000
+
+    axial_force = axial_force_screw + axial_force_normal
+
+    trapezoid_contour = [
+        (0, int_radius_mm),
+        (add, ext_radius_mm),
+        (add + b_ext_top, ext_radius_mm),
+        (2 * add + b_ext_top, int_radius_mm)
+    ]
+    border_points = []
+    for x, radius in trapezoid_contour:
+        angle_i = 2 * math.pi * (t_mm - x) / t_mm
+        border_points.append((radius * math.cos(angle_i), radius * math.sin(angle_i)))
+
+    distance_c = math.sqrt(
+        (border_points[1][0] - border_points[2][0]) ** 2 + (border_points[1][1] - border_points[2][1]) ** 2)
+    distance_cd = distance_c / 2 + ext_radius_mm
+
+    radial_force_cyl = b_ext_top * distance_cd * pressure_mpa / 1000  # в кН
+
+    distance_l = math.sqrt(
+        (border_points[1][0] + border_points[2][0]) ** 2 + (border_points[1][1] + border_points[2][1]) ** 2)
+    radial_force_vpad = distance_l * t_mm * pressure_mpa / math.pi / 1000  # в кН
+
+    radial_force = radial_force_vpad + radial_force_cyl
+
+    b = 3 * thread_length_mm / 1000
+    max_reaction = radial_force / 2 + total_moment / b
+    min_reaction = radial_force / 2 - total_moment / b
+    max_moment = radial_force * b / 4 + total_moment / 2
+
+    temp_strength = 300
+    diam_force = math.sqrt(4 * radial_force / math.pi / temp_strength / 1000) * 1000
+    diam_moment = (32 * max_moment / temp_strength / 1000 / math.pi) ** (1 / 3) * 1000
+
+    return ShaftSizing(area, total_area_screw, total_moment, axial_force, radial_force, max_reaction, min_reaction,
+                       max_moment, diam_force, diam_moment, max(diam_force / 2, diam_moment / 2))
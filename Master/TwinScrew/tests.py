@@ -1,3 +1,80 @@
-from django.test import TestCase
+from functools import partial
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase
+
+from . import kernel
+
+# Эталонные точки посчитаны прежним скалярным calculate() (scipy.optimize.bisect, math); геометрия
+# (r_ratio, t_ratio, alpha, kpd_vol) — выбор полного перебора при тех же входных данных.
+DESIGN_POINTS = [
+    (
+        {'flow_rate': 100, 'pressure': 100, 'rotation_speed': 1500, 'density': 998.2, 'viscosity': 1.003,
+         'heat_capacity': 4184, 'temperature': 20},
+        (0.675, 0.525, 9.6, 0.995),
+        {
+            'flow_rate_real': 99.82179640940579, 'kpd_vol': 0.9935276349346938, 'kpd_mech': 0.931577068171243,
+            'kpd_total': 0.925547561299571, 'delta_t_val': 0.16016008326914735, 'stator_gap': 0.15,
+            'screw_gap': 0.1, 'side_gap': 0.08, 'power_full': 29.513548648223136,
+            'effective_koef': 0.29566236743704, 'ext_radius_mm': 89.3, 'int_radius_mm': 60.28, 't_mm': 46.9,
+            'axis_dist': 149.7, 'thread_length_mm': 65.7, 'phi': 1.156208729132687,
+            'lambda_val': 1.4924409751498784, 'b_ext_top': 6.75, 'b_int_low': 6.9, 'b_ext_low': 16.7,
+            'feed_loss': 0.6502920352877964, 'flow_rate_theory': 100.47208844469358,
+            'power_gap': 0.17688561137261594, 'power_theory': 27.329362541796883,
+            'power_required': 29.33666303685052,
+        },
+    ),
+    (
+        {'flow_rate': 40, 'pressure': 250, 'rotation_speed': 3000, 'density': 870, 'viscosity': 20,
+         'heat_capacity': 2000, 'temperature': 50},
+        (0.575, 0.5, 9.9, 0.995),
+        {
+            'flow_rate_real': 39.89539440469092, 'kpd_vol': 0.9940988609514175, 'kpd_mech': 0.9649082332758103,
+            'kpd_total': 0.9592141756221277, 'delta_t_val': 0.16222788378461786, 'stator_gap': 0.15,
+            'screw_gap': 0.1, 'side_gap': 0.07, 'power_full': 24.791272924009636,
+            'effective_koef': 0.6214068890391685, 'ext_radius_mm': 49.85, 'int_radius_mm': 28.66, 't_mm': 24.9,
+            'axis_dist': 78.6, 'thread_length_mm': 12.4, 'phi': 1.3281085544855005,
+            'lambda_val': 1.8016109530724638, 'b_ext_top': 2.45, 'b_int_low': 2.6, 'b_ext_low': 10.0,
+            'feed_loss': 0.23682581182599716, 'flow_rate_theory': 40.13222021651692,
+            'power_gap': 0.1403636983466207, 'power_theory': 23.785865269576874,
+            'power_required': 24.650909225663014,
+        },
+    ),
+]
+
+
+def design_point(inputs, geometry):
+    return kernel.design_point(*geometry, inputs['flow_rate'], inputs['pressure'], inputs['rotation_speed'],
+                               inputs['density'], inputs['viscosity'], viscosity_kin(inputs),
+                               inputs['heat_capacity'], inputs['temperature'], power_density=inputs['density'])
+
+
+def viscosity_kin(inputs):
+    return inputs['viscosity'] / inputs['density'] * 1000
+
+
+class DesignPointTests(SimpleTestCase):
+    def test_design_point(self):
+        for inputs, geometry, expected in DESIGN_POINTS:
+            with self.subTest(**inputs):
+                point = design_point(inputs, geometry)
+                for name, value in expected.items():
+                    self.assertAlmostEqual(point[name], value, delta=1e-12 * max(1, abs(value)), msg=name)
+
+    def test_invalid_geometry(self):
+        inputs, geometry, _ = DESIGN_POINTS[0]
+        # Отрицательная подача дает комплексный диаметр
+        self.assertIsNone(design_point({**inputs, 'flow_rate': -100}, geometry))
+
+    def test_search_geometry(self):
+        for inputs, geometry, expected in DESIGN_POINTS:
+            with self.subTest(**inputs):
+                evaluate = partial(kernel.sweep, flow_rate=inputs['flow_rate'], pressure=inputs['pressure'],
+                                   rotation_speed=inputs['rotation_speed'], density=inputs['density'],
+                                   viscosity_dyn=inputs['viscosity'], viscosity_kin=viscosity_kin(inputs),
+                                   heat_capacity=inputs['heat_capacity'], temperature=inputs['temperature'])
+                best, report = kernel.search(kernel.geometry_axes(), evaluate)
+                self.assertEqual(tuple(float(best[name]) for name in ('r_ratio', 't_ratio', 'alpha', 'kpd_vol')),
+                                 geometry)
+                self.assertEqual(report['evaluations'], report['grid_size'])
+                self.assertTrue(np.isfinite(report['effective_koef']))
@@ -1,19 +1,34 @@
 from django.shortcuts import render
 import math
-import numpy as np
-from scipy.optimize import bisect, fsolve
-from functools import partial
-from tqdm import tqdm
-import itertools
+import os
+import zipfile
 import pandas as pd
 import logging
 import cadquery as cq
 from cadquery import exporters, Compound
-from functools import reduce
+from functools import lru_cache, partial
+import numpy as np
+from . import kernel
+from Master import artifacts, jobs
+from Multiphase import grid
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Версия кода геометрии винтов и статора; увеличить при изменении построения моделей
+GEOMETRY_VERSION = 3
+# Поля результата расчета, от которых зависит геометрия сборки
+GEOMETRY_FIELDS = ('alpha', 'ext_radius_mm', 'int_radius_mm', 't_mm', 'axis_dist', 'b_ext_top', 'b_int_low',
+                   'thread_length_mm', 'stator_gap', 'power_full', 'rotation_speed', 'pressure')
+# Поля результата расчета, от которых зависят нагрузки на винт и размер вала
+SHAFT_FIELDS = ('alpha', 'ext_radius_mm', 'int_radius_mm', 't_mm', 'b_ext_top', 'power_full', 'rotation_speed',
+                'pressure', 'thread_length_mm')
+SHAFT_CACHE_SIZE = 64
+ASSEMBLY_FILES = ('driven_screw.step', 'lead_screw.step', 'stator.step', 'twin_assembly.step')
+ASSEMBLY_ZIP = 'twin_screw_models.zip'
+# Свойства жидкости, которые можно взять из таблицы свойств смеси Multiphase (NPZ)
+FLUID_FIELDS = ('density', 'viscosity', 'heat_capacity')
+
 
 def twin_screw(request):
     context = {
@@ -41,6 +56,19 @@ def twin_screw(request):
             except ValueError:
                 input_data[name] = None
 
+        # Незаполненные свойства жидкости берутся из таблицы свойств смеси, если она приложена
+        grid_file = request.FILES.get('property_grid')
+        if grid_file is not None:
+            try:
+                properties = grid_properties(input_data, grid_file)
+            except ValueError as e:
+                context['error_message'] = f"Ошибка таблицы свойств: {e}"
+                return render(request, 'twinscrew.html', context)
+            input_data.update(properties)
+            for select in context['calc']:
+                if select['name'] in properties:
+                    select['value'] = grid.number(properties[select['name']])
+
         result = calculate(**input_data)
 
         print("Лучшие параметры и вычисленные значения:")
@@ -51,317 +79,82 @@ def twin_screw(request):
             for key, value in result.items():
                 print(f"{key}: {value}")
 
-        create_assembly(result)
+        # Построение идет в фоновом процессе, страница опрашивает состояние задачи и скачивает архив
+        context['job_id'] = jobs.submit('TwinScrew.views.build_twin_screw_models', {'results_dict': result})
 
     return render(request, 'twinscrew.html', context)
 
 
-def calculate(flow_rate, pressure, rotation_speed, density, viscosity, temperature, heat_capacity, double_inlet=True,
-              num_threads=2):
-    def pre_calc(r_ratio, t_ratio, alpha, kpd_vol, flow_rate_add):
-        phi = 2 * math.acos((1 + r_ratio) / 2)
-
-        pi = math.pi
-        lambda_val = (
-                2 * pi
-                - phi
-                + math.sin(phi)
-                - pi * (1 + r_ratio ** 2)
-                + (2 * pi * math.tan(math.radians(alpha)) * (1 - r_ratio) ** 3) / (3 * t_ratio)
-        )
-
-        val = 200 * (
-                (
-                        flow_rate_add / (lambda_val * kpd_vol * t_ratio * rotation_speed * 60)
-                ) ** (1 / 3)) * 10
-
-        # Проверяем, что val вещественное число, а не комплексное
-        if isinstance(val, complex):
-            logger.debug(
-                f"pre_calc: комплексное значение val={val} для r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha}")
-            return None
-
-        ext_diam_mm = round(val, 1)
-        ext_radius_mm = round(ext_diam_mm / 2, 2)
-        int_radius_mm = round(ext_radius_mm * r_ratio, 2)
-        t_mm = round(ext_radius_mm * t_ratio, 1)
-        logger.debug(
-            f"pre_calc: r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha} => ext_r={ext_radius_mm}, int_r={int_radius_mm}, t={t_mm}, phi={phi:.3f}, lambda_val={lambda_val:.3f}")
-        return ext_radius_mm, int_radius_mm, t_mm, phi, lambda_val
-
-    def dtheta1_ddelta(theta1, r_ratio, ext_r, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        cos_theta = math.cos(theta1)
-        sin_theta = math.sin(theta1)
-
-        num1 = (
-                3 * cos_theta
-                + 3 * r_ratio * cos_theta
-                - 3
-                - 2 * r_ratio
-                - r_ratio ** 2
-        )
-        den1 = (1 + r_ratio - cos_theta) ** 2 + sin_theta ** 2
-
-        first_term = - (t / (2 * pi)) * (num1 / den1)
-
-        numerator2 = (1 + r_ratio) * sin_theta
-        denominator2 = math.sqrt(
-            2 * (1 - cos_theta) * (1 + r_ratio) + r_ratio ** 2
-        )
-
-        second_term = ext_r * math.tan(alpha_rad) * (numerator2 / denominator2)
-
-        return first_term + second_term
-
-    def delta_t(theta1_max, r_ratio, R, t, alpha_deg):
-        alpha_rad = math.radians(alpha_deg)
-        pi = math.pi
-
-        arctan_part = math.atan(
-            math.sin(theta1_max) / (1 + r_ratio - math.cos(theta1_max))
-        )
-        first_term = (t / (2 * pi)) * (arctan_part - theta1_max)
-
-        root_argument = 2 * (1 - math.cos(theta1_max)) * (1 + r_ratio) + r_ratio ** 2
-        second_term = R * math.tan(alpha_rad) * (math.sqrt(root_argument) - r_ratio)
-
-        return first_term - second_term
-
-    def gap_calc(delt_t, t, ext_r, int_r, alpha, num):
-        b_ext_top = round(t / 2 - (delt_t + 2 * (ext_r - int_r) * math.tan(math.radians(alpha))), 1) / num
-        b_ext_low = round(t - num * b_ext_top, 1) / num
-        b_int_low = round(b_ext_low - 2 * math.tan(math.radians(alpha)) * (ext_r - int_r), 1)
-
-        stator_gap = round(round(delt_t / 0.05) * 0.05, 2)
-        screw_gap = round(round(0.7 * delt_t / 0.05) * 0.05, 2)
-        side_gap = round((b_int_low - b_ext_top) / 2, 2)
-
-        axis_dist = round(round((ext_r + int_r + screw_gap) / 0.1) * 0.1, 1)
-        # Если зазор отрицательный, уменьшать число заходов num
-        return stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist
-
-    flow_rate_adj = flow_rate / 2 if double_inlet else flow_rate
+def grid_properties(input_data, file):
+    """Незаполненные поля FLUID_FIELDS по таблице свойств Multiphase при напоре и температуре из формы"""
+    missing = [name for name in FLUID_FIELDS if input_data.get(name) is None]
+    if not missing:
+        return {}
+    if input_data.get('pressure') is None or input_data.get('temperature') is None:
+        raise ValueError("для поиска по таблице нужны напор и температура")
+    properties = grid.lookup(grid.load_grid(file), input_data['pressure'], input_data['temperature'])
+    logger.info(f"Свойства жидкости из таблицы: {properties}")
+    return {name: float(grid.number(properties[name])) for name in missing}
+
 
+def calculate(flow_rate, pressure, rotation_speed, density, viscosity, temperature, heat_capacity, double_inlet=True,
+              num_threads=2, optimizer="exhaustive", verify=False, export_dir=None):
     kpd_vol_pre_fixed = 0.8
-    best_params = None
-    min_effective_koef = float('inf')
+    viscosity_kin = viscosity / density * 1000
 
     logger.info(
         f"Запуск перебора параметров для flow_rate={flow_rate}, pressure={pressure}, rotation_speed={rotation_speed}, "
         f"temperature={temperature}")
 
-    r_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.400, 0.500 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.525, 0.701 + 0.001, 0.025)]
-    ))
-    t_ratio_values = sorted(set(
-        [round(x, 3) for x in np.arange(0.500, 0.700 + 0.001, 0.025)] +
-        [round(x, 3) for x in np.arange(0.725, 1.250 + 0.001, 0.025)]
-    ))
-    alpha_values = [round(x * 0.1, 2) for x in range(0, 100 + 1)]  # 0..10 step 0.1
-
-    combinations = list(itertools.product(r_ratio_values, t_ratio_values, alpha_values))
-
-    for r_ratio, t_ratio, alpha in tqdm(combinations, desc="Перебор параметров", total=len(combinations)):
-        try:
-            pre_calc_result = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed, flow_rate_adj)
-            if pre_calc_result is None:
-                continue  # Пропускаем комплексные значения
-
-            ext_r, int_r, t, phi, lambda_val = pre_calc(r_ratio, t_ratio, alpha, kpd_vol_pre_fixed,
-                                                        flow_rate_adj)
-            f = partial(dtheta1_ddelta, r_ratio=r_ratio, ext_r=ext_r, t=t, alpha_deg=alpha)
-            theta1_root = bisect(f, 0.01, math.pi - 0.01, xtol=1e-6)
-            delta_t_val = delta_t(theta1_root, r_ratio, ext_r, t, alpha)
-            stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist = gap_calc(delta_t_val, t,
-                                                                                                   ext_r, int_r,
-                                                                                                   alpha,
-                                                                                                   num_threads)
-            viscosity_kin = viscosity / density * 1000
-
-            pressure_mpa = 0.009806649643957326 * pressure
-            k = 0.94
-            dp_per_turn = 0.71 * (viscosity_kin / 1) ** k
-            dp_per_turn = max(0.5, min(dp_per_turn, 5))
-            pressure_kgs_sm = 10.197162 * pressure_mpa
-            turns_est = round(round(pressure_kgs_sm / dp_per_turn, 1) / 10, 2)
-            thread_length_mm = round(turns_est * t, 1)
-
-            stator_gap_koef = 0.7
-            feed_loss_stator = 60 * 60 * 2 * ((stator_gap * stator_gap_koef / 1000 / 2) ** 3) * (
-                    (2 * math.pi - phi) * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                       12 * (viscosity / 1000) * (thread_length_mm / 1000))
-
-            screw_gap_koef = 1
-            feed_loss_screw = 60 * 60 * ((screw_gap * screw_gap_koef / 1000 / 2) ** 3) * (
-                    phi * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                                      12 * (viscosity / 1000) * (thread_length_mm / 1000))
-
-            side_gap_koef = 1
-            feed_loss_side = 60 * 60 * ((side_gap * side_gap_koef / 1000 / 2) ** 3) * (
-                    side_gap * side_gap_koef * (math.sin(phi / 2) * ext_r / 1000)) * (
-                                     pressure_mpa * 1_000_000) / (
-                                     12 * (viscosity / 1000) * (thread_length_mm / 1000))
-
-            feed_loss = feed_loss_stator + feed_loss_screw + feed_loss_side
-
-            multiplier = 2 if double_inlet else 1
-            flow_rate_theory = round(
-                multiplier * lambda_val * ext_r ** 2 * t * rotation_speed * 60 / 1_000_000_000, 1)
-
-            kpd_vol_2 = round(1 - feed_loss / flow_rate_theory, 3)
-            flow_rate_real = kpd_vol_2 * flow_rate_theory
-
-            w = math.pi * rotation_speed / 30
-            k_t = density * heat_capacity * temperature / ((viscosity / 1000) * w)
-            g = pressure_mpa * 1_000_000 / (viscosity / 1000) / w
-            f_m = (thread_length_mm / t) * math.pow(k_t, 0.55) * math.pow(g, -1)
-            k_m = 15 * math.pow(ext_r / int_r, -2.7)
-
-            kpd_mech = round(1 / (1 + f_m * k_m), 3)
-
-            power_gap = round(pressure_mpa * (feed_loss / 60 / 60) * 1000, 3)
-            power_theory = round(pressure_mpa * (flow_rate_theory / 60 / 60) * 1000, 3)
-            power_required = round(power_theory / kpd_mech, 3)
-            power_full = round(power_required + power_gap, 3)
-
-            kpd_total = round(kpd_mech * kpd_vol_2, 3)
-
-            effective_koef = power_full / flow_rate_real
-            if effective_koef <= 0:
-                continue
-
-            if effective_koef < min_effective_koef:
-                min_effective_koef = effective_koef
-                best_params = (r_ratio, t_ratio, alpha, kpd_vol_2, ext_r, int_r, t, phi, lambda_val,
-                               stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist,
-                               density, viscosity, viscosity_kin, heat_capacity,
-                               feed_loss, flow_rate_theory, flow_rate_real,
-                               kpd_mech, power_gap, power_theory, power_required, power_full, kpd_total)
-                logger.debug(
-                    f"Новая лучшая комбинация: r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha}, effective_koef={effective_koef:.6f}")
-        except Exception as e:
-            logger.debug(
-                f"Ошибка в переборе параметров r_ratio={r_ratio}, t_ratio={t_ratio}, alpha={alpha}: {e}")
-            continue
-
-    if best_params is None:
+    evaluate = partial(kernel.sweep, flow_rate=flow_rate, pressure=pressure, rotation_speed=rotation_speed,
+                       density=density, viscosity_dyn=viscosity, viscosity_kin=viscosity_kin,
+                       heat_capacity=heat_capacity, temperature=temperature, kpd_vol_pre=kpd_vol_pre_fixed,
+                       double_inlet=double_inlet, num_threads=num_threads)
+    best, report = kernel.search(kernel.geometry_axes(), evaluate, optimizer=optimizer, verify=verify)
+    logger.info(f"Оптимизация ({optimizer}): {report}")
+
+    if best is None:
         logger.warning("Не удалось найти подходящую комбинацию параметров.")
         return None
     logger.info(
-        f"Лучшие параметры: r_ratio={best_params[0]}, t_ratio={best_params[1]}, alpha={best_params[2]}, "
-        f"effective_koef={min_effective_koef:.6f}")
-    r_ratio_b, t_ratio_b, alpha_b, kpd_vol_2_b, ext_r_b, int_r_b, t_b, phi_b, lambda_val_b = best_params[:9]
-
-    pre_calc_result = pre_calc(r_ratio_b, t_ratio_b, alpha_b, kpd_vol_2_b, flow_rate_adj)
-    if pre_calc_result is None:
+        f"Лучшие параметры: r_ratio={best['r_ratio']}, t_ratio={best['t_ratio']}, alpha={best['alpha']}, "
+        f"effective_koef={best['effective_koef']:.6f}")
+
+    point = kernel.design_point(best['r_ratio'], best['t_ratio'], best['alpha'], best['kpd_vol'], flow_rate,
+                                pressure, rotation_speed, density, viscosity, viscosity_kin, heat_capacity,
+                                temperature, double_inlet=double_inlet, num_threads=num_threads,
+                                power_density=density)
+    if point is None:
         return None  # или выбросить исключение
-    ext_r, int_r, t, phi, lambda_val = pre_calc_result
-    f = partial(dtheta1_ddelta, r_ratio=r_ratio_b, ext_r=ext_r, t=t, alpha_deg=alpha_b)
-    theta1_root = bisect(f, 0.01, math.pi - 0.01, xtol=1e-6)
-    delta_t_val = delta_t(theta1_root, r_ratio_b, ext_r, t, alpha_b)
-    stator_gap, screw_gap, side_gap, b_ext_top, b_int_low, b_ext_low, axis_dist = gap_calc(delta_t_val, t, ext_r, int_r,
-                                                                                           alpha_b, num_threads)
-    viscosity_kin = viscosity / density * 1000
-
-    pressure_mpa = 0.009806649643957326 * pressure
-    k = 0.94
-    dp_per_turn = 0.71 * (viscosity_kin / 1) ** k
-    dp_per_turn = max(0.5, min(dp_per_turn, 5))
-
-    pressure_kgs_sm = 10.197162 * pressure_mpa
-    turns_est = round(round(pressure_kgs_sm / dp_per_turn, 1) / 10, 2)
-    thread_length_mm = round(turns_est * t, 1)
-
-    stator_gap_koef = 0.7
-    feed_loss_stator = 60 * 60 * 2 * ((stator_gap * stator_gap_koef / 1000 / 2) ** 3) * (
-            (2 * math.pi - phi) * ext_r / 1000) * (pressure_mpa * 1_000_000) / (
-                               12 * (viscosity / 1000) * (thread_length_mm / 1000))
-
-    screw_gap_koef = 1
-    feed_loss_screw = 60 * 60 * ((screw_gap * screw_gap_koef / 1000 / 2) ** 3) * (phi * ext_r / 1000) * (
-            pressure_mpa * 1_000_000) / (12 * (viscosity / 1000) * (thread_length_mm / 1000))
-
-    side_gap_koef = 1
-    feed_loss_side = 60 * 60 * ((side_gap * side_gap_koef / 1000 / 2) ** 3) * (
-            side_gap * side_gap_koef * (math.sin(phi / 2) * ext_r / 1000)) * (pressure_mpa * 1_000_000) / (
-                             12 * (viscosity / 1000) * (thread_length_mm / 1000))
-
-    feed_loss = feed_loss_stator + feed_loss_screw + feed_loss_side
-
-    multiplier = 2 if double_inlet else 1
-    flow_rate_theory = multiplier * lambda_val * ext_r ** 2 * t * rotation_speed * 60 / 1_000_000_000
-
-    kpd_vol_2 = 1 - feed_loss / flow_rate_theory
-    flow_rate_real = kpd_vol_2 * flow_rate_theory
-
-    w = math.pi * rotation_speed / 30
-    k_t = density * heat_capacity * temperature / ((viscosity / 1000) * w)
-    g = pressure_mpa * 1_000_000 / (viscosity / 1000) / w
-    f_m = (thread_length_mm / t) * math.pow(k_t, 0.55) * math.pow(g, -1)
-    k_m = 15 * math.pow(ext_r / int_r, -2.7)
-
-    kpd_mech = 1 / (1 + f_m * k_m)
-
-    power_gap = pressure * (feed_loss / 60 / 60) * density * 9.81 / 1000
-    power_theory = pressure * (flow_rate_theory / 60 / 60) * density * 9.81 / 1000
-    power_required = power_theory / kpd_mech
-    power_full = power_required + power_gap
-
-    kpd_total = kpd_mech * kpd_vol_2
 
     # Возвращаем результаты
-    results_dict = {
-        "flow_rate": float(flow_rate),
-        "pressure": float(pressure),
-        "rotation_speed": float(rotation_speed),
-        "temperature": float(temperature),
-        "flow_rate_real": float(flow_rate_real),
-        "kpd_vol": float(kpd_vol_2),
-        "kpd_mech": float(kpd_mech),
-        "kpd_total": float(kpd_total),
-        "delta_t_val": float(delta_t_val),
-        "stator_gap": float(stator_gap),
-        "screw_gap": float(screw_gap),
-        "side_gap": float(side_gap),
-        "power_full": float(power_full),
-        "effective_koef": float(power_full / flow_rate_real),
-        "r_ratio": float(r_ratio_b),
-        "t_ratio": float(t_ratio_b),
-        "alpha": float(alpha_b),
-        "ext_radius_mm": float(ext_r),
-        "int_radius_mm": float(int_r),
-        "t_mm": float(t),
-        "axis_dist": float(axis_dist),
-        "thread_length_mm": float(thread_length_mm),
-        "phi": float(phi),
-        "lambda_val": float(lambda_val),
-        "b_ext_top": float(b_ext_top),
-        "b_int_low": float(b_int_low),
-        "b_ext_low": float(b_ext_low),
-        "density": float(density),
-        "viscosity_dyn": float(viscosity),
-        "viscosity_kin": float(viscosity_kin),
-        "heat_capacity": float(heat_capacity),
-        "feed_loss": float(feed_loss),
-        "flow_rate_theory": float(flow_rate_theory),
-        "power_gap": float(power_gap),
-        "power_theory": float(power_theory),
-        "power_required": float(power_required),
-    }
+    results_dict = kernel.results_row(
+        {
+            "flow_rate": float(flow_rate),
+            "pressure": float(pressure),
+            "rotation_speed": float(rotation_speed),
+            "temperature": float(temperature),
+        },
+        point,
+        {
+            "density": float(density),
+            "viscosity_dyn": float(viscosity),
+            "viscosity_kin": float(viscosity_kin),
+            "heat_capacity": float(heat_capacity),
+        },
+    )
 
-    df = pd.DataFrame([results_dict])  # одна строка таблицы
+    # Таблица пишется только по запросу и в указанный каталог: у веб-запросов нет общего файла
+    if export_dir is not None:
+        df = pd.DataFrame([results_dict])  # одна строка таблицы
 
-    # Имя файла по наружному диаметру
-    ext_diam = round(ext_r * 2, 1)
-    filename = f"twin_screw_D{ext_diam}mm.xlsx"
+        # Имя файла по наружному диаметру
+        ext_diam = round(point['ext_radius_mm'] * 2, 1)
+        filename = os.path.join(export_dir, f"twin_screw_D{ext_diam}mm.xlsx")
 
-    # Сохранение
-    df.to_excel(filename, index=False)
-    print(f"Результаты сохранены в файл: {filename}")
+        # Сохранение
+        df.to_excel(filename, index=False)
+        print(f"Результаты сохранены в файл: {filename}")
 
     return results_dict
 
@@ -572,15 +365,31 @@ def create_stator(results_dict):
     ]
     logger.info('Объединяем тела в статоре')
     stator_1 = combine_parts(parts)
-    stator_2 = combine_parts(parts_1)
     logger.info('Создаем статор')
-    stator = stator_1.cut(stator_2)
+    stator = subtract_parts(stator_1, parts_1)
     logger.info('Статор создан')
 
     return stator, stator_len
 
 
-def create_assembly(results_dict):
+def build_twin_screw_models(results_dict, logs):
+    """Фоновая задача: ZIP-архив с моделями винтов, статора и сборки; возвращает путь к архиву и его имя"""
+    directory = create_assembly(results_dict, logs)
+    return os.path.join(directory, ASSEMBLY_ZIP), ASSEMBLY_ZIP
+
+
+def create_assembly(results_dict, logs=None):
+    """Модели винтов, статора и сборки из кэша или построенные заново; возвращает каталог с файлами"""
+    logs = logs if logs is not None else []
+    params = {name: float(results_dict[name]) for name in GEOMETRY_FIELDS}
+    directory, from_cache = artifacts.cached_artifacts('twin_screw', params, GEOMETRY_VERSION,
+                                                       partial(build_assembly, results_dict, logs=logs))
+    if from_cache:
+        logs.append("Модели взяты из кэша.")
+    return directory
+
+
+def build_assembly(results_dict, directory, logs):
     alpha = float(results_dict['alpha'])
     ext_radius_mm = float(results_dict['ext_radius_mm'])
     int_radius_mm = float(results_dict['int_radius_mm'])
@@ -592,135 +401,58 @@ def create_assembly(results_dict):
     add = (ext_radius_mm - int_radius_mm) * math.tan(math.radians(alpha))
     dist_0 = int(thread_length_mm / 0.87)
     logger.info('Создаем ведомый винт')
-    driven = create_driven_screw(results_dict, 0, False, True)[0]
+    logs.append("Начинаем создание ведомого винта...")
+    # Винтовые участки обоих направлений строятся один раз и переносятся в нужные места обоих винтов
+    sections = screw_sections(results_dict)
+    driven, mid_position = create_driven_screw(results_dict, 0, False, True, sections)
     logger.info('Создаем ведущий винт')
-    lead = create_lead_screw(results_dict).rotate((0, 0, 0), (0, 0, 1), angleDegrees=360 * (b_int_low + add) / t_mm)
+    logs.append("Начинаем создание ведущего винта...")
+    lead = create_lead_screw(results_dict, sections).rotate((0, 0, 0), (0, 0, 1),
+                                                            angleDegrees=360 * (b_int_low + add) / t_mm)
     logger.info('Создаем статор')
-    stator = create_stator(results_dict)[0]
-    stator_len = create_stator(results_dict)[1]
-    mid_position = create_driven_screw(results_dict, 0, False, True)[1]
+    logs.append("Начинаем создание статора...")
+    stator, stator_len = create_stator(results_dict)
     stator_position = mid_position - stator_len/2
 
-    logger.info('Экспортируем модели')
-    exporters.export(driven, 'driven_screw.step')
-    exporters.export(lead, 'lead_screw.step')
-    exporters.export(stator, 'stator.step')
-    logger.info('Валы и статор успешно созданы и экспортированы')
-
+    # Тела передаются в сборку напрямую, без записи и чтения STEP
     logger.info('Создаем сборку')
+    logs.append("Начинаем создание сборки...")
     asm = cq.Assembly()
-    asm.add(cq.importers.importStep('driven_screw.step'), name='driven',
-            loc=cq.Location(cq.Vector(0, axis_dist / 2, 0)))
-    asm.add(cq.importers.importStep('lead_screw.step'), name='lead',
-            loc=cq.Location(cq.Vector(0, -axis_dist / 2, -dist_0)))
-    asm.add(cq.importers.importStep('stator.step'), name='stator',
-            loc=cq.Location(cq.Vector(0, 0, stator_position)))
-    exporters.export(asm.toCompound(), 'twin_assembly.step')
-    logger.info('Сборка успешно создана и экспортирована')
+    asm.add(driven, name='driven', loc=cq.Location(cq.Vector(0, axis_dist / 2, 0)))
+    asm.add(lead, name='lead', loc=cq.Location(cq.Vector(0, -axis_dist / 2, -dist_0)))
+    asm.add(stator, name='stator', loc=cq.Location(cq.Vector(0, 0, stator_position)))
 
+    # Экспорт всех моделей один раз в конце
+    logger.info('Экспортируем модели')
+    logs.append("Экспортируем модели...")
+    for file, model in zip(ASSEMBLY_FILES, (driven, lead, stator, asm.toCompound())):
+        exporters.export(model, os.path.join(directory, file))
+    logger.info('Валы, статор и сборка успешно созданы и экспортированы')
+    logs.append("Модели успешно экспортированы.")
 
-def calculate_min_diam(results_dict):
-    alpha = float(results_dict['alpha'])
-    ext_radius_mm = float(results_dict['ext_radius_mm'])
-    int_radius_mm = float(results_dict['int_radius_mm'])
-    t_mm = float(results_dict['t_mm'])
-    b_ext_top = float(results_dict['b_ext_top'])
-    power_full = float(results_dict['power_full'])
-    rotation_speed = float(results_dict['rotation_speed'])
-    pressure = float(results_dict['pressure'])
-    thread_length_mm = float(results_dict['thread_length_mm'])
-
-    pressure_mpa = 0.00980665 * pressure
-
-    add = (ext_radius_mm - int_radius_mm) * math.tan(math.radians(alpha))
-
-    trapezoid_contour = [
-        (0, int_radius_mm),
-        (add, ext_radius_mm),
-        (add + b_ext_top, ext_radius_mm),
-        (2 * add + b_ext_top, int_radius_mm)
-    ]
-
-    def interpolate_2d_segment(p1, p2, n_points):
-        x1, y1 = p1
-        x2, y2 = p2
-        return [
-            (
-                x1 + (x2 - x1) * i / (n_points - 1),
-                y1 + (y2 - y1) * i / (n_points - 1)
-            )
-            for i in range(n_points)
-        ]
-
-    points_per_segment = 100
-    all_points = []
-
-    for i in range(len(trapezoid_contour) - 1):
-        p1 = trapezoid_contour[i]
-        p2 = trapezoid_contour[i + 1]
-
-        segment_points = interpolate_2d_segment(p1, p2, points_per_segment)
-
-        if i != 0:
-            segment_points = segment_points[1:]
-
-        all_points.extend(segment_points)
-
-    angle_i = [2 * math.pi * (t_mm - x[0]) / t_mm for x in all_points]
-
-    new_points = []
-    for i, j in zip(all_points, angle_i):
-        x_proj = i[1] * math.cos(j)
-        y_proj = i[1] * math.sin(j)
-        new_points.append((x_proj, y_proj))
-
-    new_contour = cq.Workplane('XY').polyline(new_points).close().wire()
-    face = cq.Face.makeFromWires(new_contour.val())
-    area = face.Area()
-
-    distance = math.sqrt((new_points[0][0] - new_points[-1][0]) ** 2 + (new_points[0][1] - new_points[-1][1]) ** 2)
-    angle = math.acos(1 - distance ** 2 / (2 * int_radius_mm ** 2))
-    sector = int_radius_mm ** 2 / 2 * (angle - math.sin(angle))
-    middle = math.pi * int_radius_mm ** 2 - 2 * sector
-
-    total_area_screw = 2 * area + middle
-
-    total_moment = 30 * power_full / math.pi / rotation_speed  # в кН * м
-
-    axial_force_screw = power_full * 60000 / rotation_speed / t_mm  # в кН
-    axial_force_normal = total_area_screw * pressure_mpa / 1000
-
-    axial_force = axial_force_screw + axial_force_normal
-
-    border_angle_i = [2 * math.pi * (t_mm - x[0]) / t_mm for x in trapezoid_contour]
-    border_points = []
-    for i, j in zip(trapezoid_contour, border_angle_i):
-        x_proj = i[1] * math.cos(j)
-        y_proj = i[1] * math.sin(j)
-        border_points.append((x_proj, y_proj))
-
-    distance_c = math.sqrt(
-        (border_points[1][0] - border_points[2][0]) ** 2 + (border_points[1][1] - border_points[2][1]) ** 2)
-    distance_cd = distance_c / 2 + ext_radius_mm
-
-    radial_force_cyl = b_ext_top * distance_cd * pressure_mpa / 1000  # в кН
+    with zipfile.ZipFile(os.path.join(directory, ASSEMBLY_ZIP), 'w') as zipf:
+        for file in ASSEMBLY_FILES:
+            zipf.write(os.path.join(directory, file), arcname=file)
 
-    distance_l = math.sqrt(
-        (border_points[1][0] + border_points[2][0]) ** 2 + (border_points[1][1] + border_points[2][1]) ** 2)
-    radial_force_vpad = distance_l * t_mm * pressure_mpa / math.pi / 1000  # в кН
 
-    radial_force = radial_force_vpad + radial_force_cyl
+@lru_cache(maxsize=SHAFT_CACHE_SIZE)
+def shaft_sizing(alpha, ext_radius_mm, int_radius_mm, t_mm, b_ext_top, power_full, rotation_speed, pressure,
+                 thread_length_mm):
+    """Нагрузки и размер вала для конструкции; считается один раз на набор параметров"""
+    points = kernel.profile_points(alpha, ext_radius_mm, int_radius_mm, t_mm, b_ext_top)
+    area = kernel.shoelace_area(points)
+    if not (np.isfinite(area) and area > 0):
+        # Вырожденный профиль — площадь по грани CAD, как раньше
+        logger.warning("Площадь профиля по точкам не получена, считаем по грани CAD")
+        new_contour = cq.Workplane('XY').polyline([tuple(point) for point in points]).close().wire()
+        area = cq.Face.makeFromWires(new_contour.val()).Area()
 
-    b = 3 * thread_length_mm / 1000
-    max_reaction = radial_force / 2 + total_moment / b
-    min_reaction = radial_force / 2 - total_moment / b
-    max_moment = radial_force * b / 4 + total_moment / 2
+    return kernel.shaft_sizing(alpha, ext_radius_mm, int_radius_mm, t_mm, b_ext_top, power_full, rotation_speed,
+                               pressure, thread_length_mm, profile_area=float(area))
 
-    temp_strength = 300
-    diam_force = math.sqrt(4 * radial_force / math.pi / temp_strength / 1000) * 1000
-    diam_moment = (32 * max_moment / temp_strength / 1000 / math.pi) ** (1 / 3) * 1000
 
-    return max(diam_force / 2, diam_moment / 2)
+def calculate_min_diam(results_dict):
+    return shaft_sizing(*(float(results_dict[name]) for name in SHAFT_FIELDS)).r_max
 
 
 def create_screw(results_dict, offset, lefthand):
@@ -752,23 +484,32 @@ def create_screw(results_dict, offset, lefthand):
     )
 
     spiral_body = trapezoid.sweep(spiral, isFrenet=True)
-    spiral_body = (spiral_body.union(spiral_body.rotate((0, 0, 0), (0, 0, 1), 180))
-                   .union(create_cylinder(int_radius_mm, thread_length_mm + 2 * t_mm, offset - t_mm, 0, 0)))
+    spiral_body = combine_parts([
+        spiral_body,
+        spiral_body.rotate((0, 0, 0), (0, 0, 1), 180),
+        create_cylinder(int_radius_mm, thread_length_mm + 2 * t_mm, offset - t_mm, 0, 0),
+    ])
     logger.info('Винтовое тело готово для вырезания')
     logger.info('Создаем тела для вырезания')
     parts_to_cut = [
         create_cylinder(2 * ext_radius_mm, -thread_length_mm, offset, 0, 0),
         create_cylinder(2 * ext_radius_mm, thread_length_mm, offset + thread_length_mm, 0, 0),
+        cq.Workplane('XY').workplane(offset=-2 * t_mm + offset).circle(ext_radius_mm).circle(ext_radius_mm * 1.5).
+        extrude(thread_length_mm + 4 * t_mm),
     ]
-    body = spiral_body.cut(combine_parts(parts_to_cut)).cut(cq.Workplane('XY').workplane(offset=-2 * t_mm + offset).
-                                                            circle(ext_radius_mm).circle(ext_radius_mm * 1.5).
-                                                            extrude(thread_length_mm + 4 * t_mm))
+    body = subtract_parts(spiral_body, parts_to_cut)
     logger.info('Винтовое тело создано')
 
     return body
 
 
-def create_driven_screw(results_dict, offset, first, second):
+def screw_sections(results_dict):
+    """Винтовые участки правого и левого направления без смещения; ключ — lefthand"""
+    return {lefthand: create_screw(results_dict, 0, lefthand) for lefthand in (False, True)}
+
+
+def create_driven_screw(results_dict, offset, first, second, sections=None):
+    sections = sections or screw_sections(results_dict)
     ext_radius_mm = float(results_dict['ext_radius_mm'])
     int_radius_mm = float(results_dict['int_radius_mm'])
     thread_length_mm = float(results_dict['thread_length_mm'])
@@ -786,9 +527,9 @@ def create_driven_screw(results_dict, offset, first, second):
     parts = [
         create_cylinder(radius[0], dist[0], offset, 0, 0),
         create_cylinder(radius[1], dist[1], offset + dist[0], 0, 0),
-        create_screw(results_dict, offset + dist[0] + dist[1], first),
+        sections[first].translate((0, 0, offset + dist[0] + dist[1])),
         create_cylinder(int_radius_mm, dist[2], offset + dist[0] + dist[1] + thread_length_mm, 0, 0),
-        create_screw(results_dict, offset + thread_length_mm + dist[0] + dist[1] + dist[2], second),
+        sections[second].translate((0, 0, offset + thread_length_mm + dist[0] + dist[1] + dist[2])),
         create_cylinder(radius[1], dist[1], offset + 2 * thread_length_mm + sum(dist[:3]), 0, 0),
         create_cylinder(radius[0], dist[3], offset + 2 * thread_length_mm + sum(dist[:3]) + dist[1], 0, 0),
         create_cylinder(radius[2], dist[4], offset + 2 * thread_length_mm + sum(dist[:3]) + dist[1] + dist[3], 0, 0),
@@ -803,10 +544,17 @@ def create_driven_screw(results_dict, offset, first, second):
 
 
 def combine_parts(parts):
-    return reduce(lambda a, b: a.union(b), parts)
+    """Объединение тел одной булевой операцией вместо цепочки попарных union"""
+    first, *rest = [part.val() for part in parts]
+    return cq.Workplane('XY').add(first.fuse(*rest).clean())
+
+
+def subtract_parts(body, parts):
+    """Вырезание всех тел parts из body одной булевой операцией"""
+    return cq.Workplane('XY').add(body.val().cut(*[part.val() for part in parts]).clean())
 
 
-def create_lead_screw(results_dict):
+def create_lead_screw(results_dict, sections=None):
     ext_radius_mm = float(results_dict['ext_radius_mm'])
     thread_length_mm = float(results_dict['thread_length_mm'])
 
@@ -818,7 +566,7 @@ def create_lead_screw(results_dict):
     logger.info('Создаем части ведущего винта')
     parts = [
         create_cylinder(radius_0, dist_0, 0, 0, 0),
-        create_driven_screw(results_dict, dist_0, True, False)[0]
+        create_driven_screw(results_dict, dist_0, True, False, sections)[0]
     ]
     body = combine_parts(parts)
     logger.info('Тело ведущего винта создано')
@@ -0,0 +1,242 @@
+import numpy as np
+
+# Расчет рабочего колеса по массивам точек (расход, напор, плотность, частота) — повторяет
+# calculations() и подбор углов из calculations_2(). valid отмечает точки, на которых скалярный
+# расчет не падает с исключением (деление на ноль, комплексное число, выход за область asin).
+
+
+def design_arrays(flow_rate, pressure, density, rotation_speed):
+    """calculations() для массивов; поля по именам, valid — точки без исключений"""
+    flow_rate, pressure, density, rotation_speed = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (flow_rate, pressure, density, rotation_speed)))
+
+    with np.errstate(all='ignore'):
+        # Коэффициент быстроходности насоса
+        pump_speed_coef = np.round((3.65 * rotation_speed * np.sqrt(flow_rate / 60 / 60)) /
+                                   np.power(pressure, 3 / 4))
+        # Наружный диаметр рабочего колеса
+        k_od = 9.35 * np.sqrt(100 / pump_speed_coef)
+        outer_diam = np.round(k_od * np.power(flow_rate / 3600 / rotation_speed, 1 / 3), 4) * 1000
+        # Ширина лопастного канала рабочего колеса на входе
+        k_w = np.where(pump_speed_coef <= 200, 0.8 * np.sqrt(pump_speed_coef / 100),
+                       0.635 * np.power(pump_speed_coef / 100, 5 / 6))
+        width = np.round(k_w * np.power(flow_rate / 3600 / rotation_speed, 1 / 3), 4)
+        # Приведенный диаметр входа в рабочее колесо
+        inner_diam_1 = np.round(4.5 * np.power(flow_rate / 60 / rotation_speed, 2 / 3), 4)
+        v_0 = 0.1 * np.power(flow_rate / 3600 * rotation_speed ** 2, 1 / 3)
+        inner_diam_2 = np.round(np.power(4 * flow_rate / 3600 / (np.pi * v_0), 1 / 2), 4)
+        inner_diam = np.where(inner_diam_1 < inner_diam_2, inner_diam_1, inner_diam_2)
+        # Предварительная оценка КПД
+        n_0 = np.power(1 + (0.68 / np.power(pump_speed_coef, 2 / 3)), -1.) * 100
+        n_r = (1 - (0.42 / np.power(np.log10(inner_diam * 1000) - 0.172, 2))) * 100
+        n_m = np.power(1 + np.power(28.6 / pump_speed_coef, 2), -1.) * 100
+        n_a = n_0 / 100 * n_r / 100 * n_m / 100 * 100
+        # Максимальная мощность насоса
+        power = density * 9.81 * pressure * flow_rate / 60 / 60 / (n_a / 100) / 1000
+        power_max = power * 1.1
+        # Размеры вала и втулки (ступицы) колеса
+        m_max = np.round(power_max * 30 * 1000 / (np.pi * rotation_speed), 3)
+        shaft_diameter = np.ceil((np.power(m_max / (0.2 * 600 * 10 ** 5), 1 / 3) * 1000) / 10) * 10
+        hub_diameter = np.ceil(shaft_diameter * 1.3 / 5) * 5
+        k_inner_0 = np.where(pump_speed_coef <= 90, 1.1, np.where(pump_speed_coef <= 300, 0.8, 0.7))
+        enter_diameter_0 = np.round(np.power(np.power(inner_diam * 1000, 2) + np.power(shaft_diameter * 1.3, 2), 0.5), 1)
+        enter_diameter_1 = enter_diameter_0 * k_inner_0
+
+    design = {
+        "pump_speed_coef": pump_speed_coef, "outer_diam": outer_diam, "width": width, "n_0": n_0, "n_r": n_r,
+        "n_a": n_a, "power": power, "shaft_diameter": shaft_diameter, "hub_diameter": hub_diameter,
+        "enter_diameter_0": enter_diameter_0, "enter_diameter_1": enter_diameter_1, "v_0": v_0,
+    }
+    # log10(0) в скалярном расчете — ValueError, в numpy — -inf с конечным КПД
+    valid = inner_diam > 0
+    for values in design.values():
+        valid &= np.isfinite(values)
+    design["valid"] = valid
+    return design
+
+
+def blade_count(pump_speed_coef):
+    """Число лопастей по ns как в calculations_2; 0 — ns вне диапазона 50…600"""
+    ns = pump_speed_coef
+    return np.select(
+        [(50 <= ns) & (ns <= 60), (60 < ns) & (ns <= 180), (180 < ns) & (ns <= 350), (350 < ns) & (ns <= 600)],
+        [np.where(ns < 55, 9, 8), np.where(ns < 120, 8, 6), 6, np.where(ns < 475, 6, 5)],
+        0,
+    )
+
+
+def blade_search(design, flow_rate, pressure, rotation_speed):
+    """Подбор угла лопасти на выходе и угла атаки из calculations_2 для массивов.
+
+    found — точки, для которых скалярный подбор находит решение без исключений.
+    """
+    flow_rate, pressure, rotation_speed = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (flow_rate, pressure, rotation_speed)))
+    ns = design["pump_speed_coef"]
+    number_of_blade = blade_count(ns)
+
+    with np.errstate(all='ignore'):
+        n_vol = np.round(design["n_0"] / 100, 3)
+        n_hydro = np.round(design["n_r"] / 100, 3)
+        d_hub = design["hub_diameter"]
+        width = design["width"]
+
+        flow_rate_m_s = flow_rate / 3600
+        r_outer = design["outer_diam"] / 2
+        r_inner = design["enter_diameter_1"] / 2
+        v_t_1 = (4 * flow_rate_m_s) / (n_vol * np.pi * (np.power(2 * r_inner / 1000, 2) - np.power(d_hub / 1000, 2)))
+        u_2 = np.pi * (2 * r_outer / 1000) * rotation_speed / 60
+        m = np.round(r_outer / r_inner)
+
+        d2 = design["outer_diam"]
+        thickness_of_blade_inlet = np.round(np.interp(d2, [100, 200, 300, 500, 800], [1.25, 1.25, 2.0, 3.5, 4.5]), 1)
+        thickness_of_blade_outlet = np.round(np.interp(d2, [100, 200, 300, 500, 800], [3.0, 3.75, 4.5, 5.5, 9.0]), 1)
+
+        angle_low = np.select([ns < 50, ns <= 100, ns <= 200, ns <= 400], [20, 25, 23, 18], 15)
+        angle_high = np.select([ns < 50, ns <= 100, ns <= 200, ns <= 400], [25, 35, 27, 22], 18)
+
+        b_1 = flow_rate_m_s / (n_vol * np.pi * (2 * r_inner / 1000) * v_t_1)
+        u_1 = np.pi * (2 * r_inner / 1000) * rotation_speed / 60
+        angle_b_1 = np.round(np.arctan(v_t_1 / u_1) * 180 / np.pi)
+
+    pending = design["valid"] & (number_of_blade > 0)
+    for values in (v_t_1, u_2, m, thickness_of_blade_inlet, thickness_of_blade_outlet, b_1, angle_b_1):
+        pending &= np.isfinite(values)
+
+    found = np.zeros(pending.shape, dtype=bool)
+    angle_found = np.full(pending.shape, np.nan)
+    attack_found = np.full(pending.shape, np.nan)
+    blades_found = np.zeros(pending.shape, dtype=int)
+
+    # Порядок перебора тот же, что в скалярном цикле: угол по убыванию, угол атаки по возрастанию
+    for angle in range(35, 15 - 1, -1):
+        for attack_angle in range(3, 8 + 1):
+            angle_b_l_1 = angle_b_1 + attack_angle
+            active = pending & (angle_low <= angle) & (angle <= angle_high) & (15 <= angle_b_l_1) & (angle_b_l_1 <= 30)
+            if not active.any():
+                continue
+
+            with np.errstate(all='ignore'):
+                flow_resistance_koef_1 = 1 - (number_of_blade * thickness_of_blade_inlet /
+                                              (np.pi * 2 * r_inner * np.sin(angle_b_l_1 * np.pi / 180)))
+                v_t_2 = v_t_1 / flow_resistance_koef_1
+                flow_resistance_koef_2 = 1 - (number_of_blade * thickness_of_blade_outlet /
+                                              (np.pi * 2 * r_outer * np.sin(angle * np.pi / 180)))
+                v_t_3 = flow_rate_m_s / (flow_resistance_koef_2 * np.pi * 2 * r_outer / 1000 * width)
+                v_t_4 = v_t_3 * flow_resistance_koef_2
+
+                angle_b_2 = angle - attack_angle
+                fi = np.select(
+                    [ns < 150, ns <= 200],
+                    [0.6 + 0.6 * np.sin(angle_b_2 * np.pi / 180),
+                     1.6 * np.sin(angle_b_2 * np.pi / 180) + np.sin(angle_b_1 * np.pi / 180) * (r_inner / r_outer) ** 2],
+                    np.sin(angle_b_1 * np.pi / 180) *
+                    (1.7 + 13.3 * ((v_t_4 / (u_2 * np.tan(angle_b_2 * np.pi / 180))) ** 2)),
+                )
+                mu = np.power(1 + ((2 * fi * (2 * r_outer / 1000)) /
+                                   (number_of_blade * ((2 * r_outer / 1000) ** 2 - (2 * r_inner / 1000) ** 2))), -1.)
+                v_u_2_inf = 9.81 * pressure / (mu * n_hydro * u_2)
+                cot_b_l_1 = (u_2 - v_u_2_inf) / v_t_4
+
+                number_of_blade_checked = np.round(6.5 * ((m + 1) / (m - 1)) *
+                                                   np.sin((angle_b_l_1 + angle) * np.pi / 2 / 180))
+                asin_arg = (number_of_blade_checked * (m - 1)) / (6.5 * (m + 1))
+                angle_b_l_2_checked = 2 * np.arcsin(asin_arg) * 180 / np.pi - angle_b_l_1
+                v_dependence_k = (v_t_4 - v_t_1) / ((r_outer - r_inner) / 1000)
+
+            # Исключение на любой итерации до решения обрывает подбор для точки
+            error = ~(np.abs(asin_arg) <= 1)
+            for values in (v_t_2, v_t_3, v_t_4, fi, mu, v_u_2_inf, cot_b_l_1, number_of_blade_checked,
+                           angle_b_l_2_checked, v_dependence_k):
+                error |= ~np.isfinite(values)
+            error &= active
+
+            hit = active & ~error & (np.abs(angle - angle_b_l_2_checked) < 0.1)
+            found |= hit
+            angle_found[hit] = angle
+            attack_found[hit] = attack_angle
+            blades_found[hit] = number_of_blade_checked[hit]
+            pending &= ~(error | hit)
+
+    return {"found": found, "angle": angle_found, "attack_angle": attack_found,
+            "number_of_blade_checked": blades_found}
+
+
+def characteristic_curves(ns, kpd, kpd_hydro, flow_rate, pressure, density, rotation_speed, viscosity,
+                          num_points=50):
+    """Характеристики колеса на воде и на вязкой жидкости как в calculate_graphs, для массивов расчетных точек.
+
+    Параметры конструкций broadcast-совместимы между собой (форма D), кривые имеют форму D × num_points.
+    ns, kpd, kpd_hydro — коэффициент быстроходности, полный и гидравлический КПД (доли) из calculations().
+    Пересчет на вязкость применим при ns <= 219; выше кривые для вязкой жидкости совпадают с водой.
+    """
+    ns, kpd, kpd_hydro, flow_rate, pressure, density, rotation_speed, viscosity = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in
+          (ns, kpd, kpd_hydro, flow_rate, pressure, density, rotation_speed, viscosity)))
+    column = (..., None)  # параметры конструкции вдоль точек характеристики
+
+    with np.errstate(all='ignore'):
+        w = np.round(np.pi * rotation_speed / 30, 3)
+
+        # Коэффициенты a и b в зависимости от ns
+        ns_low, ns_high = (50 <= ns) & (ns < 80), (80 <= ns) & (ns < 151)
+        a1 = np.select([ns_low, ns_high], [0.0015, 0.0022], 0)
+        a3 = np.select([ns_low, ns_high], [-0.000675, -0.002], 0)
+        b1 = np.select([ns_low, ns_high], [0.686, 0.63], 0)
+        b3 = np.select([ns_low, ns_high], [0.339, 0.125], 0)
+
+        # Коэффициенты b_ и kpd_ в зависимости от kpd; вне диапазонов — почти ноль
+        kpd_ranges = [(0.0 <= kpd) & (kpd <= 0.7), (0.7 <= kpd) & (kpd <= 0.75), (0.75 <= kpd) & (kpd <= 1.0)]
+        b_1 = np.select(kpd_ranges, [1.7, 0.0, 0.8], 1e-12)
+        b_3 = np.select(kpd_ranges, [1.3, 0.0, 0.3], 1e-12)
+        kpd_1 = np.select(kpd_ranges, [0.7, 0.0, 0.75], 1e-12)
+        kpd_3 = kpd_1
+
+        flow_rate_sec = flow_rate / 60
+        w2 = w ** 2
+        q2 = flow_rate_sec ** 2
+
+        k1 = np.round(a1 * ns + b1 + b_1 * (kpd - kpd_1), 6)
+        k_1 = np.round(pressure * k1 / (kpd * w2), 6)
+        k3 = np.round(a3 * ns + b3 + b_3 * (kpd - kpd_3), 6)
+        k_3 = np.round(pressure * k3 / (kpd * q2), 6)
+        k_2 = np.round((pressure - k_1 * w2 + k_3 * q2) / (w * flow_rate_sec), 6)
+
+        # H(Q) = h·Q² + q_2·Q + q, Q в м³/мин
+        h = -k_3[column]
+        q = (k_1 * w ** 2)[column]
+        q_2 = (k_2 * w)[column]
+
+        q_values_m_h = np.linspace(0, flow_rate * 1.2, num=num_points, axis=-1)
+        q_values_m_min = q_values_m_h / 60
+        pressure_values_m = np.round(h * q_values_m_min ** 2 + q_2 * q_values_m_min + q, 1)
+
+        n_s_values = np.round(3.65 * rotation_speed[column] * np.sqrt(q_values_m_min / 60) /
+                              pressure_values_m ** 0.75, 0)
+        kpd_vol_values = np.where(n_s_values == 0, 0.0, np.round((1 + (0.68 / (n_s_values ** (2 / 3)))) ** -1, 3))
+        kpd_mech_values = np.where(n_s_values == 0, 0.0, np.round((1 + (28.6 / n_s_values) ** 2) ** -1, 3))
+        kpd_total_values = np.round(kpd_vol_values * kpd_hydro[column] * kpd_mech_values, 3)
+        power_values = np.where(kpd_total_values == 0, 0.0,
+                                np.round(density[column] * 9.81 * pressure_values_m * q_values_m_min /
+                                         (kpd_total_values * 60 * 1000), 1))
+
+        # Пересчет на вязкую жидкость
+        applicable = ns <= 60 * 3.65
+        b = ((16.5 * (viscosity ** 0.5) * (np.fmax.reduce(pressure_values_m, axis=-1) ** 0.0625)) /
+             ((flow_rate ** 0.375) * (rotation_speed ** 0.25)))
+        corrected = applicable & ~(b <= 1)
+        c_q = np.where(corrected, 2.71 ** (-0.165 * (np.log10(b) ** 3.15)), 1.0)
+        # При b >= 40 пересчет КПД не определен
+        c_kpd = np.where(corrected, np.where(b < 40, b ** (-0.0547 * (b ** 0.69)), np.nan), 1.0)
+        c_h = np.where(corrected[column], 1 - (1 - c_q[column]) * ((q_values_m_min * 60 / flow_rate[column]) ** 0.75),
+                       1.0)
+
+        pressure_values_m_vis = np.round(pressure_values_m * c_h, 1)
+        kpd_total_values_vis = np.round(kpd_total_values * c_kpd[column], 3)
+
+    return {
+        "q_values_m_h": q_values_m_h, "pressure_values_m": pressure_values_m,
+        "pressure_values_m_vis": pressure_values_m_vis, "n_s_values": n_s_values, "kpd_vol_values": kpd_vol_values,
+        "kpd_mech_values": kpd_mech_values, "kpd_total_values": kpd_total_values,
+        "kpd_total_values_vis": kpd_total_values_vis, "power_values": power_values, "c_q": c_q, "c_kpd": c_kpd,
+    }
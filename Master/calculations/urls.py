@@ -3,4 +3,5 @@ from . import views
 
 urlpatterns = [
     path('', views.wheel_calc, name='wheel_calc'),
-]
\ No newline at end of file
+    path('charts/', views.wheel_charts, name='wheel_charts'),
+]
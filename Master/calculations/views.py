@@ -8,17 +8,26 @@ from cadquery import exporters
 import numpy as np
 import os
 from pathlib import Path
-import plotly.graph_objects as go
-from plotly.offline import plot
 import zipfile
 import logging
 import csv
 import time
+from functools import lru_cache
 from tqdm import tqdm
+from . import kernel
+from Master import artifacts, charts
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Сколько расчетных точек (расход, напор, плотность, частота) держать в кэше каждого этапа
+DESIGN_CACHE_SIZE = 64
+# Готовых моделей колеса (тела CadQuery) держится немного: они занимают много памяти, а скачивание
+# повторно отдает STEP из дискового кэша (Master.artifacts)
+WHEEL_MODEL_CACHE_SIZE = 4
+# Версия кода геометрии рабочего колеса; увеличить при изменении построения модели
+GEOMETRY_VERSION = 2
+
 
 def wheel_calc(request):
     context = {
@@ -85,6 +94,9 @@ def wheel_calc(request):
                     context['show_plot'] = True
                 else:
                     context['show_plot'] = False
+                if context['show_plot']:
+                    context['plots'] = generate_plots(
+                        *calculate_graphs(flow_rate, pressure, density, rotation_speed, viscosity))
                 # q_values_m_h, pressure_values_m, pressure_values_m_vis, kpd_total_values, kpd_total_values_vis = calculate_graphs(flow_rate, pressure, density, rotation_speed, viscosity)
                 # q_plot = plot_q(q_values_m_h, pressure_values_m, pressure_values_m_vis)
                 # kpd_plot = plot_kpd(q_values_m_h,kpd_total_values, kpd_total_values_vis)
@@ -115,10 +127,8 @@ def wheel_calc(request):
 
                 # Преобразуем фигуры в HTML
 
-                r_list, angle_total_list, number_of_blades, thickness, b_list_updated = calculations_2(flow_rate, pressure, density, rotation_speed)
-                contour_1, contour_2, contour_3, heihgt_blades = create_section_meridional(flow_rate, pressure, density, rotation_speed, r_list, b_list_updated)
-                create_wheel(flow_rate, pressure, density, rotation_speed, contour_1, contour_2, contour_3, heihgt_blades, r_list, angle_total_list, number_of_blades,
-                             thickness)
+                wheel_model(flow_rate, pressure, density, rotation_speed)
+                logger.info(f"Кэш расчетов колеса: {design_cache_info()}")
 
             # find_valid_combinations_fixed_params()
             # calculate_graphs( flow_rate, pressure, density, rotation_speed, viscosity)
@@ -145,6 +155,7 @@ def wheel_calc(request):
     return render(request, 'calculations.html', context)
 
 
+@lru_cache(maxsize=DESIGN_CACHE_SIZE)
 def calculations(flow_rate, pressure, density, rotation_speed):
     # Коэффициент быстроходности насоса
     pump_speed_coef = round((3.65 * rotation_speed * math.sqrt(flow_rate / 60 / 60)) / (pressure ** (3 / 4)))
@@ -200,6 +211,7 @@ def calculations(flow_rate, pressure, density, rotation_speed):
             enter_diameter_1, hub_diameter, v_0)
 
 
+@lru_cache(maxsize=DESIGN_CACHE_SIZE)
 def calculations_2(flow_rate, pressure, density, rotation_speed, num_items=10):
     data = calculations(flow_rate, pressure, density, rotation_speed)
 
@@ -395,171 +407,72 @@ def calculations_2(flow_rate, pressure, density, rotation_speed, num_items=10):
         cumulative += i
         angle_total_list.append(round(cumulative, 1))
 
-    return r_list, angle_total_list, number_of_blade_checked, thickness_list, b_list_updated
-
-
-def calculate_graphs(flow_rate, pressure, density, rotation_speed, viscosity, num_points=50):
-    data = calculations(flow_rate, pressure, density, rotation_speed)
-    ns = data[0]
-    kpd = data[8] / 100
-
-    w = round((math.pi * rotation_speed / 30), 3)
-
-    # Коэффициенты a и b в зависимости от ns
-    ns_coeffs = [
-        (50, 80, {'a1': 0.0015, 'a3': -0.000675, 'b1': 0.686, 'b3': 0.339}),
-        (80, 151, {'a1': 0.0022, 'a3': -0.002, 'b1': 0.63, 'b3': 0.125})
-    ]
-    a1 = a3 = b1 = b3 = 0
-    for lower, upper, coeff in ns_coeffs:
-        if lower <= ns < upper:
-            a1, a3 = coeff['a1'], coeff['a3']
-            b1, b3 = coeff['b1'], coeff['b3']
-            break
-
-    # Коэффициенты b_ и kpd_ в зависимости от kpd
-    kpd_coeffs = [
-        (0.0, 0.7, {'b_1': 1.7, 'b_3': 1.3, 'kpd_1': 0.7, 'kpd_3': 0.7}),
-        (0.7, 0.75, {'b_1': 0.0, 'b_3': 0.0, 'kpd_1': 0.0, 'kpd_3': 0.0}),
-        (0.75, 1.0, {'b_1': 0.8, 'b_3': 0.3, 'kpd_1': 0.75, 'kpd_3': 0.75})
-    ]
-    b_1 = b_3 = kpd_1 = kpd_3 = 1e-12  # Default for out-of-range kpd
-    for lower, upper, coeff in kpd_coeffs:
-        if lower <= kpd <= upper:
-            b_1, b_3 = coeff['b_1'], coeff['b_3']
-            kpd_1, kpd_3 = coeff['kpd_1'], coeff['kpd_3']
-            break
-
-    flow_rate_sec = flow_rate / 60
-    w2 = w ** 2
-    q2 = flow_rate_sec ** 2
-
-    k1 = round(a1 * ns + b1 + b_1 * (kpd - kpd_1), 6)
-    k_1 = round(pressure * k1 / (kpd * w2), 6)
-    k3 = round(a3 * ns + b3 + b_3 * (kpd - kpd_3), 6)
-    k_3 = round(pressure * k3 / (kpd * q2), 6)
-    k_2 = round((pressure - k_1 * w2 + k_3 * q2) / (w * flow_rate_sec), 6)
-
-    h = -k_3
-    q = k_1 * w ** 2
-    q_2 = k_2 * w
-
-    q_values_m_h = np.linspace(0, flow_rate * 1.2, num=num_points)
-    q_values_m_min = q_values_m_h / 60
-    pressure_values_m = []
-
-    for q_val in q_values_m_min:
-        value = h * q_val ** 2 + q_2 * q_val + q
-        rounded_value = round(value, 1)
-        pressure_values_m.append(rounded_value)
-    pressure_values_m = [float(x) for x in pressure_values_m]
-
-    n_s_values = []
-
-    for q_val, p_val in zip(q_values_m_min, pressure_values_m):
-        value = 3.65 * rotation_speed * math.sqrt(q_val / 60) / (p_val ** 0.75)
-        rounded = round(value, 0)
-        n_s_values.append(rounded)
-    n_s_values = [float(x) for x in n_s_values]
-
-    kpd_vol_values = []
-    for n_s in n_s_values:
-        if n_s == 0:
-            kpd_vol_values.append(0.0)
-        else:
-            value = (1 + (0.68 / (n_s ** (2 / 3)))) ** -1
-            kpd_vol_values.append(round(value, 3))
-    kpd_vol_values = [float(x) for x in kpd_vol_values]
-
-    kpd_mech_values = []
-    for n_s in n_s_values:
-        if n_s == 0:
-            kpd_mech_values.append(0.0)
-        else:
-            value = (1 + (28.6 / n_s) ** 2) ** -1
-            kpd_mech_values.append(round(value, 3))
-    kpd_mech_values = [float(x) for x in kpd_mech_values]
-
-    kpd_hydro = data[6] / 100
-
-    kpd_total_values = []
-    for kpd_vol, kpd_mech in zip(kpd_vol_values, kpd_mech_values):
-        kpd_total_values.append(round(kpd_vol * kpd_hydro * kpd_mech, 3))
-
-    power_values = []
-    for q_val, p_val, kpd_val in zip(q_values_m_min, pressure_values_m, kpd_total_values):
-        if kpd_val == 0:
-            power_values.append(0.0)
-        else:
-            power_values.append(round(((density * 9.81 * p_val * q_val) / (kpd_val * 60 * 1000)), 1))
-    power_values = [float(x) for x in power_values]
+    # Кортежи, чтобы результат из кэша нельзя было изменить у вызывающего
+    return tuple(r_list), tuple(angle_total_list), number_of_blade_checked, tuple(thickness_list), tuple(b_list_updated)
 
-    if ns <= 60 * 3.65:
-        b = ((16.5 * (viscosity ** 0.5) * (max(pressure_values_m) ** 0.0625)) /
-             ((flow_rate ** 0.375) * (rotation_speed ** 0.25)))
-    else:
-        b = None
 
-    if b <= 1:
-        c_q = 1
-    else:
-        c_q = 2.71 ** (-0.165 * (math.log10(b) ** 3.15))
+@lru_cache(maxsize=WHEEL_MODEL_CACHE_SIZE)
+def wheel_model(flow_rate, pressure, density, rotation_speed):
+    """Модель рабочего колеса для расчетной точки; общая для расчета и скачивания модели"""
+    r_list, angle_total_list, number_of_blades, thickness, b_list_updated = calculations_2(flow_rate, pressure, density, rotation_speed)
+    contour_1, contour_2, contour_3, heihgt_blades = create_section_meridional(flow_rate, pressure, density, rotation_speed, r_list, b_list_updated)
 
-    if b <= 1:
-        c_kpd = 1
-    elif b < 40:
-        c_kpd = b ** (-0.0547 * (b ** 0.69))
-    else:
-        c_kpd = None
+    if not all([contour_1, contour_2, contour_3, heihgt_blades, r_list, angle_total_list, number_of_blades, thickness, b_list_updated]):
+        raise ValueError("Не все геометрические параметры заданы")
 
-    c_h_val = []
-    for q_val in q_values_m_min:
-        if b <= 1:
-            c_h_val.append(1)
-        else:
-            c_h_val.append(1 - (1 - c_q) * ((q_val * 60 / flow_rate) ** 0.75))
-    c_h_val = [float(x) for x in c_h_val]
+    wheel = create_wheel(flow_rate, pressure, density, rotation_speed, contour_1, contour_2, contour_3, heihgt_blades, r_list, angle_total_list, number_of_blades,
+                         thickness)
+    # Неудачное построение не должно попасть в кэш: исключение lru_cache не запоминает
+    if wheel is None:
+        raise ValueError("Модель не была создана")
+    return wheel
 
-    q_values_m_min_vis = []
-    for q_val in q_values_m_min:
-        q_values_m_min_vis.append(c_q * q_val)
-    q_values_m_min_vis = [float(x) for x in q_values_m_min_vis]
 
-    q_values_m_h_vis = q_values_m_min_vis * 60
+def design_cache_info():
+    """Попадания и промахи кэша по этапам расчета колеса"""
+    return {stage.__name__: stage.cache_info()._asdict() for stage in (calculations, calculations_2, wheel_model)}
 
-    pressure_values_m_vis = []
-    for p_val, c_h in zip(pressure_values_m, c_h_val):
-        pressure_values_m_vis.append(round(p_val * c_h, 1))
-    pressure_values_m_vis = [float(x) for x in pressure_values_m_vis]
 
-    kpd_total_values_vis = []
-    for kpd_val in kpd_total_values:
-        kpd_total_values_vis.append(round(kpd_val * c_kpd, 3))
-    kpd_total_values_vis = [float(x) for x in kpd_total_values_vis]
+def calculate_graphs(flow_rate, pressure, density, rotation_speed, viscosity, num_points=50):
+    """Кривые напора и КПД на воде и на вязкой жидкости для расчетной точки, массивы numpy"""
+    data = calculations(flow_rate, pressure, density, rotation_speed)
+    curves = kernel.characteristic_curves(data[0], data[8] / 100, data[6] / 100, flow_rate, pressure, density,
+                                          rotation_speed, viscosity, num_points=num_points)
+    return (curves["q_values_m_h"], curves["pressure_values_m"], curves["pressure_values_m_vis"],
+            curves["kpd_total_values"], curves["kpd_total_values_vis"])
 
-    return q_values_m_h, pressure_values_m, pressure_values_m_vis, kpd_total_values, kpd_total_values_vis
 
 def generate_plots(q_values_m_h, pressure_values_m, pressure_values_m_vis,
                    kpd_total_values, kpd_total_values_vis):
+    """Графики напора и КПД данными для построения в браузере (Master.charts)"""
     # Первый график: Напор
-    fig1 = go.Figure()
-    fig1.add_trace(go.Scatter(x=q_values_m_h, y=pressure_values_m, mode='lines', name='Напор (вода)'))
-    fig1.add_trace(go.Scatter(x=q_values_m_h, y=pressure_values_m_vis, mode='lines', name='Напор (вязкая)'))
-    fig1.update_layout(title='Зависимость напора от подачи',
-                       xaxis_title='Подача (м³/ч)', yaxis_title='Напор (м)')
+    head_chart = charts.chart('Зависимость напора от подачи', 'Подача (м³/ч)', 'Напор (м)', [
+        charts.series('Напор (вода)', q_values_m_h, pressure_values_m),
+        charts.series('Напор (вязкая)', q_values_m_h, pressure_values_m_vis),
+    ])
 
     # Второй график: КПД
-    fig2 = go.Figure()
-    fig2.add_trace(go.Scatter(x=q_values_m_h, y=kpd_total_values, mode='lines', name='КПД (вода)'))
-    fig2.add_trace(go.Scatter(x=q_values_m_h, y=kpd_total_values_vis, mode='lines', name='КПД (вязкая)'))
-    fig2.update_layout(title='Зависимость КПД от подачи',
-                       xaxis_title='Подача (м³/ч)', yaxis_title='КПД')
+    kpd_chart = charts.chart('Зависимость КПД от подачи', 'Подача (м³/ч)', 'КПД', [
+        charts.series('КПД (вода)', q_values_m_h, kpd_total_values),
+        charts.series('КПД (вязкая)', q_values_m_h, kpd_total_values_vis),
+    ])
+
+    return [head_chart, kpd_chart]
 
-    # Сохраняем как HTML div (без полной страницы)
-    plot1_html = fig1.to_html(full_html=False, include_plotlyjs=False)
-    plot2_html = fig2.to_html(full_html=False, include_plotlyjs=False)
 
-    return [plot1_html, plot2_html]
+def wheel_charts(request):
+    """Данные графиков напора и КПД колеса в JSON: flow_rate, pressure, density, rotation_speed, viscosity в запросе"""
+    params = request.POST if request.method == "POST" else request.GET
+    try:
+        flow_rate, pressure, density, rotation_speed, viscosity = (
+            float(params.get(name, '').replace(',', '.'))
+            for name in ('flow_rate', 'pressure', 'density', 'rotation_speed', 'viscosity'))
+        plots = generate_plots(*calculate_graphs(flow_rate, pressure, density, rotation_speed, viscosity))
+    except ZeroDivisionError:
+        return charts.chart_response([], status=400, error='Ошибка: деление на ноль. Были выбраны неправильные данные.')
+    except (ValueError, TypeError):
+        return charts.chart_response([], status=400, error='Ошибка: введены некорректные числовые данные.')
+    return charts.chart_response(plots)
 
 # def plot_q(q_values_m_h, pressure_values_m, pressure_values_m_vis):
 #     plots_1 = [
@@ -597,7 +510,7 @@ def generate_plots(q_values_m_h, pressure_values_m, pressure_values_m_vis,
 #     return fig
 
 
-def create_section_meridional(flow_rate, pressure, density, rotation_speed, r_list, b_list_updated, debug_mode=True):
+def create_section_meridional(flow_rate, pressure, density, rotation_speed, r_list, b_list_updated, debug_mode=False):
     data = calculations(flow_rate, pressure, density, rotation_speed)
 
     r_list_mm = [round(i, 2) for i in r_list]
@@ -773,14 +686,11 @@ def create_section_meridional(flow_rate, pressure, density, rotation_speed, r_li
 
 def create_wheel(flow_rate, pressure, density, rotation_speed, contour1, contour2, contour3, height, r_list, angle_total_list, number_of_blades, thickness):
     """Создает колесо из вращенных контуров и выдавливает лопатки"""
-    data = calculations(flow_rate, pressure, density, rotation_speed)
-    d_2 = data[1]
     try:
         # 1. Создаем основное тело из контуров
-        main_body = (
-            contour1.revolve(360, (0, 0, 0), (1, 0, 0))
-            .union(contour2.revolve(360, (0, 0, 0), (1, 0, 0)))
-        )
+        axis_start, axis_end = cq.Vector(0, 0, 0), cq.Vector(1, 0, 0)
+        hub = contour1.revolve(360, (0, 0, 0), (1, 0, 0)).val()
+        shroud = contour2.revolve(360, (0, 0, 0), (1, 0, 0)).val()
 
         # 2. Создаем лопатки
         blades_data = create_section_blades(
@@ -791,22 +701,22 @@ def create_wheel(flow_rate, pressure, density, rotation_speed, contour1, contour
             debug=False
         )
 
-        if not blades_data or 'faces' not in blades_data:
+        if not blades_data or not blades_data['faces']:
             raise ValueError("Ошибка создания лопаток")
 
-        # 3. Создаем и выдавливаем лопатки
-        extruded_blades = cq.Workplane("ZY")
-        for face in blades_data['faces']:
-            extruded_blades = extruded_blades.add(face).extrude(height)
+        # 3. Выдавливаем одну лопатку и размножаем ее поворотом вокруг оси колеса
+        blade = cq.Workplane("ZY").add(blades_data['faces'][0]).extrude(height).val()
+        blades = [blade.rotate(axis_start, axis_end, blade_idx * 360 / number_of_blades)
+                  for blade_idx in range(number_of_blades)]
 
-        # 4. Объединяем все компоненты
-        final_body = main_body.union(extruded_blades).cut(contour3.revolve(360, (0, 0, 0), (1, 0, 0)))
+        # 4. Объединяем все компоненты одной булевой операцией
+        final_body = hub.fuse(shroud, *blades).clean()
 
         # 6. Вырезаем кольцо на крайней левой стороне (X-)
         ring_inner_radius = max(r_list)  # внутренний радиус кольца
         ring_outer_radius = ring_inner_radius + 30  # внешний радиус кольца
-        # Получаем габариты тела
-        bbox = final_body.val().BoundingBox()
+        # Получаем габариты тела; кольцо режет все тело по длине, поэтому габарит до выреза подходит
+        bbox = final_body.BoundingBox()
         x_min = bbox.xmin - 0.1  # небольшое смещение в -X
         x_max = bbox.xmax
 
@@ -816,118 +726,70 @@ def create_wheel(flow_rate, pressure, density, rotation_speed, contour1, contour
             .circle(ring_outer_radius)
             .circle(ring_inner_radius)
             .extrude(ring_thickness)
-        )
-
-        final_body = final_body.cut(ring_cut)
-
-        d_str = f"{d_2:.1f}".replace('.', '_')  # округляем до 1 знака и заменяем точку
-        file_name = f"Wheel_{d_str}.step"
+        ).val()
 
-        # 5. Экспорт
-        # cq.exporters.export(final_body, file_name, 'STEP')
+        # Внутренняя полость и кольцо вырезаются за одну операцию
+        final_body = final_body.cut(contour3.revolve(360, (0, 0, 0), (1, 0, 0)).val(), ring_cut).clean()
 
-        return final_body
+        return cq.Workplane("XY").add(final_body)
 
     except Exception as e:
         print(f"Ошибка создания колеса: {str(e)}")
         return None
 
 
-def rotate_vector(v, angle_deg, axis='x'):
-    """Вращение вектора вокруг выбранной оси"""
-    angle = math.radians(angle_deg)
-    x, y, z = v.x, v.y, v.z
-
-    if axis.lower() == 'x':
-        return cq.Vector(
-            x,
-            y * math.cos(angle) - z * math.sin(angle),
-            y * math.sin(angle) + z * math.cos(angle)
-        )
-    elif axis.lower() == 'z':
-        return cq.Vector(
-            x * math.cos(angle) - y * math.sin(angle),
-            x * math.sin(angle) + y * math.cos(angle),
-            z
-        )
-    else:
-        raise ValueError("Неподдерживаемая ось вращения")
-
-
-def create_section_blades(r_list, angle_total_list, number_of_blades, thickness, debug=True):
-    # Генерация базового профиля в плоскости ZY
-    points = [cq.Vector(0, r_list[0], 0)]  # (Z, Y, X)
-
-    for i, angle in enumerate(angle_total_list):
-        r = r_list[i + 1]
-        rad_angle = math.radians(angle)
-        # Преобразование в плоскость ZY: (Z, Y, X)
-        points.append(cq.Vector(
-            0,
-            r * math.cos(rad_angle),
-            r * math.sin(rad_angle)
-        ))
-
-    all_wire_list = []
-
-    for blade_idx in range(number_of_blades):
-        # Поворот вокруг оси X для плоскости ZY
-        angle = blade_idx * (360 / number_of_blades)
-        rotated_points = [rotate_vector(p, angle, axis='x') for p in points]
-
-        # Генерация контуров с толщиной
-        outer_points = []
-        inner_points = []
-
-        for i, p in enumerate(rotated_points):
-            # Вычисление нормали в плоскости ZY
-            if i == 0:
-                tangent = rotated_points[i + 1] - p
-            elif i == len(rotated_points) - 1:
-                tangent = p - rotated_points[i - 1]
-            else:
-                tangent = rotated_points[i + 1] - rotated_points[i - 1]
-
-            # Нормаль к касательной в плоскости ZY
-            normal = tangent.cross(cq.Vector(1, 0, 0)).normalized()  # Ось X перпендикулярна плоскости ZY
-            offset = normal * thickness[i] / 2
-
-            outer_points.append(p + offset)
-            inner_points.append(p - offset)
-
-        # Создание замкнутого контура
-        edges = [
-            cq.Edge.makeSpline(outer_points),
-            cq.Edge.makeLine(outer_points[-1], inner_points[-1]),
-            cq.Edge.makeSpline(list(reversed(inner_points))),
-            cq.Edge.makeLine(inner_points[0], outer_points[0])
-        ]
+def create_section_blades(r_list, angle_total_list, number_of_blades, thickness, debug=False):
+    """Контуры и грани лопаток: профиль строится один раз и поворачивается вокруг оси X"""
+    # Генерация базового профиля в плоскости ZY: (Z, Y, X)
+    radii = np.asarray(r_list[:len(angle_total_list) + 1], dtype=float)
+    angles = np.radians(np.concatenate(([0.0], np.asarray(angle_total_list, dtype=float))))
+    points = np.column_stack((np.zeros_like(radii), radii * np.cos(angles), radii * np.sin(angles)))
+
+    # Касательные: разности соседних точек, на концах — односторонние
+    tangents = np.empty_like(points)
+    tangents[0] = points[1] - points[0]
+    tangents[-1] = points[-1] - points[-2]
+    tangents[1:-1] = points[2:] - points[:-2]
+
+    # Нормаль к касательной в плоскости ZY (ось X перпендикулярна плоскости)
+    normals = np.cross(tangents, [1.0, 0.0, 0.0])
+    normals /= np.linalg.norm(normals, axis=1)[:, None]
+    offsets = normals * (np.asarray(thickness[:len(points)], dtype=float) / 2)[:, None]
+
+    outer_points = [cq.Vector(*p) for p in points + offsets]
+    inner_points = [cq.Vector(*p) for p in points - offsets]
+
+    # Создание замкнутого контура
+    edges = [
+        cq.Edge.makeSpline(outer_points),
+        cq.Edge.makeLine(outer_points[-1], inner_points[-1]),
+        cq.Edge.makeSpline(list(reversed(inner_points))),
+        cq.Edge.makeLine(inner_points[0], outer_points[0])
+    ]
 
-        try:
-            wire = cq.Wire.assembleEdges(edges)
-            all_wire_list.append(wire)
+    try:
+        wire = cq.Wire.assembleEdges(edges)
+        face = cq.Face.makeFromWires(wire)
+    except Exception as e:
+        print(f"Ошибка создания контура лопасти: {e}")
+        return {'wires': [], 'faces': [], 'compound': cq.Compound.makeCompound([])}
 
-            # Экспорт для дебага
-            if debug:
-                cq.exporters.export(wire, f'debug_blade_{blade_idx}.step')
-        except Exception as e:
-            print(f"Ошибка создания проволочного контура для лопасти {blade_idx}: {e}")
+    # Поворот вокруг оси X для остальных лопастей
+    axis_start, axis_end = cq.Vector(0, 0, 0), cq.Vector(1, 0, 0)
+    all_wire_list = [wire.rotate(axis_start, axis_end, blade_idx * 360 / number_of_blades)
+                     for blade_idx in range(number_of_blades)]
+    faces = [face.rotate(axis_start, axis_end, blade_idx * 360 / number_of_blades)
+             for blade_idx in range(number_of_blades)]
 
     # Создание общего Compound
     compound = cq.Compound.makeCompound(all_wire_list)
 
-    # Экспорт общего файла
+    # Экспорт для дебага — только по запросу, файлы пишутся в рабочий каталог
     if debug:
+        for blade_idx, blade_wire in enumerate(all_wire_list):
+            cq.exporters.export(blade_wire, f'debug_blade_{blade_idx}.step')
         cq.exporters.export(compound, 'all_blades_compound.step')
 
-    # Создание граней
-    faces = []
-    for wire in all_wire_list:
-        try:
-            faces.append(cq.Face.makeFromWires(wire))
-        except Exception as e:
-            print(f"Ошибка создания грани: {e}")
-
     return {
         'wires': all_wire_list,
         'faces': faces,
@@ -951,9 +813,7 @@ def format_context_list(data_list):
     return data_list
 
 
-def find_valid_combinations_fixed_params():
-    import traceback
-
+def find_valid_combinations_fixed_params(filename="valid_combinations.csv"):
     # Фиксированная плотность
     target_density = 1000  # кг/м³
 
@@ -962,29 +822,32 @@ def find_valid_combinations_fixed_params():
     pressure_range = range(10, 100, 1)             # Напор, м (91 значение)
     rotation_speed_range = range(500, 2001, 1)   # Частота вращения, об/мин (41 значение)
 
-    valid_combinations = []
     index = 1
     total_combinations = len(flow_rate_range) * len(pressure_range) * len(rotation_speed_range)
 
     print(f"🔍 Всего комбинаций для проверки: {total_combinations}")
     start_time = time.time()
 
-    # Обёртка tqdm для прогресс-бара
-    for flow_rate in tqdm(flow_rate_range, desc="Подача"):
-        for rotation_speed in rotation_speed_range:
-            for pressure in pressure_range:
-                try:
-                    # 1. Основные расчёты
-                    calculated_values = calculations(
-                        flow_rate,
-                        pressure,
-                        target_density,
-                        rotation_speed
-                    )
-                    pump_speed_coef = calculated_values[0]
+    # Срез (частота, напор) в том же порядке, что и вложенные циклы
+    speed_grid, pressure_grid = np.meshgrid(rotation_speed_range, pressure_range, indexing='ij')
+    speed_grid, pressure_grid = speed_grid.ravel(), pressure_grid.ravel()
+
+    fieldnames = ["№", "flow_rate_m3h", "pressure_m", "density_kgm3", "rotation_speed_rpm", "n_s", "d_outer_mm",
+                  "number_of_blades"]
+    with open(filename, mode="w", newline='', encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, delimiter=';')
+        writer.writeheader()
 
-                    if not (50 <= pump_speed_coef <= 600):
-                        continue
+        # Обёртка tqdm для прогресс-бара
+        for flow_rate in tqdm(flow_rate_range, desc="Подача"):
+            # 1. Отбор по ns, углам и числу лопастей сразу для всего среза
+            design = kernel.design_arrays(flow_rate, pressure_grid, target_density, speed_grid)
+            survivors = np.flatnonzero(kernel.blade_search(design, flow_rate, pressure_grid, speed_grid)["found"])
+
+            for i in survivors:
+                rotation_speed, pressure = int(speed_grid[i]), int(pressure_grid[i])
+                try:
+                    pump_speed_coef = calculations(flow_rate, pressure, target_density, rotation_speed)[0]
 
                     # 2. Геометрия
                     r_list, angle_total_list, number_of_blades, thickness, b_list_updated = calculations_2(
@@ -997,8 +860,8 @@ def find_valid_combinations_fixed_params():
                     r_outer = max(r_list)  # мм
                     d_outer = round(r_outer * 2, 1)  # наружный диаметр
 
-                    # 3. Проверка построения сечения
-                    contour_1, contour_2, contour_3, height_blades = create_section_meridional(
+                    # 3. Проверка построения сечения — только для прошедших отбор
+                    create_section_meridional(
                         flow_rate,
                         pressure,
                         target_density,
@@ -1007,39 +870,33 @@ def find_valid_combinations_fixed_params():
                         b_list_updated
                     )
 
-                    # 4. Добавление валидной комбинации
-                    valid_combinations.append({
-                        "№": index,
-                        "flow_rate_m3h": flow_rate,
-                        "pressure_m": pressure,
-                        "density_kgm3": target_density,
-                        "rotation_speed_rpm": rotation_speed,
-                        "n_s": round(pump_speed_coef),
-                        "d_outer_mm": d_outer,
-                        "number_of_blades": number_of_blades
-                    })
-                    index += 1
-
                 except Exception:
                     continue
 
+                # 4. Запись валидной комбинации
+                writer.writerow({
+                    "№": index,
+                    "flow_rate_m3h": flow_rate,
+                    "pressure_m": pressure,
+                    "density_kgm3": target_density,
+                    "rotation_speed_rpm": rotation_speed,
+                    "n_s": round(pump_speed_coef),
+                    "d_outer_mm": d_outer,
+                    "number_of_blades": number_of_blades
+                })
+                index += 1
+            file.flush()
+
     elapsed = time.time() - start_time
     print(f"\n⏱ Время выполнения: {round(elapsed, 2)} сек.")
 
-    # Сохранение CSV
-    if valid_combinations:
-        filename = "valid_combinations.csv"
-        with open(filename, mode="w", newline='', encoding="utf-8") as file:
-            writer = csv.DictWriter(file, fieldnames=valid_combinations[0].keys(), delimiter=';')
-            writer.writeheader()
-            writer.writerows(valid_combinations)
-
-        print(f"✅ Найдено {len(valid_combinations)} валидных комбинаций.")
+    if index > 1:
+        print(f"✅ Найдено {index - 1} валидных комбинаций.")
         print(f"📁 Результаты сохранены в файл: {filename}")
     else:
         print("❌ Не найдено ни одной валидной комбинации.")
 
-    return valid_combinations
+    return index - 1
 
 
 def handle_download_model(request, context):
@@ -1049,29 +906,28 @@ def handle_download_model(request, context):
     pressure = float(request.POST.get("pressure"))
     density = float(request.POST.get("density"))
     rotation_speed = float(request.POST.get("rotation_speed"))
-    r_list, angle_total_list, number_of_blades, thickness, b_list_updated = calculations_2(flow_rate, pressure, density, rotation_speed)
-    contour_1, contour_2, contour_3, heihgt_blades = create_section_meridional(flow_rate, pressure, density, rotation_speed, r_list, b_list_updated)
     data = calculations(flow_rate, pressure, density, rotation_speed)
     d_2 = data[1]
 
-    if not all([contour_1, contour_2, contour_3, heihgt_blades, r_list, angle_total_list, number_of_blades, thickness, b_list_updated]):
-        raise ValueError("Не все геометрические параметры заданы")
-
-    # Создаём модель и экспортируем
-    final_body = create_wheel(flow_rate, pressure, density, rotation_speed, contour_1, contour_2, contour_3, heihgt_blades, r_list, angle_total_list, number_of_blades,
-                              thickness)
-
-    if final_body is None:
-        raise ValueError("Модель не была создана")
-
     # Имя файла
     d_str = f"{d_2:.1f}".replace('.', '_')
     filename = f"Wheel_{d_str}.step"
-    cq.exporters.export(final_body, filename, 'STEP')
+
+    def build(directory):
+        # Модель берется из кэша, если эта точка уже считалась при расчете параметров
+        final_body = wheel_model(flow_rate, pressure, density, rotation_speed)
+        logger.info(f"Кэш расчетов колеса: {design_cache_info()}")
+
+        cq.exporters.export(final_body, os.path.join(directory, filename), 'STEP')
+
+    directory, _ = artifacts.cached_artifacts(
+        'wheel', {'flow_rate': flow_rate, 'pressure': pressure, 'density': density, 'rotation_speed': rotation_speed},
+        GEOMETRY_VERSION, build)
+    path = os.path.join(directory, filename)
 
     # Проверяем, что файл существует
-    if not os.path.exists(filename):
+    if not os.path.exists(path):
         raise FileNotFoundError(f"Файл {filename} не найден")
 
     # Возвращаем как загрузку
-    return FileResponse(open(filename, 'rb'), as_attachment=True, filename=filename)
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=filename)
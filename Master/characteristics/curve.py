@@ -0,0 +1,31 @@
+import math
+
+import numpy as np
+
+# Кривая характеристики H(Q) по коэффициентам views.calculations; общая для графика в браузере
+# (views.graph) и картинки PNG (png.render_png).
+
+# Наибольшее число точек кривой: при большом расходе шаг 1 м³/мин заменяется равномерной выборкой
+CURVE_POINTS_MAX = 1000
+
+
+def check_flow_rate(flow_rate):
+    """Ошибка ввода, если расход отрицательный или не число"""
+    if not (math.isfinite(flow_rate) and flow_rate >= 0):
+        raise ValueError(f"расход должен быть неотрицательным числом, получено {flow_rate}")
+
+
+def characteristic_curve(a, flow_rate, pressure):
+    """Точки характеристики H(Q) по коэффициентам calculations: Q в м³/мин с шагом 1 до 1,3 номинала.
+
+    Больше CURVE_POINTS_MAX точек не строится; отрицательный или нечисловой расход — ValueError.
+    """
+    check_flow_rate(flow_rate)
+    w, _, k_1, _, k_3, k_2 = a
+    num_points = math.ceil((flow_rate / 60) * 1.3)
+    if num_points > CURVE_POINTS_MAX:
+        x = np.linspace(0, num_points - 1, CURVE_POINTS_MAX)
+    else:
+        x = np.arange(num_points, dtype=float)
+    y = np.round(k_1 * w ** 2 + k_2 * w * x - k_3 * x ** 2, 1)
+    return x, y
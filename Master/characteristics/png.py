@@ -0,0 +1,47 @@
+import hashlib
+import io
+from functools import lru_cache
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .curve import characteristic_curve
+
+# Картинка характеристики строится объектным API matplotlib на холсте Agg: у каждого вызова своя
+# фигура и нет общего состояния pyplot, поэтому рисовать можно из нескольких потоков сервера.
+# Готовые PNG держатся в памяти процесса по коэффициентам характеристики и расчетной точке.
+
+# Сколько картинок (коэффициенты, расход, напор) держать в кэше процесса
+PNG_CACHE_SIZE = 128
+PNG_SIZE = (6.4, 4.8)  # дюймы, как у фигуры pyplot по умолчанию
+PNG_DPI = 100
+
+
+def png_key(a, flow_rate, pressure):
+    """Ключ картинки: коэффициенты w, k_1, k_3, k_2 (остальные на кривую не влияют), расход и напор"""
+    w, _, k_1, _, k_3, k_2 = a
+    return float(w), float(k_1), float(k_3), float(k_2), float(flow_rate), float(pressure)
+
+
+def png_etag(key):
+    """ETag картинки по ключу; при изменении оформления достаточно поменять префикс"""
+    return hashlib.sha1(repr(('characteristic-v1', key)).encode()).hexdigest()
+
+
+@lru_cache(maxsize=PNG_CACHE_SIZE)
+def render_png(key):
+    """PNG характеристики H(Q) для ключа png_key; результат общий для всех запросов процесса"""
+    w, k_1, k_3, k_2, flow_rate, pressure = key
+    x, y = characteristic_curve((w, None, k_1, None, k_3, k_2), flow_rate, pressure)
+
+    figure = Figure(figsize=PNG_SIZE, dpi=PNG_DPI)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    axes.plot(x, y)
+    axes.set_title('Характеристика насоса')
+    axes.set_xlabel('Q, м3/мин')
+    axes.set_ylabel('H, м')
+
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png')
+    return buffer.getvalue()
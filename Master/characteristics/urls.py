@@ -3,4 +3,6 @@ from . import views
 
 urlpatterns = [
     path('', views.characteristics, name='characteristics'),
+    path('data/', views.characteristic_data, name='characteristic_data'),
+    path('graph.png', views.characteristic_png, name='characteristic_png'),
 ]
\ No newline at end of file
@@ -1,9 +1,12 @@
 import math
-import matplotlib.pyplot as plt
-import io
-import urllib, base64
+from urllib.parse import urlencode
 
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.views.decorators.http import condition
+from Master import charts
+from . import png
+from .curve import characteristic_curve, check_flow_rate
 # from Master.calculations import views
 
 
@@ -11,7 +14,7 @@ def characteristics(request):
 
     context = {
         'button1': 'Получить характеристику',
-        'graph_url': None,
+        'plots': [],
         'inputs': [
             {
                 'placeholder': 'Расход, м3/ч',
@@ -77,17 +80,22 @@ def characteristics(request):
             },
         ]
     }
-    graph_url = ''
     if request.method == "POST":
-        flow_rate = float(request.POST.get("flow_rate", 0))
-        pressure = float(request.POST.get("pressure", 0))
-        speed = float(request.POST.get("speed", 0))
-        ns = float(request.POST.get("ns", 0))
-        kpd = float(request.POST.get("kpd", 0))
-
-        calculated_values = calculations(flow_rate, pressure, speed, ns, kpd)
-        graphs = graph(calculated_values, flow_rate, pressure, graph_url)
-        context['graph_url'] = graphs
+        try:
+            flow_rate = float(request.POST.get("flow_rate", 0))
+            pressure = float(request.POST.get("pressure", 0))
+            speed = float(request.POST.get("speed", 0))
+            ns = float(request.POST.get("ns", 0))
+            kpd = float(request.POST.get("kpd", 0))
+
+            calculated_values = calculations(flow_rate, pressure, speed, ns, kpd)
+            plot = graph(calculated_values, flow_rate, pressure)
+        except (ValueError, ZeroDivisionError) as e:
+            context['error'] = f"Ошибка ввода: {e}"
+            return render(request, 'characteristics.html', context)
+        context['plots'] = [plot]
+        context['png_query'] = urlencode({'flow_rate': flow_rate, 'pressure': pressure, 'speed': speed, 'ns': ns,
+                                          'kpd': kpd})
         update_context(context, calculated_values)
 
     return render(request, 'characteristics.html', context)
@@ -134,33 +142,51 @@ def calculations(flow_rate, pressure, speed, ns, kpd):
     return w, k1, k_1, k3, k_3, k_2
 
 
-def graph(a, flow_rate, pressure, graph_url):
-    plots = list(a)
-    plots.append(flow_rate)
-    plots.append(pressure)
-    x = []
-    for i in range(math.ceil((plots[6] / 60) * 1.3)):
-        x.append(i)
-    print(x)
-
-    y = []
-    for i_1 in range(len(x)):
-        y.append(float(round(plots[2] * pow(plots[0], 2) + plots[5] * plots[0] * x[i_1] - plots[4] * pow(x[i_1], 2), 1)))
-    print(y)
-
-    plt.figure()
-    plt.plot(x, y)
-    plt.title('Характеристика насоса')
-    plt.xlabel('Q, м3/мин')
-    plt.ylabel('H, м')
-
-    buffer = io.BytesIO()
-    plt.savefig(buffer, format='png')
-    plt.close()
-    buffer.seek(0)
-    graph_url = base64.b64encode(buffer.getvalue()).decode('utf-8')
-
-    return graph_url
+def graph(a, flow_rate, pressure):
+    """График характеристики насоса данными для построения в браузере (Master.charts)"""
+    x, y = characteristic_curve(a, flow_rate, pressure)
+    return charts.chart('Характеристика насоса', 'Q, м3/мин', 'H, м', [charts.series('H(Q)', x, y)])
+
+
+def png_params(request):
+    """Ключ картинки характеристики из параметров запроса flow_rate, pressure, speed, ns, kpd"""
+    flow_rate, pressure, speed, ns, kpd = (float(request.GET.get(name, 0)) for name in
+                                           ('flow_rate', 'pressure', 'speed', 'ns', 'kpd'))
+    check_flow_rate(flow_rate)  # до ETag и отрисовки: некорректный расход получает 400
+    return png.png_key(calculations(flow_rate, pressure, speed, ns, kpd), flow_rate, pressure)
+
+
+def png_etag(request):
+    try:
+        return png.png_etag(png_params(request))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+@condition(etag_func=png_etag)
+def characteristic_png(request):
+    """Характеристика насоса картинкой PNG; повторный запрос с тем же ETag получает 304 без отрисовки"""
+    try:
+        key = png_params(request)
+    except (ValueError, ZeroDivisionError) as e:
+        return JsonResponse({'error': f"Ошибка ввода: {e}"}, status=400, json_dumps_params={'ensure_ascii': False})
+    response = HttpResponse(png.render_png(key), content_type='image/png')
+    response['Cache-Control'] = 'public, max-age=86400'
+    return response
+
+
+def characteristic_data(request):
+    """Коэффициенты и точки характеристики в JSON: flow_rate, pressure, speed, ns, kpd в запросе"""
+    params = request.POST if request.method == "POST" else request.GET
+    try:
+        flow_rate, pressure, speed, ns, kpd = (float(params.get(name, 0)) for name in
+                                               ('flow_rate', 'pressure', 'speed', 'ns', 'kpd'))
+        calculated_values = calculations(flow_rate, pressure, speed, ns, kpd)
+        chart = graph(calculated_values, flow_rate, pressure)
+    except (ValueError, ZeroDivisionError) as e:
+        return charts.chart_response([], status=400, error=f"Ошибка ввода: {e}")
+    coefficients = dict(zip(('w', 'k1', 'k_1', 'k3', 'k_3', 'k_2'), calculated_values))
+    return charts.chart_response([chart], coefficients=coefficients)
 
 
 def update_context(context, values):
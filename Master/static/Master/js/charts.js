@@ -0,0 +1,30 @@
+// Построение графиков в браузере по данным с сервера (Master/charts.py): {title, xaxis_title, yaxis_title, series}
+function drawCharts(container, charts) {
+  container.innerHTML = '';
+  charts.forEach(chart => {
+    const block = document.createElement('div');
+    block.className = 'plot-container';
+    container.appendChild(block);
+    Plotly.newPlot(block, chart.series.map(line => ({
+      x: line.x,
+      y: line.y,
+      name: line.name,
+      type: 'scatter',
+      mode: 'lines',
+    })), {
+      title: {text: chart.title},
+      xaxis: {title: {text: chart.xaxis_title}},
+      yaxis: {title: {text: chart.yaxis_title}},
+      hovermode: 'x',
+      showlegend: true,
+    }, {responsive: true});
+  });
+}
+
+// Графики, встроенные в страницу через json_script: <div class="charts" data-source="id элемента с данными">
+document.querySelectorAll('.charts[data-source]').forEach(container => {
+  const source = document.getElementById(container.dataset.source);
+  if (source) {
+    drawCharts(container, JSON.parse(source.textContent));
+  }
+});
@@ -0,0 +1,27 @@
+// Опрос состояния фоновой задачи построения моделей; по готовности архив скачивается автоматически
+function pollJob(block) {
+  const list = block.querySelector('.job-logs');
+  const state = block.querySelector('.job-state');
+
+  fetch(block.dataset.statusUrl)
+    .then(response => response.json())
+    .then(job => {
+      list.innerHTML = '';
+      job.logs.forEach(message => {
+        const item = document.createElement('li');
+        item.textContent = message;
+        list.appendChild(item);
+      });
+      if (job.status === 'done') {
+        state.textContent = 'Модели готовы';
+        window.location = block.dataset.downloadUrl;
+      } else if (job.status === 'failed') {
+        state.textContent = 'Ошибка построения: ' + job.error;
+      } else {
+        setTimeout(() => pollJob(block), 2000);
+      }
+    })
+    .catch(() => setTimeout(() => pollJob(block), 5000));
+}
+
+document.querySelectorAll('.job-progress').forEach(pollJob);